@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+asyncio fleet simulator on aiokafka.
+Runs hundreds of logical order producers and consumers in one event loop,
+using the same ConfigManager environments and order schema as the
+synchronous clients, to rehearse a migration with a realistic number of
+services. SIGINT/SIGTERM or --duration stop the fleet: producers are
+cancelled and flushed, then consumers are cancelled and closed.
+"""
+
+import asyncio
+import argparse
+import signal
+import time
+from typing import Any, Dict, List
+
+from client_logging import RecordLogger
+from client_metrics import MetricsRegistry, start_metrics_server
+from kafka_config import ConfigManager
+from order_serde import SERDES, get_serde
+from orders_producer import OrdersProducer
+
+try:
+    from aiokafka import AIOKafkaConsumer, AIOKafkaProducer
+    from aiokafka.helpers import create_ssl_context
+    HAS_AIOKAFKA = True
+except ImportError:
+    HAS_AIOKAFKA = False
+
+REQUIRED_FIELDS = ('order_id', 'customer_id', 'total_amount', 'timestamp')
+
+
+def client_config(config_manager: ConfigManager) -> Dict[str, Any]:
+    """aiokafka connection settings for the active environment"""
+    config = config_manager.get_active_config()
+    kafka_config = config_manager.get_aiokafka_config_dict()
+    if 'SSL' in config.security_protocol:
+        kafka_config['ssl_context'] = create_ssl_context(cafile=config.ssl_ca_location)
+    return kafka_config
+
+
+class AsyncFleet:
+    """Logical producers and consumers sharing one event loop"""
+
+    def __init__(self, producers: int, consumers: int, rate: float, producer_clients: int = 0,
+                 consumer_groups: int = 1, group_prefix: str = "orders-fleet", serde: str = "json"):
+        if not HAS_AIOKAFKA:
+            raise RuntimeError("aiokafka is not installed. Install with: pip install aiokafka")
+
+        self.config_manager = ConfigManager()
+        self.topic = self.config_manager.get_active_config().topic_name
+        self.producer_count = producers
+        self.consumer_count = consumers
+        self.rate = rate
+        # 0 means one client per logical producer, like separate services
+        self.producer_clients = producer_clients or producers
+        self.consumer_groups = consumer_groups
+        self.group_prefix = group_prefix
+        self.serde = get_serde(serde)
+
+        # Reuse the producer's generator so the fleet sends the same order schema
+        self.orders = OrdersProducer(serde=serde, record_logger=RecordLogger(every_seconds=60))
+
+        self.stop_event = None
+        self.clients: List[AIOKafkaProducer] = []
+        self.consumers: List[AIOKafkaConsumer] = []
+
+        self.metrics = MetricsRegistry("async_fleet")
+        self.send_to_ack_latency = self.metrics.histogram(
+            "stage_latency_seconds", "Latency of each fleet stage in seconds", stage="send_to_ack")
+        self.orders_sent = self.metrics.counter("orders_sent_total", "Orders handed to a producer")
+        self.orders_acked = self.metrics.counter("orders_acked_total", "Orders acknowledged by the broker")
+        self.orders_failed = self.metrics.counter("orders_failed_total", "Orders whose send failed")
+        self.orders_consumed = self.metrics.counter("orders_consumed_total", "Valid orders consumed")
+        self.invalid_orders = self.metrics.counter("invalid_orders_total", "Consumed orders that failed validation")
+        self.metrics.gauge("logical_producers", "Running logical producers", lambda: self.producer_count)
+        self.metrics.gauge("logical_consumers", "Running logical consumers", lambda: self.consumer_count)
+
+    def _on_ack(self, sent_at: float, future: asyncio.Future):
+        if future.cancelled() or future.exception() is not None:
+            self.orders_failed.inc()
+            return
+        self.orders_acked.inc()
+        self.send_to_ack_latency.record(time.perf_counter() - sent_at)
+
+    async def run_producer(self, producer: AIOKafkaProducer):
+        """One logical producer sending at --rate orders per second"""
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / self.rate if self.rate else 0.0
+        next_at = loop.time()
+        while not self.stop_event.is_set():
+            order = self.orders.generate_order()
+            sent_at = time.perf_counter()
+            try:
+                future = await producer.send(self.topic, key=str(order['order_id']), value=order,
+                                            headers=[self.orders.run_header])
+                self.orders_sent.inc()
+                future.add_done_callback(lambda f, sent_at=sent_at: self._on_ack(sent_at, f))
+            except Exception:
+                self.orders_failed.inc()
+
+            next_at += interval
+            await asyncio.sleep(max(next_at - loop.time(), 0))
+
+    def is_valid_order(self, data: bytes) -> bool:
+        try:
+            order = self.serde.decode(data)
+            return all(field in order for field in REQUIRED_FIELDS)
+        except Exception:
+            return False
+
+    async def run_consumer(self, consumer: AIOKafkaConsumer):
+        """One logical consumer validating the orders it receives"""
+        # Values are decoded here rather than by the client, so one bad record is
+        # counted as invalid instead of failing getmany() and ending the task
+        while not self.stop_event.is_set():
+            batch = await consumer.getmany(timeout_ms=500, max_records=500)
+            for records in batch.values():
+                for record in records:
+                    if self.is_valid_order(record.value):
+                        self.orders_consumed.inc()
+                    else:
+                        self.invalid_orders.inc()
+
+    async def report(self, interval: float):
+        started = time.monotonic()
+        while True:
+            await asyncio.sleep(interval)
+            elapsed = time.monotonic() - started
+            print(f"📈 {elapsed:6.0f}s | sent {self.orders_sent.value} | acked {self.orders_acked.value} | "
+                  f"failed {self.orders_failed.value} | consumed {self.orders_consumed.value} | "
+                  f"ack rate {self.orders_acked.value / elapsed:,.0f}/s | "
+                  f"ack p99 {self.send_to_ack_latency.percentile(0.99) * 1000:.1f}ms")
+
+    async def start_clients(self):
+        config = client_config(self.config_manager)
+        self.clients = [
+            AIOKafkaProducer(
+                **config,
+                key_serializer=lambda k: k.encode('utf-8') if k else None,
+                value_serializer=self.serde.encode,
+                acks='all',
+                compression_type='gzip',
+                linger_ms=10,
+            )
+            for _ in range(self.producer_clients)
+        ]
+        self.consumers = [
+            AIOKafkaConsumer(
+                self.topic,
+                **config,
+                group_id=f"{self.group_prefix}-{i % self.consumer_groups}",
+                key_deserializer=lambda k: k.decode('utf-8') if k else None,
+                auto_offset_reset='latest',
+                enable_auto_commit=True,
+            )
+            for i in range(self.consumer_count)
+        ]
+        await asyncio.gather(*(client.start() for client in self.clients + self.consumers))
+        print(f"✅ Started {len(self.clients)} producer clients and {len(self.consumers)} consumers")
+
+    async def cancel(self, tasks: List[asyncio.Task]):
+        for task in tasks:
+            task.cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # A task that died earlier would otherwise vanish without a trace
+        for task, result in zip(tasks, results):
+            if isinstance(result, Exception):
+                print(f"❌ Fleet task {task.get_name()} failed: {result!r}")
+
+    async def run(self, duration: float = None, report_interval: float = 10.0, metrics_port: int = None):
+        if metrics_port:
+            start_metrics_server(self.metrics, metrics_port)
+
+        loop = asyncio.get_running_loop()
+        self.stop_event = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self.stop_event.set)
+
+        print(f"🚀 Starting async fleet: {self.producer_count} producers at {self.rate}/s each, "
+              f"{self.consumer_count} consumers in {self.consumer_groups} group(s)")
+        print(f"📊 Environment: {self.config_manager.active_config}")
+        print(f"📤 Topic: {self.topic}")
+        print("🔄 Press Ctrl+C to stop")
+        print("=" * 80)
+
+        try:
+            await self.start_clients()
+            consumer_tasks = [asyncio.create_task(self.run_consumer(c)) for c in self.consumers]
+            producer_tasks = [asyncio.create_task(self.run_producer(self.clients[i % len(self.clients)]))
+                              for i in range(self.producer_count)]
+            reporter = asyncio.create_task(self.report(report_interval))
+
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), timeout=duration)
+            except asyncio.TimeoutError:
+                self.stop_event.set()
+
+            # Stop producing first, flush what is buffered, then let consumers drain
+            print("\n🛑 Stopping fleet...")
+            await self.cancel(producer_tasks)
+            await asyncio.gather(*(client.stop() for client in self.clients), return_exceptions=True)
+            await self.cancel(consumer_tasks + [reporter])
+        except Exception as e:
+            print(f"❌ Fleet error: {e}")
+        finally:
+            # stop() is a no-op for clients already stopped; closing consumers commits their offsets
+            await asyncio.gather(*(client.stop() for client in self.clients + self.consumers),
+                                 return_exceptions=True)
+            self.orders.log.close()
+
+        print("📊 Final Statistics:")
+        print(f"   Orders sent: {self.orders_sent.value}")
+        print(f"   Orders acknowledged: {self.orders_acked.value}")
+        print(f"   Orders failed: {self.orders_failed.value}")
+        print(f"   Orders consumed: {self.orders_consumed.value} ({self.invalid_orders.value} invalid)")
+        stage_summary = self.metrics.summary()
+        if stage_summary:
+            print("📊 Stage latencies:")
+            print(stage_summary)
+        print("✅ Fleet stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate a fleet of order producers and consumers with asyncio')
+    parser.add_argument('--producers', type=int, default=100,
+                       help='Logical producers (default: 100)')
+    parser.add_argument('--consumers', type=int, default=100,
+                       help='Logical consumers (default: 100)')
+    parser.add_argument('--rate', type=float, default=1.0,
+                       help='Orders per second per logical producer, 0 for unthrottled (default: 1.0)')
+    parser.add_argument('--producer-clients', type=int, default=0,
+                       help='Kafka producer clients shared by the logical producers (default: one each)')
+    parser.add_argument('--consumer-groups', type=int, default=1,
+                       help='Spread consumers over this many consumer groups (default: 1)')
+    parser.add_argument('--group-prefix', type=str, default='orders-fleet',
+                       help='Consumer group name prefix (default: orders-fleet)')
+    parser.add_argument('--duration', type=float, default=None,
+                       help='Stop after this many seconds (default: run until interrupted)')
+    parser.add_argument('--report-interval', type=float, default=10.0,
+                       help='Seconds between progress reports (default: 10)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                       help='Serve Prometheus metrics on http://localhost:PORT/metrics')
+    parser.add_argument('--serde', choices=list(SERDES), default='json',
+                       help='Value serde (default: json)')
+    parser.add_argument('--env', choices=['msk', 'msk-scram', 'gateway', 'cc', 'local'],
+                       help='Kafka environment (overrides KAFKA_ENV)')
+
+    args = parser.parse_args()
+
+    if args.env:
+        import os
+        os.environ['KAFKA_ENV'] = args.env
+
+    fleet = AsyncFleet(args.producers, args.consumers, args.rate, producer_clients=args.producer_clients,
+                       consumer_groups=args.consumer_groups, group_prefix=args.group_prefix, serde=args.serde)
+    asyncio.run(fleet.run(duration=args.duration, report_interval=args.report_interval,
+                          metrics_port=args.metrics_port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Avro serde using the Confluent wire format (magic byte, 4-byte schema ID,
+Avro binary body). Schema IDs are resolved through SchemaIdCache, which is
+persisted to disk so Schema Registry is contacted once at startup rather
+than per message. Point SCHEMA_REGISTRY_URL at mock_schema_registry.py to
+exercise it locally.
+"""
+
+import importlib.util
+import io
+import os
+import json
+import struct
+from typing import Dict, Any, Optional
+
+# order_serde registers this module for every client, so fastavro, requests and
+# setup_schemas are only imported once an AvroSerde is actually built
+HAS_FASTAVRO = importlib.util.find_spec("fastavro") is not None
+fastavro = None
+
+MAGIC_BYTE = 0
+WIRE_HEADER = struct.Struct('>bI')
+REGISTRY_CONTENT_TYPE = "application/vnd.schemaregistry.v1+json"
+
+
+class SchemaIdCache:
+    """Subject/schema -> ID and ID -> schema lookups, cached in memory and on disk.
+
+    IDs are only meaningful within one registry, so the file records the
+    registry URL and is ignored when it was written for a different one.
+    """
+
+    def __init__(self, registry_url: str, auth=None, path: str = ".schema_id_cache.json"):
+        self.registry_url = registry_url.rstrip('/')
+        self.auth = auth
+        self.path = path
+        self.subjects: Dict[str, Dict[str, Any]] = {}
+        self.schemas: Dict[int, str] = {}
+        self.load()
+
+    def load(self):
+        """Load previously resolved IDs from disk, if a cache file exists"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get("registry_url") != self.registry_url:
+                print(f"⚠️  Ignoring schema ID cache {self.path}: written for registry "
+                      f"{data.get('registry_url') or 'unknown'}, now using {self.registry_url}")
+                return
+            self.subjects = data.get("subjects", {})
+            self.schemas = {int(schema_id): schema for schema_id, schema in data.get("schemas", {}).items()}
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable schema ID cache {self.path}: {e}")
+
+    def save(self):
+        """Persist the cache atomically so a crash never leaves a partial file"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"registry_url": self.registry_url,
+                       "subjects": self.subjects,
+                       "schemas": {str(k): v for k, v in self.schemas.items()}}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _post(self, path: str, schema_str: str):
+        import requests
+        return requests.post(f"{self.registry_url}{path}", json={"schema": schema_str},
+                             headers={"Content-Type": REGISTRY_CONTENT_TYPE}, auth=self.auth, timeout=10)
+
+    def get_id(self, subject: str, schema: Dict[str, Any]) -> int:
+        """Schema ID for `schema` under `subject`, registering it if it is new"""
+        schema_str = json.dumps(schema, sort_keys=True)
+        cached = self.subjects.get(subject)
+        if cached and cached["schema"] == schema_str:
+            return cached["id"]
+
+        # Look the schema up first; only register when the subject doesn't know it
+        response = self._post(f"/subjects/{subject}", schema_str)
+        if response.status_code == 404:
+            response = self._post(f"/subjects/{subject}/versions", schema_str)
+        response.raise_for_status()
+
+        schema_id = response.json()["id"]
+        self.subjects[subject] = {"id": schema_id, "schema": schema_str}
+        self.schemas[schema_id] = schema_str
+        self.save()
+        return schema_id
+
+    def get_schema(self, schema_id: int) -> str:
+        """Schema string for `schema_id`"""
+        if schema_id in self.schemas:
+            return self.schemas[schema_id]
+
+        import requests
+        response = requests.get(f"{self.registry_url}/schemas/ids/{schema_id}", auth=self.auth, timeout=10)
+        response.raise_for_status()
+
+        schema_str = response.json()["schema"]
+        self.schemas[schema_id] = schema_str
+        self.save()
+        return schema_str
+
+
+class AvroSerde:
+    """Avro values in the Confluent wire format, using the registered orders-value schema"""
+    name = "avro"
+
+    def __init__(self, cache: Optional[SchemaIdCache] = None, topic_name: str = None):
+        if not HAS_FASTAVRO:
+            raise RuntimeError("fastavro is not installed. Install with: pip install fastavro")
+        global fastavro
+        import fastavro
+        from setup_schemas import get_schema_registry_url, get_schema_registry_auth, get_orders_value_schema
+
+        if cache is None:
+            registry_url = get_schema_registry_url()
+            if not registry_url:
+                raise ValueError("SCHEMA_REGISTRY_URL must be set for the avro serde")
+            cache = SchemaIdCache(registry_url, get_schema_registry_auth(),
+                                  os.getenv("SCHEMA_ID_CACHE", ".schema_id_cache.json"))
+        self.cache = cache
+
+        topic_name = topic_name or os.getenv("TOPIC_NAME", "orders")
+        self.subject = f"{topic_name}-value"
+        self.schema = fastavro.parse_schema(get_orders_value_schema())
+
+        # Resolve the writer schema ID now so encode() never touches the registry
+        self.schema_id = self.cache.get_id(self.subject, get_orders_value_schema())
+        self.header = WIRE_HEADER.pack(MAGIC_BYTE, self.schema_id)
+        self.reader_schemas = {self.schema_id: self.schema}
+
+    def encode(self, order: Dict[str, Any]) -> bytes:
+        buffer = io.BytesIO()
+        buffer.write(self.header)
+        fastavro.schemaless_writer(buffer, self.schema, order)
+        return buffer.getvalue()
+
+    def _writer_schema(self, schema_id: int):
+        schema = self.reader_schemas.get(schema_id)
+        if schema is None:
+            schema = fastavro.parse_schema(json.loads(self.cache.get_schema(schema_id)))
+            self.reader_schemas[schema_id] = schema
+        return schema
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        magic, schema_id = WIRE_HEADER.unpack_from(data)
+        if magic != MAGIC_BYTE:
+            raise ValueError(f"Unknown magic byte {magic}, payload is not in the Confluent wire format")
+        return fastavro.schemaless_reader(io.BytesIO(data[WIRE_HEADER.size:]), self._writer_schema(schema_id))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Sampled, buffered logging for the per-record output of the orders clients.
+Records are sampled (every Nth record or at most one per time interval),
+queued, and written in batches by a background thread, as text or JSON
+lines. Error events bypass sampling and are never dropped.
+"""
+
+import sys
+import json
+import time
+import queue
+import threading
+from typing import Optional
+
+_STOP = object()
+
+
+class RecordLogger:
+    """Sampling front end plus an asynchronous, batching writer thread"""
+
+    def __init__(self, every_n: Optional[int] = None, every_seconds: Optional[float] = None,
+                 json_output: bool = False, path: Optional[str] = None,
+                 max_queue: int = 10000, max_batch: int = 500):
+        # With neither option set every record is logged, matching plain print()
+        self.every_n = every_n if every_n is not None else (None if every_seconds else 1)
+        self.every_seconds = every_seconds
+        self.json_output = json_output
+        self.max_batch = max_batch
+
+        self.stream = open(path, 'a', buffering=1024 * 1024) if path else sys.stdout
+        self.owns_stream = path is not None
+
+        self.records_seen = 0
+        self.last_logged_at = 0.0
+        self.dropped = 0
+
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.writer = threading.Thread(target=self._write_loop, name="record-logger", daemon=True)
+        self.writer.start()
+
+    def sampled(self) -> bool:
+        """Count a record and return whether it should be logged.
+
+        Call this before building the message so skipped records cost nothing.
+        """
+        self.records_seen += 1
+        if self.every_n and (self.records_seen - 1) % self.every_n == 0:
+            return True
+        if self.every_seconds:
+            now = time.monotonic()
+            if now - self.last_logged_at >= self.every_seconds:
+                self.last_logged_at = now
+                return True
+        return False
+
+    def info(self, message: str, event: str = "record", **fields):
+        """Queue a sampled record; dropped (and counted) if the writer falls behind"""
+        try:
+            self.queue.put_nowait(("info", time.time(), event, message, fields))
+        except queue.Full:
+            self.dropped += 1
+
+    def error(self, message: str, event: str = "error", **fields):
+        """Queue an error event; blocks rather than dropping it"""
+        self.queue.put(("error", time.time(), event, message, fields))
+
+    def _format(self, level: str, ts: float, event: str, message: str, fields) -> str:
+        if not self.json_output:
+            return message
+        return json.dumps({"ts": ts, "level": level, "event": event, "message": message, **fields},
+                          default=str, ensure_ascii=False)
+
+    def _write_loop(self):
+        while True:
+            item = self.queue.get()
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(entry is _STOP for entry in batch)
+            lines = [self._format(*entry) for entry in batch if entry is not _STOP]
+            if lines:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+            for _ in batch:
+                self.queue.task_done()
+            if stop:
+                return
+
+    def flush(self):
+        """Block until everything queued so far has been written"""
+        self.queue.join()
+
+    def close(self):
+        """Flush, stop the writer thread and report any dropped records"""
+        self.queue.put(_STOP)
+        self.writer.join()
+        if self.owns_stream:
+            self.stream.close()
+        if self.dropped:
+            print(f"⚠️  {self.dropped} sampled log records were dropped because the writer fell behind")
+
+
+def add_logging_arguments(parser):
+    """Add the shared --log-* options to a client's argument parser"""
+    parser.add_argument('--log-every', type=int, default=None,
+                       help='Log every Nth record (default: every record unless --log-interval is set)')
+    parser.add_argument('--log-interval', type=float, default=None,
+                       help='Log at most one record per this many seconds')
+    parser.add_argument('--log-format', choices=['text', 'json'], default='text',
+                       help='Per-record log format (default: text)')
+    parser.add_argument('--log-file', type=str, default=None,
+                       help='Write per-record logs to this file instead of stdout')
+
+
+def logger_from_args(args) -> RecordLogger:
+    """Build a RecordLogger from the options added by add_logging_arguments()"""
+    return RecordLogger(every_n=args.log_every, every_seconds=args.log_interval,
+                        json_output=args.log_format == 'json', path=args.log_file)
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+In-process metrics for the orders clients: HDR-style latency histograms,
+counters and callback gauges, rendered in the Prometheus text format and
+optionally served on a local HTTP /metrics endpoint.
+"""
+
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# Values are recorded in microseconds. Below SUB_BUCKET_COUNT every value has
+# its own bucket; above it each power of two is split into HALF_COUNT linear
+# sub-buckets, giving a relative error under 1/HALF_COUNT (~1.6%).
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+HALF_COUNT = SUB_BUCKET_COUNT // 2
+MAX_SHIFT = 32  # ~1.2 hours at microsecond resolution
+
+# Fixed `le` bounds (seconds) for the Prometheus export so scrapes line up
+EXPORT_BUCKETS = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                  0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+INF_LABEL = 'le="+Inf"'
+
+
+def _bucket_index(micros: int) -> int:
+    if micros < SUB_BUCKET_COUNT:
+        return micros
+    shift = min(micros.bit_length() - SUB_BUCKET_BITS, MAX_SHIFT)
+    top = min(micros >> shift, SUB_BUCKET_COUNT - 1)
+    return SUB_BUCKET_COUNT + (shift - 1) * HALF_COUNT + (top - HALF_COUNT)
+
+
+def _bucket_value(index: int) -> int:
+    """Highest value (in microseconds) that lands in bucket `index`"""
+    if index < SUB_BUCKET_COUNT:
+        return index
+    shift = (index - SUB_BUCKET_COUNT) // HALF_COUNT + 1
+    top = (index - SUB_BUCKET_COUNT) % HALF_COUNT + HALF_COUNT
+    return ((top + 1) << shift) - 1
+
+
+BUCKET_COUNT = _bucket_index((SUB_BUCKET_COUNT << MAX_SHIFT) - 1) + 1
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram with constant-time, thread-safe record()"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float, count: int = 1):
+        """Record `count` observations of `seconds`"""
+        index = _bucket_index(max(int(seconds * 1e6), 0))
+        with self.lock:
+            self.counts[index] += count
+            self.count += count
+            self.total += seconds * count
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, fraction: float) -> float:
+        """Latency in seconds at `fraction` (0-1) of recorded observations"""
+        with self.lock:
+            if not self.count:
+                return 0.0
+            target = max(int(fraction * self.count + 0.5), 1)
+            seen = 0
+            for index, bucket_count in enumerate(self.counts):
+                seen += bucket_count
+                if seen >= target:
+                    return min(_bucket_value(index) / 1e6, self.max)
+        return self.max
+
+    def snapshot(self) -> Tuple[List[int], int, float]:
+        """Cumulative counts for EXPORT_BUCKETS, plus total count and sum"""
+        with self.lock:
+            counts = list(self.counts)
+            count, total = self.count, self.total
+
+        cumulative = []
+        seen = 0
+        index = 0
+        for bound in EXPORT_BUCKETS:
+            bound_micros = bound * 1e6
+            while index < BUCKET_COUNT and _bucket_value(index) <= bound_micros:
+                seen += counts[index]
+                index += 1
+            cumulative.append(seen)
+        return cumulative, count, total
+
+
+class Counter:
+    """Monotonic counter, safe to increment from callback threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        with self.lock:
+            self.value += amount
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class MetricsRegistry:
+    """Named histograms, counters and gauges with Prometheus text rendering"""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.help: Dict[str, Tuple[str, str]] = {}
+        self.histograms: Dict[Tuple[str, tuple], LatencyHistogram] = {}
+        self.counters: Dict[Tuple[str, tuple], Counter] = {}
+        self.gauges: Dict[Tuple[str, tuple], Callable[[], float]] = {}
+
+    def _key(self, name: str, kind: str, help_text: str, labels: Dict[str, str]):
+        full_name = f"{self.prefix}_{name}"
+        self.help.setdefault(full_name, (kind, help_text))
+        return full_name, tuple(sorted(labels.items()))
+
+    def histogram(self, name: str, help_text: str, **labels) -> LatencyHistogram:
+        with self.lock:
+            key = self._key(name, "histogram", help_text, labels)
+            if key not in self.histograms:
+                self.histograms[key] = LatencyHistogram()
+            return self.histograms[key]
+
+    def counter(self, name: str, help_text: str, **labels) -> Counter:
+        with self.lock:
+            key = self._key(name, "counter", help_text, labels)
+            if key not in self.counters:
+                self.counters[key] = Counter()
+            return self.counters[key]
+
+    def gauge(self, name: str, help_text: str, fn: Callable[[], float], kind: str = "gauge", **labels):
+        """Register a metric whose value is read from `fn` at scrape time.
+
+        Pass kind="counter" to expose a count the client already maintains.
+        """
+        with self.lock:
+            self.gauges[self._key(name, kind, help_text, labels)] = fn
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+
+        lines = []
+        described = set()
+
+        def describe(name):
+            if name not in described:
+                kind, help_text = self.help[name]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                described.add(name)
+
+        for (name, labels), histogram in histograms:
+            describe(name)
+            cumulative, count, total = histogram.snapshot()
+            for bound, seen in zip(EXPORT_BUCKETS, cumulative):
+                bucket_labels = _format_labels(labels, 'le="%s"' % bound)
+                lines.append(f"{name}_bucket{bucket_labels} {seen}")
+            lines.append(f"{name}_bucket{_format_labels(labels, INF_LABEL)} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        for (name, labels), counter in counters:
+            describe(name)
+            lines.append(f"{name}{_format_labels(labels)} {counter.value}")
+
+        for (name, labels), fn in gauges:
+            describe(name)
+            try:
+                value = fn()
+            except Exception:
+                continue
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """One line per histogram with count, p50, p99 and max, for console output"""
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+
+        lines = []
+        for (name, labels), histogram in histograms:
+            if not histogram.count:
+                continue
+            label_text = ",".join(value for _, value in labels) or name
+            lines.append(f"   {label_text:<16} n={histogram.count:<9} "
+                         f"p50={histogram.percentile(0.50) * 1000:8.3f}ms "
+                         f"p99={histogram.percentile(0.99) * 1000:8.3f}ms "
+                         f"max={histogram.max * 1000:8.3f}ms")
+        return "\n".join(lines)
+
+
+def start_metrics_server(registry: MetricsRegistry, port: int, host: str = "localhost") -> "ThreadingHTTPServer":
+    """Serve registry.render() on http://host:port/metrics from a daemon thread"""
+    # Imported here: http.server pulls in email/html and slows every client start by ~40ms
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != "/metrics":
+                self.send_error(404)
+                return
+            payload = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            # Scrapes every few seconds would otherwise flood the client's output
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    print(f"📈 Metrics available at http://{host}:{port}/metrics")
+    return server
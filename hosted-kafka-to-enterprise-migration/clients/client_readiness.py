@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Readiness events for the orders clients, written as JSON lines to a file
+(--ready-file) so cutover.py can wait on them instead of sleeping.
+Each event is written once, with its wall-clock time: "connected",
+"assigned", "first_ack" and "first_record" as they first happen, and
+"last_ack"/"last_record" plus "stopped" at shutdown.
+"""
+
+import json
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+
+class ReadinessFile:
+    """Appends one-off readiness events; observe() is cheap enough for the hot path"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.written = set()
+        # Latest wall-clock time per observed kind ("ack", "record"), written at close()
+        self.last: Dict[str, float] = {}
+        self.file = open(path, 'a', buffering=1)
+
+    def event(self, name: str, ts: Optional[float] = None, **fields):
+        """Write `name` the first time it is reported; later reports are ignored"""
+        with self.lock:
+            if name in self.written or self.file.closed:
+                return
+            self.written.add(name)
+            self.file.write(json.dumps({"event": name, "ts": ts or time.time(), **fields}) + "\n")
+
+    def observe(self, kind: str):
+        """Note that an ack or record happened now: writes first_<kind> once and keeps last_<kind>"""
+        now = time.time()
+        self.last[kind] = now
+        if f"first_{kind}" not in self.written:
+            self.event(f"first_{kind}", now)
+
+    def close(self):
+        for kind, ts in list(self.last.items()):
+            self.event(f"last_{kind}", ts)
+        self.event("stopped")
+        with self.lock:
+            self.file.close()
+
+
+def read_events(path: str) -> Dict[str, float]:
+    """Event name -> timestamp for everything written to a readiness file so far"""
+    events: Dict[str, float] = {}
+    try:
+        with open(path) as f:
+            for entry in _parse(f):
+                events.setdefault(entry["event"], entry["ts"])
+    except FileNotFoundError:
+        pass
+    return events
+
+
+def _parse(lines) -> Iterator[dict]:
+    for line in lines:
+        try:
+            yield json.loads(line)
+        except ValueError:
+            # A line still being written
+            continue
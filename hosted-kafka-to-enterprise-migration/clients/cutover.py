@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Cutover orchestrator, a measured replacement for `cutover.sh cutover <env>`.
+Stops the running producer and consumer in parallel, makes sure the topic
+exists on the target, starts both clients against env.<target> and waits
+on their readiness events (see client_readiness.py) instead of fixed
+sleeps. Ends with a timeline and the two unavailability windows:
+  writes: last ack from the old producer -> first ack from the new one
+  reads:  last record polled by the old consumer -> first record polled by the new one
+PID, log and env.live files are the ones cutover.sh uses, so `cutover.sh
+status|stop|retarget` keep working on clients started here.
+"""
+
+import argparse
+import os
+import shlex
+import shutil
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from kafka.admin import KafkaAdminClient, NewTopic
+from kafka.errors import TopicAlreadyExistsError
+
+from client_readiness import read_events
+from kafka_config import ConfigManager
+
+ENVIRONMENTS = ['msk', 'msk-scram', 'gateway', 'cc']
+LOG_DIR = "logs"
+LIVE_ENV_FILE = "env.live"
+POLL_INTERVAL = 0.02
+
+# name -> (script, PID file); logs and readiness files live in LOG_DIR
+CLIENTS = {
+    "consumer": ("orders_consumer.py", "consumer.pid"),
+    "producer": ("orders_producer.py", "producer.pid"),
+}
+
+
+class Timeline:
+    """Wall-clock events of one cutover, printed relative to its start"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.events: List[Tuple[float, str]] = []
+
+    def add(self, label: str, ts: Optional[float] = None) -> float:
+        ts = ts or time.time()
+        self.events.append((ts, label))
+        return ts
+
+    def report(self) -> List[str]:
+        lines = ["🕒 Cutover timeline:"]
+        for ts, label in sorted(self.events):
+            lines.append(f"   {(ts - self.started_at) * 1000:+10.1f}ms  {label}")
+        return lines
+
+
+def _ready_file(name: str) -> str:
+    return os.path.join(LOG_DIR, f"{name}.ready")
+
+
+def _running_pid(pid_file: str) -> Optional[int]:
+    try:
+        with open(pid_file) as f:
+            pid = int(f.read().strip())
+        os.kill(pid, 0)
+    except (OSError, ValueError):
+        return None
+    # An exited client that has not been reaped yet still answers kill -0
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            if f.read().rsplit(')', 1)[1].split()[0] == 'Z':
+                return None
+    except (OSError, IndexError):
+        pass
+    return pid
+
+
+def stop_client(name: str, timeline: Timeline, timeout: float) -> Optional[float]:
+    """SIGTERM the client and poll until it exits, escalating to SIGKILL after `timeout`"""
+    pid = _running_pid(CLIENTS[name][1])
+    if pid is None:
+        print(f"⚠️  No running {name} found")
+        return None
+
+    timeline.add(f"{name} SIGTERM (PID {pid})")
+    os.kill(pid, signal.SIGTERM)
+    deadline = time.monotonic() + timeout
+    while _running_pid(CLIENTS[name][1]) is not None:
+        if time.monotonic() >= deadline:
+            os.kill(pid, signal.SIGKILL)
+            timeline.add(f"{name} SIGKILL after {timeout:g}s")
+            break
+        time.sleep(POLL_INTERVAL)
+    return timeline.add(f"{name} exited")
+
+
+def ensure_topic(config_manager: ConfigManager, topic: str, partitions: int, replication_factor: int):
+    """Create the orders topic on the target cluster if it does not exist yet"""
+    admin = KafkaAdminClient(**config_manager.get_kafka_config_dict())
+    try:
+        admin.create_topics([NewTopic(name=topic, num_partitions=partitions,
+                                      replication_factor=replication_factor)])
+        print(f"✅ Topic '{topic}' created")
+    except TopicAlreadyExistsError:
+        print(f"✅ Topic '{topic}' already exists")
+    finally:
+        admin.close()
+
+
+def start_client(name: str, extra_args: List[str], timeline: Timeline) -> subprocess.Popen:
+    script, pid_file = CLIENTS[name]
+    ready_file = _ready_file(name)
+    if os.path.exists(ready_file):
+        os.remove(ready_file)
+    log = open(os.path.join(LOG_DIR, f"{name}.log"), 'ab')
+    process = subprocess.Popen(
+        [sys.executable, script, "--env-file", LIVE_ENV_FILE, "--ready-file", ready_file, *extra_args],
+        stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+    with open(pid_file, 'w') as f:
+        f.write(str(process.pid))
+    timeline.add(f"{name} started (PID {process.pid})")
+    return process
+
+
+def wait_for_event(name: str, event: str, process: subprocess.Popen, timeout: float) -> float:
+    """Block until the client writes `event`; raises if it exits or times out first"""
+    deadline = time.monotonic() + timeout
+    while True:
+        ts = read_events(_ready_file(name)).get(event)
+        if ts is not None:
+            return ts
+        if process.poll() is not None:
+            raise RuntimeError(f"{name} exited with code {process.returncode} before '{event}', "
+                               f"see {LOG_DIR}/{name}.log")
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"{name} did not report '{event}' within {timeout:g}s")
+        time.sleep(POLL_INTERVAL)
+
+
+def _window(label: str, previous: Dict[str, float], last_event: str, exited: Optional[float],
+            first: Optional[float]) -> str:
+    if first is None:
+        return f"   {label}: unknown (new client not ready)"
+    if last_event in previous:
+        return f"   {label}: {(first - previous[last_event]) * 1000:,.1f}ms"
+    if exited is not None:
+        # Without a readiness file the last ack/record time is unknown; the exit happened after it
+        return f"   {label}: >= {(first - exited) * 1000:,.1f}ms (previous client had no --ready-file)"
+    return f"   {label}: n/a (no previous client)"
+
+
+def cutover(target: str, args) -> bool:
+    env_file = f"env.{target}"
+    if not os.path.exists(env_file):
+        print(f"❌ Environment file {env_file} not found!")
+        return False
+    os.makedirs(LOG_DIR, exist_ok=True)
+
+    timeline = Timeline()
+    timeline.add(f"cutover to {target} requested")
+
+    # Stop both clients at once; each one's readiness file then holds its last ack/record
+    with ThreadPoolExecutor(max_workers=len(CLIENTS)) as pool:
+        stopping = {name: pool.submit(stop_client, name, timeline, args.stop_timeout) for name in CLIENTS}
+        exited = {name: future.result() for name, future in stopping.items()}
+    previous = {name: read_events(_ready_file(name)) for name in CLIENTS}
+    for name, events in previous.items():
+        for event in ("last_ack", "last_record"):
+            if event in events:
+                timeline.add(f"previous {name} {event.replace('_', ' ')}", events[event])
+
+    shutil.copyfile(env_file, LIVE_ENV_FILE)
+    if not args.skip_topic:
+        try:
+            ensure_topic(ConfigManager(LIVE_ENV_FILE), args.topic, args.partitions, args.replication_factor)
+        except Exception as e:
+            print(f"⚠️  Topic check failed, starting clients anyway: {e}")
+        timeline.add("topic checked")
+
+    consumer = start_client("consumer", shlex.split(args.consumer_args), timeline)
+    producer = start_client("producer", shlex.split(args.producer_args), timeline)
+
+    first_ack = first_record = None
+    ok = True
+    try:
+        for name, process, event in (("consumer", consumer, "connected"), ("producer", producer, "connected"),
+                                     ("consumer", consumer, "assigned"), ("producer", producer, "first_ack"),
+                                     ("consumer", consumer, "first_record")):
+            ts = wait_for_event(name, event, process, args.ready_timeout)
+            timeline.add(f"{name} {event.replace('_', ' ')}", ts)
+            if event == "first_ack":
+                first_ack = ts
+            elif event == "first_record":
+                first_record = ts
+    except (RuntimeError, TimeoutError) as e:
+        print(f"❌ {e}")
+        ok = False
+
+    print("\n".join(timeline.report()))
+    print("⏱️  Unavailability:")
+    print(_window("writes", previous["producer"], "last_ack", exited["producer"], first_ack))
+    print(_window("reads", previous["consumer"], "last_record", exited["consumer"], first_record))
+    print(f"   total cutover: {(time.time() - timeline.started_at) * 1000:,.1f}ms")
+    if ok:
+        print(f"🎉 Cutover to {target} completed; logs in {LOG_DIR}/")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cut the orders clients over to another environment, '
+                                                 'waiting on readiness instead of sleeps')
+    parser.add_argument('env', choices=ENVIRONMENTS, help='Target environment (reads env.<env>)')
+    parser.add_argument('--stop-timeout', type=float, default=10.0,
+                       help='Seconds to wait after SIGTERM before SIGKILL (default: 10)')
+    parser.add_argument('--ready-timeout', type=float, default=60.0,
+                       help='Seconds to wait for each readiness event (default: 60)')
+    parser.add_argument('--topic', type=str, default='orders',
+                       help='Topic to ensure on the target (default: orders)')
+    parser.add_argument('--partitions', type=int, default=3,
+                       help='Partitions if the topic has to be created (default: 3)')
+    parser.add_argument('--replication-factor', type=int, default=3,
+                       help='Replication factor if the topic has to be created (default: 3)')
+    parser.add_argument('--skip-topic', action='store_true',
+                       help='Do not check or create the topic on the target')
+    parser.add_argument('--producer-args', type=str, default='',
+                       help='Extra arguments for orders_producer.py, e.g. --producer-args="--interval 0.1"')
+    parser.add_argument('--consumer-args', type=str, default='',
+                       help='Extra arguments for orders_consumer.py, e.g. --consumer-args="--lag-interval 2"')
+    args = parser.parse_args()
+
+    sys.exit(0 if cutover(args.env, args) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ set -e
 CONSUMER_PID_FILE="consumer.pid"
 PRODUCER_PID_FILE="producer.pid"
 LOG_DIR="logs"
+# Clients watch this file; retarget rewrites it and sends SIGHUP
+LIVE_ENV_FILE="env.live"
 
 # Colors for output
 RED='\033[0;31m'
@@ -66,8 +68,8 @@ start_consumer() {
     local env_file=$1
     log "Starting consumer with environment: $env_file"
     
-    source "$env_file"
-    nohup python3 orders_consumer.py > "$LOG_DIR/consumer.log" 2>&1 &
+    cp "$env_file" "$LIVE_ENV_FILE"
+    nohup python3 orders_consumer.py --env-file "$LIVE_ENV_FILE" > "$LOG_DIR/consumer.log" 2>&1 &
     echo $! > "$CONSUMER_PID_FILE"
     
     success "Consumer started (PID: $(cat $CONSUMER_PID_FILE))"
@@ -77,8 +79,8 @@ start_producer() {
     local env_file=$1
     log "Starting producer with environment: $env_file"
     
-    source "$env_file"
-    nohup python3 orders_producer.py > "$LOG_DIR/producer.log" 2>&1 &
+    cp "$env_file" "$LIVE_ENV_FILE"
+    nohup python3 orders_producer.py --env-file "$LIVE_ENV_FILE" > "$LOG_DIR/producer.log" 2>&1 &
     echo $! > "$PRODUCER_PID_FILE"
     
     success "Producer started (PID: $(cat $PRODUCER_PID_FILE))"
@@ -118,6 +120,31 @@ cutover() {
     log "Check logs in $LOG_DIR/ for process output"
 }
 
+retarget() {
+    local target_env=$1
+    local env_file="env.$target_env"
+    
+    if [ ! -f "$env_file" ]; then
+        error "Environment file $env_file not found!"
+        exit 1
+    fi
+    
+    log "🔀 Retargeting running clients to $target_env in place..."
+    
+    # Clients build and warm up the new connection, drain, commit and swap without restarting
+    cp "$env_file" "$LIVE_ENV_FILE"
+    local pid_file
+    for pid_file in "$CONSUMER_PID_FILE" "$PRODUCER_PID_FILE"; do
+        if [ -f "$pid_file" ] && kill -0 "$(cat "$pid_file")" 2>/dev/null; then
+            kill -SIGHUP "$(cat "$pid_file")"
+        else
+            warning "No running process for $pid_file; use cutover to start it"
+        fi
+    done
+    
+    success "Retarget to $target_env requested; pause times are logged as '🔀 Retargeted' in $LOG_DIR/"
+}
+
 status() {
     log "Process Status:"
     echo "=================="
@@ -149,18 +176,22 @@ status() {
 }
 
 usage() {
-    echo "Usage: $0 {cutover|status|stop}"
+    echo "Usage: $0 {cutover|retarget|status|stop}"
     echo ""
     echo "Commands:"
     echo "  cutover <env>  - Switch to specified environment (msk, msk-scram, gateway, cc)"
+    echo "  retarget <env> - Switch running clients in place, without restarting them"
     echo "  status         - Show current process status"
     echo "  stop           - Stop all processes"
     echo ""
     echo "Examples:"
     echo "  $0 cutover cc      # Switch to Confluent Cloud"
     echo "  $0 cutover msk     # Switch back to MSK"
+    echo "  $0 retarget cc     # Switch running clients to Confluent Cloud in place"
     echo "  $0 status          # Check process status"
     echo "  $0 stop            # Stop all processes"
+    echo ""
+    echo "For a cutover that waits on client readiness and reports downtime: python3 cutover.py <env>"
 }
 
 # Main script logic
@@ -180,6 +211,15 @@ case "$1" in
         
         cutover "$2"
         ;;
+    retarget)
+        if [[ "$2" != "msk" && "$2" != "msk-scram" && "$2" != "gateway" && "$2" != "cc" ]]; then
+            error "Invalid environment: ${2:-none}"
+            error "Valid environments: msk, msk-scram, gateway, cc"
+            exit 1
+        fi
+        
+        retarget "$2"
+        ;;
     status)
         status
         ;;
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Cutover downtime benchmark against local broker stand-ins.
+Runs OrdersProducer and OrdersConsumer at a fixed rate through a local TCP
+proxy that replays the gateway phases of the migration:
+  passthrough  proxy forwards to broker A (gateway-passthrough.yaml)
+  fenced       new connections are refused and open ones dropped, so clients
+               see the cluster as unavailable (gateway-fenced.yaml)
+  switchover   proxy forwards to broker B (gateway-switchover.yaml)
+and reports the longest produce and consume gaps, client errors and how long
+each side took to recover after the switch. Use --producer-setting and
+--consumer-setting to try retry and timeout values offline.
+
+Clients only stay on the proxy if the brokers advertise it, so start both
+single-node brokers with the same node id, advertised listener
+PLAINTEXT://localhost:<proxy-port> and the orders topic already created.
+"""
+
+import os
+import socket
+import threading
+import time
+import argparse
+from typing import Any, Dict, List, Optional, Tuple
+
+from client_logging import RecordLogger
+from kafka_engines import ENGINES
+from load_generator import TokenBucket
+from orders_consumer import OrdersConsumer
+from orders_producer import OrdersProducer
+
+Address = Tuple[str, int]
+
+
+def _address(value: str) -> Address:
+    host, _, port = value.rpartition(':')
+    return host or 'localhost', int(port)
+
+
+class SwitchableProxy:
+    """TCP proxy whose upstream can be changed, or cut off, while clients are connected"""
+
+    def __init__(self, port: int, target: Optional[Address]):
+        self.target = target
+        self.lock = threading.Lock()
+        self.connections: List[Tuple[socket.socket, socket.socket]] = []
+        self.refused = 0
+        self.server = socket.create_server(('localhost', port))
+        self.port = self.server.getsockname()[1]
+        self.running = True
+        threading.Thread(target=self._accept_loop, name="proxy-accept", daemon=True).start()
+
+    def switch(self, target: Optional[Address]):
+        """Route new connections to `target` (None refuses them) and drop every open one"""
+        with self.lock:
+            self.target = target
+            connections, self.connections = self.connections, []
+        for pair in connections:
+            self._close(pair)
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                return
+            with self.lock:
+                target = self.target
+            if target is None:
+                self.refused += 1
+                client.close()
+                continue
+            try:
+                upstream = socket.create_connection(target, timeout=5)
+                upstream.settimeout(None)
+            except OSError:
+                self.refused += 1
+                client.close()
+                continue
+            pair = (client, upstream)
+            with self.lock:
+                self.connections.append(pair)
+            threading.Thread(target=self._pump, args=(client, upstream, pair), daemon=True).start()
+            threading.Thread(target=self._pump, args=(upstream, client, pair), daemon=True).start()
+
+    def _pump(self, source: socket.socket, destination: socket.socket, pair):
+        try:
+            while True:
+                data = source.recv(65536)
+                if not data:
+                    break
+                destination.sendall(data)
+        except OSError:
+            pass
+        self._close(pair)
+        with self.lock:
+            if pair in self.connections:
+                self.connections.remove(pair)
+
+    @staticmethod
+    def _close(pair):
+        for sock in pair:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    def close(self):
+        self.running = False
+        self.server.close()
+        self.switch(None)
+
+
+class GapTracker:
+    """Longest pause between successive acks or polled records, and recovery after a marked switch"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.errors = 0
+        self.last: Optional[float] = None
+        self.max_gap = 0.0
+        self.max_gap_started: Optional[float] = None
+        self.switched_at: Optional[float] = None
+        self.recovered_at: Optional[float] = None
+
+    def observe(self, count: int = 1):
+        now = time.monotonic()
+        with self.lock:
+            if self.last is not None and now - self.last > self.max_gap:
+                self.max_gap = now - self.last
+                self.max_gap_started = self.last
+            self.last = now
+            self.count += count
+            if self.switched_at is not None and self.recovered_at is None:
+                self.recovered_at = now
+
+    def error(self):
+        with self.lock:
+            self.errors += 1
+
+    def mark_switch(self):
+        with self.lock:
+            self.switched_at = time.monotonic()
+            self.recovered_at = None
+
+    def result(self, started_at: float) -> Dict[str, Any]:
+        with self.lock:
+            max_gap, gap_started = self.max_gap, self.max_gap_started
+            # A side that never came back is still in its gap
+            if self.last is not None and time.monotonic() - self.last > max_gap:
+                max_gap, gap_started = time.monotonic() - self.last, self.last
+            recovery = None
+            if self.switched_at is not None and self.recovered_at is not None:
+                recovery = self.recovered_at - self.switched_at
+            return {
+                "count": self.count,
+                "errors": self.errors,
+                "max_gap": max_gap,
+                "gap_started": gap_started - started_at if gap_started is not None else None,
+                "recovery": recovery,
+            }
+
+
+class TrackedProducer(OrdersProducer):
+    """OrdersProducer that reports acks and failed sends to a GapTracker"""
+
+    def __init__(self, tracker: GapTracker, **kwargs):
+        super().__init__(**kwargs)
+        self.tracker = tracker
+
+    def _on_delivery(self, order_id, sent_at, exc, record_metadata):
+        if exc is None:
+            self.tracker.observe()
+        else:
+            self.tracker.error()
+        super()._on_delivery(order_id, sent_at, exc, record_metadata)
+
+
+def produce_loop(producer: TrackedProducer, rate: float, stop: threading.Event):
+    topic_name = producer.config_manager.get_active_config().topic_name
+    bucket = TokenBucket(rate, burst=max(rate / 10, 1))
+    stream = producer.order_stream()
+    while not stop.is_set():
+        bucket.acquire()
+        order_id, value = next(stream)
+        if not producer.send_value_async(order_id, value, topic_name):
+            # A send that raised never reaches the delivery callback
+            producer.tracker.error()
+    producer.producer.flush(timeout=10)
+
+
+def consume_loop(consumer: OrdersConsumer, tracker: GapTracker, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            batch = consumer.consumer.poll(timeout_ms=200)
+        except Exception as e:
+            tracker.error()
+            consumer.log.error(f"❌ Poll failed: {e}", event="poll_failed", error=str(e))
+            time.sleep(0.1)
+            continue
+        records = 0
+        for partition, messages in batch.items():
+            consumer.commits.mark(partition, messages[-1].offset, len(messages))
+            records += len(messages)
+        if records:
+            tracker.observe(records)
+        try:
+            consumer.commits.maybe_commit()
+        except Exception:
+            tracker.error()
+
+
+def _parse_settings(pairs: List[str]) -> Dict[str, Any]:
+    """KEY=VALUE pairs with kafka-python setting names; numeric values become ints or floats"""
+    settings = {}
+    for pair in pairs:
+        key, _, value = pair.partition('=')
+        for convert in (int, float):
+            try:
+                value = convert(value)
+                break
+            except ValueError:
+                continue
+        settings[key.strip()] = value
+    return settings
+
+
+def benchmark_cutover(args) -> Dict[str, Dict[str, Any]]:
+    proxy = SwitchableProxy(args.proxy_port, _address(args.broker_a))
+    # Both clients bootstrap through the proxy via the `local` environment
+    os.environ['KAFKA_ENV'] = 'local'
+    os.environ['LOCAL_BOOTSTRAP_SERVERS'] = f"localhost:{proxy.port}"
+    print(f"🔌 Proxy on localhost:{proxy.port} -> {args.broker_a}")
+
+    produced, consumed = GapTracker(), GapTracker()
+    record_logger = RecordLogger(every_seconds=60)
+    producer = TrackedProducer(produced, engine=args.engine, record_logger=record_logger)
+    producer.producer_settings.update(_parse_settings(args.producer_setting))
+    consumer = OrdersConsumer(group_id=f"cutover-benchmark-{int(time.time())}", engine=args.engine,
+                              record_logger=record_logger, lag_interval=0,
+                              settings_overrides=_parse_settings(args.consumer_setting))
+    stop = threading.Event()
+    threads = []
+    try:
+        producer.setup_producer()
+        producer.start_pipeline(args.window)
+        consumer.setup_consumer()
+        threads = [threading.Thread(target=produce_loop, args=(producer, args.rate, stop), daemon=True),
+                   threading.Thread(target=consume_loop, args=(consumer, consumed, stop), daemon=True)]
+        for thread in threads:
+            thread.start()
+
+        started_at = time.monotonic()
+        schedule = [
+            (args.fence_at, "fenced", None),
+            (args.fence_at + args.fence_seconds, "switchover", _address(args.broker_b)),
+        ]
+        for at, phase, target in schedule:
+            time.sleep(max(0.0, started_at + at - time.monotonic()))
+            proxy.switch(target)
+            if target is not None:
+                produced.mark_switch()
+                consumed.mark_switch()
+            print(f"🔀 {time.monotonic() - started_at:6.1f}s  {phase}" + (f" -> {args.broker_b}" if target else ""))
+        time.sleep(max(0.0, started_at + args.duration - time.monotonic()))
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=15)
+        if producer.producer:
+            producer.producer.close()
+        if consumer.consumer:
+            consumer.consumer.close()
+        proxy.close()
+        record_logger.close()
+
+    print(f"🚫 Connections refused by the proxy: {proxy.refused}")
+    return {"produce": produced.result(started_at), "consume": consumed.result(started_at)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure producer/consumer stalls across a '
+                                                 'passthrough -> fenced -> switchover cutover')
+    parser.add_argument('--broker-a', type=str, default='localhost:9092',
+                       help='Broker the proxy starts on (default: localhost:9092)')
+    parser.add_argument('--broker-b', type=str, default='localhost:9093',
+                       help='Broker the proxy switches to (default: localhost:9093)')
+    parser.add_argument('--proxy-port', type=int, default=19092,
+                       help='Port the proxy listens on; both brokers must advertise it (default: 19092)')
+    parser.add_argument('--rate', type=float, default=200.0,
+                       help='Orders per second (default: 200)')
+    parser.add_argument('--window', type=int, default=1000,
+                       help='Max in-flight sends (default: 1000)')
+    parser.add_argument('--duration', type=float, default=60.0,
+                       help='Total run time in seconds (default: 60)')
+    parser.add_argument('--fence-at', type=float, default=15.0,
+                       help='Seconds into the run when the proxy fences (default: 15)')
+    parser.add_argument('--fence-seconds', type=float, default=10.0,
+                       help='How long clients stay fenced before the switchover (default: 10)')
+    parser.add_argument('--engine', choices=list(ENGINES), default='kafka-python',
+                       help='Kafka client engine (default: kafka-python)')
+    parser.add_argument('--producer-setting', action='append', default=[], metavar='KEY=VALUE',
+                       help='Producer setting (kafka-python name), e.g. retries=10; repeatable')
+    parser.add_argument('--consumer-setting', action='append', default=[], metavar='KEY=VALUE',
+                       help='Consumer setting (kafka-python name), e.g. request_timeout_ms=15000; repeatable')
+
+    args = parser.parse_args()
+    if args.fence_at + args.fence_seconds >= args.duration:
+        parser.error("--duration must extend past --fence-at + --fence-seconds")
+
+    results = benchmark_cutover(args)
+
+    print("=" * 72)
+    print(f"{'side':<9} {'records':>9} {'errors':>7} {'max gap ms':>11} {'gap at s':>9} {'recovery ms':>12}")
+    for side, result in results.items():
+        gap_at = f"{result['gap_started']:.1f}" if result['gap_started'] is not None else "-"
+        recovery = f"{result['recovery'] * 1000:,.1f}" if result['recovery'] is not None else "never"
+        print(f"{side:<9} {result['count']:>9} {result['errors']:>7} {result['max_gap'] * 1000:>11,.1f} "
+              f"{gap_at:>9} {recovery:>12}")
+    print("Recovery is measured from the switchover to the first ack/record on broker B.")
+
+
+if __name__ == "__main__":
+    main()
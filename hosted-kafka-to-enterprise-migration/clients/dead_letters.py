@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Dead-letter queue for orders the consumer cannot process.
+Records that fail decoding or validation are forwarded, with their original
+key and value bytes, to a DLQ topic. The error reason, source topic,
+partition and offset, and the consumer group travel as headers, along with
+the record's own headers, so the data can be inspected and replayed.
+Writes go through a dedicated producer fed by a background thread. Its
+linger and batch settings group DLQ sends, so bad data only slows the
+poll loop when the queue in front of the writer is full; then send()
+waits for room rather than dropping the record. Until a dead letter is
+acknowledged its source offset is reported by unacked(), and the
+CommitManager does not commit past it, so a crash before delivery
+re-reads the record instead of losing it. A failed write is retried with
+exponential backoff; once a letter runs out of attempts, failure is set
+and the consumer stops rather than sit on a hold that never clears.
+"""
+
+import heapq
+import itertools
+import queue
+import threading
+import time
+from functools import partial
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from client_metrics import MetricsRegistry
+from kafka_engines import PRODUCER_ENGINES, TopicPartition
+
+_STOP = object()
+
+# Batch DLQ writes; latency here does not matter, throughput on a bad-data burst does
+DLQ_PRODUCER_SETTINGS = {
+    'acks': 'all',
+    'retries': 5,
+    'linger_ms': 100,
+    'batch_size': 65536,
+    'compression_type': 'gzip',
+}
+
+# Ceiling for the doubling delay between attempts at one dead letter
+MAX_RETRY_BACKOFF = 30.0
+
+
+class DeadLetter:
+    """Stands in for a record's value when it cannot be processed"""
+    __slots__ = ('raw', 'kind', 'reason')
+
+    def __init__(self, raw: Optional[bytes], kind: str, reason: str):
+        # kind is "decode_error" or "invalid_order"
+        self.raw = raw
+        self.kind = kind
+        self.reason = reason
+
+    def __repr__(self) -> str:
+        return f"DeadLetter({self.kind}: {self.reason})"
+
+
+class DeadLetterQueue:
+    """Asynchronous, batching producer for dead-lettered records"""
+
+    def __init__(self, config_manager, topic: str, group_id: str, metrics: MetricsRegistry, log,
+                 engine: str = "kafka-python", max_queue: int = 10000, max_batch: int = 500,
+                 max_attempts: int = 8, retry_backoff: float = 0.5):
+        self.topic = topic
+        self.group_id = group_id.encode()
+        self.log = log
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.producer = PRODUCER_ENGINES[engine](
+            config_manager,
+            key_serializer=lambda key: key,
+            value_serializer=lambda value: value,
+            settings=DLQ_PRODUCER_SETTINGS,
+        )
+
+        self.queue = queue.Queue(maxsize=max_queue)
+        # Source offsets per partition whose dead letter has not been acknowledged yet
+        self.pending: Dict[TopicPartition, Set[int]] = {}
+        self.lock = threading.Lock()
+        # (due time, tiebreak, entry) of failed writes waiting for their next attempt
+        self.retries: List[Tuple[float, int, tuple]] = []
+        self.retry_ids = itertools.count()
+        # Error of a dead letter that ran out of attempts; the consumer stops on it
+        self.failure: Optional[Exception] = None
+        help_text = "Records forwarded to the dead-letter topic"
+        self.sent_total = metrics.counter("dlq_records_total", help_text, result="sent")
+        self.retried_total = metrics.counter("dlq_records_total", help_text, result="retried")
+        self.failed_total = metrics.counter("dlq_records_total", help_text, result="failed")
+        self.waited_total = metrics.counter("dlq_backpressure_total",
+                                            "Dead letters that waited for room in the DLQ queue")
+        metrics.gauge("dlq_queue_depth", "Dead letters waiting for the DLQ producer", self.queue.qsize)
+        metrics.gauge("dlq_unacked", "Dead letters not acknowledged by the DLQ topic yet",
+                      lambda: sum(len(offsets) for offsets in list(self.pending.values())))
+
+        self.writer = threading.Thread(target=self._write_loop, name="dlq-writer", daemon=True)
+        self.writer.start()
+
+    def send(self, message, letter: DeadLetter):
+        """Queue a failed record; blocks while the queue is full so no dead letter is dropped"""
+        reason = f"{letter.kind}: {letter.reason}"
+        source = TopicPartition(message.topic, message.partition)
+        key = message.key.encode('utf-8') if isinstance(message.key, str) else message.key
+        headers: List[Tuple[str, bytes]] = list(message.headers or ()) + [
+            ('dlq_reason', reason.encode('utf-8', 'replace')),
+            ('dlq_source_topic', message.topic.encode()),
+            ('dlq_source_partition', str(message.partition).encode()),
+            ('dlq_source_offset', str(message.offset).encode()),
+            ('dlq_consumer_group', self.group_id),
+        ]
+        # Held before it is queued, so the offset can never be committed ahead of the send
+        with self.lock:
+            self.pending.setdefault(source, set()).add(message.offset)
+        # The last field counts failed attempts
+        entry = (key, letter.raw, headers, source, message.offset, 0)
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            self.waited_total.inc()
+            self.log.error(f"⚠️  DLQ queue full, waiting for the DLQ producer (partition {message.partition} "
+                           f"offset {message.offset})", event="dlq_backpressure",
+                           partition=message.partition, offset=message.offset, reason=reason)
+            self.queue.put(entry)
+
+    def unacked(self) -> Dict[TopicPartition, int]:
+        """Lowest source offset per partition whose dead letter has not been acknowledged"""
+        with self.lock:
+            return {source: min(offsets) for source, offsets in self.pending.items() if offsets}
+
+    def _on_delivery(self, entry: tuple, exc, _metadata):
+        key, value, headers, source, offset, failures = entry
+        if exc is None:
+            self.sent_total.inc()
+            with self.lock:
+                self.pending.get(source, set()).discard(offset)
+            return
+
+        # Stays pending either way: commits for the partition stop short of it until it is written
+        failures += 1
+        if failures < self.max_attempts:
+            delay = min(self.retry_backoff * 2 ** (failures - 1), MAX_RETRY_BACKOFF)
+            self.retried_total.inc()
+            self.log.error(f"⚠️  Failed to write dead letter for partition {source.partition} offset {offset}, "
+                           f"retrying in {delay:.1f}s: {exc}", event="dlq_retry",
+                           partition=source.partition, offset=offset, attempt=failures, error=str(exc))
+            with self.lock:
+                heapq.heappush(self.retries, (time.monotonic() + delay, next(self.retry_ids),
+                                              (key, value, headers, source, offset, failures)))
+            return
+
+        self.failed_total.inc()
+        self.failure = exc
+        self.log.error(f"❌ Failed to write dead letter for partition {source.partition} offset {offset} "
+                       f"after {failures} attempts, offsets from there on stay uncommitted: {exc}",
+                       event="dlq_failed", partition=source.partition, offset=offset, error=str(exc))
+
+    def _due_retries(self) -> List[tuple]:
+        now = time.monotonic()
+        with self.lock:
+            due = []
+            while self.retries and self.retries[0][0] <= now:
+                due.append(heapq.heappop(self.retries)[2])
+            return due
+
+    def _write_loop(self):
+        while True:
+            batch = self._due_retries()
+            try:
+                batch.append(self.queue.get(block=not batch, timeout=0.5))
+            except queue.Empty:
+                if not batch:
+                    # Serve delivery reports for engines that need polling
+                    self.producer.poll(0)
+                    continue
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for entry in batch:
+                if entry is _STOP:
+                    continue
+                key, value, headers, source, offset, _failures = entry
+                on_delivery = partial(self._on_delivery, entry)
+                try:
+                    self.producer.send(self.topic, key, value, on_delivery, headers=headers)
+                except Exception as e:
+                    on_delivery(e, None)
+            self.producer.poll(0)
+            if any(entry is _STOP for entry in batch):
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        return {"sent": self.sent_total.value, "retried": self.retried_total.value,
+                "failed": self.failed_total.value, "waited": self.waited_total.value}
+
+    def close(self, timeout: float = 30.0):
+        """Hand over everything queued and wait for the producer to deliver it.
+
+        Letters still waiting for a retry are not written; their holds keep the
+        offsets uncommitted, so the next run re-reads them.
+        """
+        self.queue.put(_STOP)
+        self.writer.join(timeout)
+        self.producer.flush(timeout)
+        self.producer.close()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency from producer send to consumer receipt.
+The producer stamps each record with its send time as an 8-byte big-endian
+epoch-nanosecond header; the consumer unpacks it with struct, so no string
+parsing happens per record. Records without the header (older producers,
+Kafka Connect) fall back to the Kafka CreateTime timestamp in milliseconds.
+
+Wall-clock time is used because monotonic clocks are not comparable across
+processes or hosts. Keep producer and consumer hosts NTP-synced; readings
+that come out negative because of clock skew are counted and recorded as 0.
+"""
+
+import struct
+import time
+from typing import Dict, List, Tuple
+
+from client_metrics import LatencyHistogram, MetricsRegistry
+
+SENT_AT_HEADER = 'sent_at_ns'
+_SENT_AT = struct.Struct('>q')
+
+
+def sent_at_headers() -> List[Tuple[str, bytes]]:
+    """Record headers carrying the current send time"""
+    return [(SENT_AT_HEADER, _SENT_AT.pack(time.time_ns()))]
+
+
+class EndToEndLatency:
+    """Per-partition end-to-end latency histograms labelled with the Kafka environment"""
+
+    def __init__(self, metrics: MetricsRegistry, env: str):
+        self.metrics = metrics
+        self.env = env
+        self.histograms: Dict[int, LatencyHistogram] = {}
+        self.clock_skew_total = metrics.counter("end_to_end_clock_skew_total",
+                                                "Records stamped later than they were received", env=env)
+
+    def _histogram(self, partition: int) -> LatencyHistogram:
+        histogram = self.histograms.get(partition)
+        if histogram is None:
+            histogram = self.histograms[partition] = self.metrics.histogram(
+                "end_to_end_latency_seconds", "Latency from producer send to consumer receipt in seconds",
+                env=self.env, partition=str(partition))
+        return histogram
+
+    def record(self, message, received_ns: int = None):
+        """Record one message's latency; pass received_ns to share one clock read across a batch"""
+        received_ns = received_ns or time.time_ns()
+        for key, value in message.headers or ():
+            if key == SENT_AT_HEADER and len(value) == _SENT_AT.size:
+                sent_ns = _SENT_AT.unpack(value)[0]
+                break
+        else:
+            if message.timestamp is None or message.timestamp < 0:
+                return
+            sent_ns = message.timestamp * 1_000_000
+
+        latency_ns = received_ns - sent_ns
+        if latency_ns < 0:
+            self.clock_skew_total.inc()
+            latency_ns = 0
+        self._histogram(message.partition).record(latency_ns / 1e9)
+
+    def record_batch(self, message_batch: Dict) -> None:
+        """Record every message of a poll batch against one receive time"""
+        received_ns = time.time_ns()
+        for messages in message_batch.values():
+            for message in messages:
+                self.record(message, received_ns)
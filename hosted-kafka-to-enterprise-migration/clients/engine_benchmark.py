@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Side-by-side benchmark of the kafka-python and confluent-kafka engines.
+For each engine, produces a fixed number of orders through OrdersProducer's
+pipelined path, then consumes the same number with a fresh consumer group
+through OrdersConsumer's engine, and reports msgs/s for both directions.
+"""
+
+import time
+import argparse
+from typing import Dict, Any
+
+from client_logging import RecordLogger
+from kafka_engines import ENGINES
+from order_serde import SERDES
+from orders_consumer import OrdersConsumer
+from orders_producer import OrdersProducer
+
+
+def benchmark_produce(engine: str, orders: int, window: int, serde: str) -> Dict[str, Any]:
+    producer = OrdersProducer(serde=serde, engine=engine, record_logger=RecordLogger(every_seconds=60))
+    try:
+        producer.setup_producer()
+        topic_name = producer.config_manager.get_active_config().topic_name
+        producer.start_pipeline(window)
+
+        stream = producer.order_stream()
+        for _ in range(orders):
+            order_id, value = next(stream)
+            producer.send_value_async(order_id, value, topic_name)
+        producer.producer.flush()
+
+        elapsed = time.monotonic() - producer.pipeline_started_at
+        return {
+            "rate": producer.orders_acked / elapsed,
+            "failed": producer.orders_failed,
+            "p99_ms": producer.send_to_ack_latency.percentile(0.99) * 1000,
+        }
+    finally:
+        if producer.producer:
+            producer.producer.close()
+        producer.log.close()
+
+
+def benchmark_consume(engine: str, orders: int, serde: str, timeout: float) -> Dict[str, Any]:
+    group_id = f"engine-benchmark-{engine}-{int(time.time())}"
+    consumer = OrdersConsumer(group_id=group_id, serde=serde, engine=engine,
+                              record_logger=RecordLogger(every_seconds=60))
+    try:
+        consumer.setup_consumer()
+        consumed = 0
+        started = None
+        deadline = time.monotonic() + timeout
+        while consumed < orders and time.monotonic() < deadline:
+            batch = consumer.consumer.poll(timeout_ms=1000)
+            if batch and started is None:
+                # Start timing at the first records so the group join isn't counted
+                started = time.monotonic()
+            consumed += sum(len(records) for records in batch.values())
+
+        elapsed = time.monotonic() - started if started else 0.0
+        return {"rate": consumed / elapsed if elapsed else 0.0, "consumed": consumed}
+    finally:
+        if consumer.consumer:
+            consumer.consumer.close()
+        consumer.log.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare kafka-python and confluent-kafka engines')
+    parser.add_argument('--engines', type=str, default=','.join(ENGINES),
+                       help=f'Comma-separated engines to compare (default: {",".join(ENGINES)})')
+    parser.add_argument('--orders', type=int, default=50000,
+                       help='Orders to produce and consume per engine (default: 50000)')
+    parser.add_argument('--window', type=int, default=5000,
+                       help='Max in-flight sends (default: 5000)')
+    parser.add_argument('--serde', choices=list(SERDES), default='json',
+                       help='Value serde (default: json)')
+    parser.add_argument('--consume-timeout', type=float, default=60.0,
+                       help='Give up consuming after this many seconds (default: 60)')
+    parser.add_argument('--env', choices=['msk', 'msk-scram', 'gateway', 'cc', 'local'],
+                       help='Kafka environment (overrides KAFKA_ENV)')
+
+    args = parser.parse_args()
+
+    if args.env:
+        import os
+        os.environ['KAFKA_ENV'] = args.env
+
+    engines = [e.strip() for e in args.engines.split(',') if e.strip()]
+    unknown = set(engines) - set(ENGINES)
+    if unknown:
+        parser.error(f"Unknown engines: {', '.join(sorted(unknown))}")
+
+    results = {}
+    for engine in engines:
+        print(f"⏱️  Benchmarking {engine} with {args.orders} orders...")
+        try:
+            produce = benchmark_produce(engine, args.orders, args.window, args.serde)
+            consume = benchmark_consume(engine, args.orders, args.serde, args.consume_timeout)
+            results[engine] = (produce, consume)
+        except Exception as e:
+            print(f"❌ {engine} skipped: {e}")
+
+    print("=" * 72)
+    print(f"{'engine':<14} {'produce msgs/s':>15} {'ack p99 ms':>11} {'failed':>7} "
+          f"{'consume msgs/s':>15} {'consumed':>9}")
+    for engine, (produce, consume) in results.items():
+        print(f"{engine:<14} {produce['rate']:>15,.0f} {produce['p99_ms']:>11.1f} {produce['failed']:>7} "
+              f"{consume['rate']:>15,.0f} {consume['consumed']:>9}")
+
+
+if __name__ == "__main__":
+    main()
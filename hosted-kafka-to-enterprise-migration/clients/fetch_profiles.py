@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Consumer fetch profiles and an adaptive fetch controller.
+Named profiles trade latency for records per fetch. The adaptive mode starts
+from "balanced" and, after every poll, resizes max_poll_records from observed
+batch fill and per-record processing time so a batch always finishes well
+inside max_poll_interval_ms; on engines that allow it, fetch_min_bytes and
+fetch_max_wait_ms follow the same signal.
+"""
+
+from typing import Any, Dict, Optional
+
+from client_metrics import MetricsRegistry
+
+# kafka-python option names, translated per engine like the other consumer settings
+FETCH_PROFILES: Dict[str, Dict[str, Any]] = {
+    "low-latency": {
+        'fetch_min_bytes': 1,
+        'fetch_max_wait_ms': 10,
+        'max_poll_records': 100,
+        'max_partition_fetch_bytes': 256 * 1024,
+    },
+    "balanced": {
+        'fetch_min_bytes': 64 * 1024,
+        'fetch_max_wait_ms': 100,
+        'max_poll_records': 1000,
+        'max_partition_fetch_bytes': 1024 * 1024,
+    },
+    "bulk": {
+        'fetch_min_bytes': 1024 * 1024,
+        'fetch_max_wait_ms': 500,
+        'max_poll_records': 5000,
+        'max_partition_fetch_bytes': 8 * 1024 * 1024,
+        'fetch_max_bytes': 64 * 1024 * 1024,
+    },
+}
+
+FETCH_MODES = list(FETCH_PROFILES) + ["adaptive"]
+
+MIN_POLL_RECORDS = 50
+MAX_POLL_RECORDS = 20000
+MAX_FETCH_MIN_BYTES = 1024 * 1024
+MAX_FETCH_WAIT_MS = 500
+MIN_FETCH_WAIT_MS = 10
+
+
+def fetch_settings(mode: str) -> Dict[str, Any]:
+    """Consumer settings for a profile; adaptive starts from balanced"""
+    if mode not in FETCH_MODES:
+        raise ValueError(f"Unknown fetch profile: {mode}. Choose from: {', '.join(FETCH_MODES)}")
+    return dict(FETCH_PROFILES["balanced" if mode == "adaptive" else mode])
+
+
+class AdaptiveFetchController:
+    """Adjusts poll size and fetch thresholds from batch fill and processing time.
+
+    Full batches mean there is a backlog, so fetches grow; sparse batches mean
+    the consumer is caught up, so fetch thresholds shrink back toward low
+    latency. max_records is capped so that a batch takes at most
+    `poll_budget` of max_poll_interval_ms to process.
+    """
+
+    def __init__(self, settings: Dict[str, Any], metrics: MetricsRegistry, max_poll_interval_ms: int = 300000,
+                 poll_budget: float = 0.2, smoothing: float = 0.2):
+        self.max_records = settings['max_poll_records']
+        self.fetch_min_bytes = settings['fetch_min_bytes']
+        self.fetch_max_wait_ms = settings['fetch_max_wait_ms']
+        self.budget_seconds = max_poll_interval_ms / 1000 * poll_budget
+        self.smoothing = smoothing
+
+        self.per_record_seconds = None
+        self.fill = None
+
+        metrics.gauge("fetch_max_poll_records", "Current max records per poll", lambda: self.max_records)
+        metrics.gauge("fetch_min_bytes", "Current fetch_min_bytes", lambda: self.fetch_min_bytes)
+        metrics.gauge("fetch_max_wait_ms", "Current fetch_max_wait_ms", lambda: self.fetch_max_wait_ms)
+        metrics.gauge("fetch_batch_fill", "Smoothed fraction of max_poll_records filled per poll",
+                      lambda: self.fill or 0.0)
+
+    def _smooth(self, previous, value):
+        return value if previous is None else previous + self.smoothing * (value - previous)
+
+    def observe(self, records: int, processing_seconds: float, processed: Optional[int] = None) -> bool:
+        """Feed one poll's outcome; returns True when fetch thresholds changed.
+
+        `processed` is how many records `processing_seconds` was spent on, when
+        that is not the polled batch itself (worker threads finish records
+        from earlier polls); it defaults to `records`.
+        """
+        processed = records if processed is None else processed
+        self.fill = self._smooth(self.fill, records / self.max_records)
+        if processed:
+            self.per_record_seconds = self._smooth(self.per_record_seconds, processing_seconds / processed)
+
+        fetch = (self.fetch_min_bytes, self.fetch_max_wait_ms)
+        if self.fill > 0.9:
+            self.max_records = int(self.max_records * 1.5)
+            self.fetch_min_bytes = min(max(self.fetch_min_bytes * 2, 1024), MAX_FETCH_MIN_BYTES)
+            self.fetch_max_wait_ms = min(self.fetch_max_wait_ms * 2, MAX_FETCH_WAIT_MS)
+        elif self.fill < 0.25:
+            self.max_records = int(self.max_records * 0.8)
+            self.fetch_min_bytes = max(self.fetch_min_bytes // 2, 1)
+            self.fetch_max_wait_ms = max(self.fetch_max_wait_ms // 2, MIN_FETCH_WAIT_MS)
+
+        ceiling = MAX_POLL_RECORDS
+        if self.per_record_seconds:
+            ceiling = min(ceiling, int(self.budget_seconds / self.per_record_seconds))
+        self.max_records = max(MIN_POLL_RECORDS, min(self.max_records, ceiling))
+
+        return fetch != (self.fetch_min_bytes, self.fetch_max_wait_ms)
+
+    def fetch_overrides(self) -> Dict[str, int]:
+        return {'fetch_min_bytes': self.fetch_min_bytes, 'fetch_max_wait_ms': self.fetch_max_wait_ms}
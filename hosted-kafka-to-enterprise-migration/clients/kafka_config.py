@@ -1,8 +1,38 @@
 import os
+import signal
+import sys
+import threading
+import timeit
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, Mapping, Optional
 
-@dataclass
+# Environment variables the resolved config depends on; reload() only rebuilds when one changes
+CONFIG_INPUTS = (
+    "MSK_BOOTSTRAP_SERVERS", "MSK_SASL_USERNAME", "MSK_SASL_PASSWORD",
+    "GATEWAY_BOOTSTRAP_SERVERS", "GATEWAY_SASL_USERNAME", "GATEWAY_SASL_PASSWORD",
+    "CC_BOOTSTRAP_SERVERS", "CC_API_KEY", "CC_API_SECRET",
+    "LOCAL_BOOTSTRAP_SERVERS",
+)
+
+ReloadListener = Callable[["KafkaConfig", "KafkaConfig"], None]
+
+def read_env_file(path: str) -> Dict[str, str]:
+    """Variables set by `export KEY=value` lines in an env.* file"""
+    variables = {}
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('export '):
+                line = line[len('export '):]
+            key, sep, value = line.partition('=')
+            if sep:
+                variables[key.strip()] = value.strip().strip('"\'')
+    return variables
+
+# Frozen: one resolved instance is shared by every caller until the next reload
+@dataclass(frozen=True)
 class KafkaConfig:
     bootstrap_servers: str
     security_protocol: str
@@ -14,12 +44,31 @@ class KafkaConfig:
     topic_name: str = "orders"
 
 class ConfigManager:
-    def __init__(self):
+    def __init__(self, env_file: Optional[str] = None):
+        # Optional env.* file (export KEY=value lines) applied now and on every reload()
+        self.env_file = env_file
+        self.env_file_mtime = None
+        # Value each variable had before the env file set it (None: unset), restored if the file drops it
+        self.env_file_originals: Dict[str, Optional[str]] = {}
+        if env_file:
+            self._apply_env_file(self._read_env_file())
         self.active_config = os.getenv("KAFKA_ENV", "msk")  # Default to MSK
+        
+        # Resolved config and client dicts, rebuilt only when the inputs change
+        self.lock = threading.Lock()
+        self._inputs = None
+        self._config = None
+        self._dicts: Dict[str, Dict[str, Any]] = {}
+        self.listeners: List[ReloadListener] = []
+        # Background thread doing the reloads that SIGHUP requests and env file changes trigger
+        self.watcher = None
+        self.watch_interval = 2.0
+        self.watch_env_file = False
+        self.reload_requested = threading.Event()
     
-    def get_msk_config(self) -> KafkaConfig:
+    def get_msk_config(self, environ: Mapping[str, str] = os.environ) -> KafkaConfig:
         """MSK configuration with SASL/IAM (default for MSK)"""
-        bootstrap_servers = os.getenv("MSK_BOOTSTRAP_SERVERS")
+        bootstrap_servers = environ.get("MSK_BOOTSTRAP_SERVERS")
         if not bootstrap_servers:
             raise ValueError("MSK_BOOTSTRAP_SERVERS environment variable is not set")
         
@@ -30,14 +79,14 @@ class ConfigManager:
             client_id="orders-msk-iam-client"
         )
     
-    def get_msk_scram_config(self) -> KafkaConfig:
+    def get_msk_scram_config(self, environ: Mapping[str, str] = os.environ) -> KafkaConfig:
         """MSK configuration with SASL/SCRAM-SHA-512"""
-        bootstrap_servers = os.getenv("MSK_BOOTSTRAP_SERVERS")
+        bootstrap_servers = environ.get("MSK_BOOTSTRAP_SERVERS")
         if not bootstrap_servers:
             raise ValueError("MSK_BOOTSTRAP_SERVERS environment variable is not set")
         
-        sasl_username = os.getenv("MSK_SASL_USERNAME")
-        sasl_password = os.getenv("MSK_SASL_PASSWORD")
+        sasl_username = environ.get("MSK_SASL_USERNAME")
+        sasl_password = environ.get("MSK_SASL_PASSWORD")
         
         if not sasl_username or not sasl_password:
             raise ValueError("MSK_SASL_USERNAME and MSK_SASL_PASSWORD must be set for SCRAM authentication")
@@ -51,13 +100,13 @@ class ConfigManager:
             client_id="orders-msk-scram-client"
         )
     
-    def get_gateway_config(self) -> KafkaConfig:
+    def get_gateway_config(self, environ: Mapping[str, str] = os.environ) -> KafkaConfig:
         """Gateway configuration -- clients always connect here during migration.
         Uses SCRAM-SHA-512: passthrough to MSK before cutover, swap to CC after."""
-        bootstrap_servers = os.getenv("GATEWAY_BOOTSTRAP_SERVERS", "localhost:9595")
+        bootstrap_servers = environ.get("GATEWAY_BOOTSTRAP_SERVERS", "localhost:9595")
 
-        sasl_username = os.getenv("GATEWAY_SASL_USERNAME")
-        sasl_password = os.getenv("GATEWAY_SASL_PASSWORD")
+        sasl_username = environ.get("GATEWAY_SASL_USERNAME")
+        sasl_password = environ.get("GATEWAY_SASL_PASSWORD")
 
         if not sasl_username or not sasl_password:
             raise ValueError("GATEWAY_SASL_USERNAME and GATEWAY_SASL_PASSWORD must be set for Gateway authentication")
@@ -71,14 +120,14 @@ class ConfigManager:
             client_id="orders-gateway-client"
         )
 
-    def get_confluent_cloud_config(self) -> KafkaConfig:
+    def get_confluent_cloud_config(self, environ: Mapping[str, str] = os.environ) -> KafkaConfig:
         """Confluent Cloud configuration"""
-        bootstrap_servers = os.getenv("CC_BOOTSTRAP_SERVERS")
+        bootstrap_servers = environ.get("CC_BOOTSTRAP_SERVERS")
         if not bootstrap_servers:
             raise ValueError("CC_BOOTSTRAP_SERVERS environment variable is not set")
         
-        api_key = os.getenv("CC_API_KEY")
-        api_secret = os.getenv("CC_API_SECRET")
+        api_key = environ.get("CC_API_KEY")
+        api_secret = environ.get("CC_API_SECRET")
         
         if not api_key or not api_secret:
             raise ValueError("CC_API_KEY and CC_API_SECRET must be set for Confluent Cloud authentication")
@@ -92,24 +141,66 @@ class ConfigManager:
             client_id="orders-cc-client"
         )
     
-    def get_active_config(self) -> KafkaConfig:
-        """Get the currently active configuration"""
+    def get_local_config(self, environ: Mapping[str, str] = os.environ) -> KafkaConfig:
+        """Local PLAINTEXT broker, used for offline benchmarks and tuning"""
+        return KafkaConfig(
+            bootstrap_servers=environ.get("LOCAL_BOOTSTRAP_SERVERS", "localhost:9092"),
+            security_protocol="PLAINTEXT",
+            client_id="orders-local-client"
+        )
+    
+    def _resolve(self, env: str, environ: Mapping[str, str] = os.environ) -> KafkaConfig:
+        """Build and validate the configuration for `env` from `environ` (default: the process environment)"""
         config_map = {
             "msk": self.get_msk_config,
             "msk-scram": self.get_msk_scram_config,
             "gateway": self.get_gateway_config,
-            "cc": self.get_confluent_cloud_config
+            "cc": self.get_confluent_cloud_config,
+            "local": self.get_local_config
         }
         
-        if self.active_config not in config_map:
-            raise ValueError(f"Unknown config: {self.active_config}")
+        if env not in config_map:
+            raise ValueError(f"Unknown config: {env}")
         
-        return config_map[self.active_config]()
+        return config_map[env](environ)
+    
+    @staticmethod
+    def _snapshot(env: str, environ: Mapping[str, str] = os.environ) -> tuple:
+        return (env,) + tuple(environ.get(name) for name in CONFIG_INPUTS)
+    
+    def get_active_config(self) -> KafkaConfig:
+        """Get the currently active configuration (cached; see reload())"""
+        config = self._config
+        if config is None:
+            with self.lock:
+                if self._config is None:
+                    self._inputs = self._snapshot(self.active_config)
+                    self._config = self._resolve(self.active_config)
+                config = self._config
+        return config
+    
+    def _client_dict(self, name: str, build: Callable[[KafkaConfig], Dict[str, Any]]) -> Dict[str, Any]:
+        # Callers get a copy so they can add client-specific settings
+        config = self.get_active_config()
+        cached = self._dicts.get(name)
+        if cached is None or cached[0] is not config:
+            cached = self._dicts[name] = (config, build(config))
+        return dict(cached[1])
     
     def get_kafka_config_dict(self) -> Dict[str, Any]:
         """Get configuration as dictionary for kafka-python"""
-        config = self.get_active_config()
-        
+        return self._client_dict("kafka-python", self._kafka_config_dict)
+    
+    def get_aiokafka_config_dict(self) -> Dict[str, Any]:
+        """Get configuration as dictionary for aiokafka (callers add ssl_context for SSL protocols)"""
+        return self._client_dict("aiokafka", self._aiokafka_config_dict)
+    
+    def get_confluent_kafka_config_dict(self) -> Dict[str, Any]:
+        """Get configuration as dictionary for confluent-kafka library"""
+        return self._client_dict("confluent", self._confluent_kafka_config_dict)
+    
+    @staticmethod
+    def _kafka_config_dict(config: KafkaConfig) -> Dict[str, Any]:
         kafka_config = {
             'bootstrap_servers': config.bootstrap_servers,
             'security_protocol': config.security_protocol,
@@ -151,10 +242,29 @@ class ConfigManager:
         
         return kafka_config
     
-    def get_confluent_kafka_config_dict(self) -> Dict[str, Any]:
-        """Get configuration as dictionary for confluent-kafka library"""
-        config = self.get_active_config()
+    @staticmethod
+    def _aiokafka_config_dict(config: KafkaConfig) -> Dict[str, Any]:
+        kafka_config = {
+            'bootstrap_servers': config.bootstrap_servers,
+            'security_protocol': config.security_protocol,
+            'client_id': config.client_id,
+            'request_timeout_ms': 40000,
+            'connections_max_idle_ms': 540000,
+        }
         
+        if config.sasl_mechanism:
+            kafka_config['sasl_mechanism'] = config.sasl_mechanism
+        
+        if config.sasl_username:
+            kafka_config['sasl_plain_username'] = config.sasl_username
+        
+        if config.sasl_password:
+            kafka_config['sasl_plain_password'] = config.sasl_password
+        
+        return kafka_config
+    
+    @staticmethod
+    def _confluent_kafka_config_dict(config: KafkaConfig) -> Dict[str, Any]:
         kafka_config = {
             'bootstrap.servers': config.bootstrap_servers,
             'security.protocol': config.security_protocol,
@@ -172,4 +282,135 @@ class ConfigManager:
         if config.sasl_password:
             kafka_config['sasl.password'] = config.sasl_password
         
-        return kafka_config 
+        return kafka_config
+    
+    def _read_env_file(self) -> Dict[str, str]:
+        self.env_file_mtime = os.stat(self.env_file).st_mtime_ns
+        return read_env_file(self.env_file)
+    
+    def _environ_with(self, variables: Dict[str, str]) -> Dict[str, str]:
+        """The process environment as it would be with `variables` as the env file's contents"""
+        environ = dict(os.environ)
+        for key, original in self.env_file_originals.items():
+            if key in variables:
+                continue
+            if original is None:
+                environ.pop(key, None)
+            else:
+                environ[key] = original
+        environ.update(variables)
+        return environ
+    
+    def _apply_env_file(self, variables: Dict[str, str]):
+        """Make os.environ match _environ_with(variables); variables the file no longer sets are restored"""
+        for key in [key for key in self.env_file_originals if key not in variables]:
+            original = self.env_file_originals.pop(key)
+            if original is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = original
+        for key, value in variables.items():
+            self.env_file_originals.setdefault(key, os.environ.get(key))
+            os.environ[key] = value
+    
+    def add_reload_listener(self, listener: ReloadListener):
+        """Call listener(old, new) whenever reload() changes the resolved config"""
+        self.listeners.append(listener)
+    
+    def reload(self) -> bool:
+        """Re-read the env file and environment; returns True if the resolved config changed.
+        
+        The new config is validated against the env file's contents before any of
+        them reach os.environ: an incomplete one raises ValueError and leaves both
+        the environment and the current config as they were.
+        """
+        with self.lock:
+            variables = self._read_env_file() if self.env_file else None
+            environ = os.environ if variables is None else self._environ_with(variables)
+            env = environ.get("KAFKA_ENV", self.active_config)
+            inputs = self._snapshot(env, environ)
+            previous = self._config
+            config = self._resolve(env, environ) if inputs != self._inputs else None
+            if variables is not None:
+                self._apply_env_file(variables)
+            if config is None:
+                return False
+            self.active_config = env
+            self._inputs = inputs
+            self._config = config
+        
+        if previous is None or config == previous:
+            return False
+        for listener in self.listeners:
+            listener(previous, config)
+        return True
+    
+    def _reload_and_report(self, reason: str):
+        try:
+            if self.reload():
+                config = self._config
+                print(f"🔁 Config reloaded ({reason}): {self.active_config} at {config.bootstrap_servers}")
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Config reload failed ({reason}), keeping current config: {e}")
+    
+    def install_reload_signal(self):
+        """Reload on SIGHUP (main thread only; no-op on platforms without SIGHUP).
+        
+        The handler only sets reload_requested and the watcher thread reloads:
+        the main thread may be interrupted while it holds self.lock.
+        """
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.reload_requested.set())
+            self._start_watcher()
+    
+    def watch(self, interval: float = 2.0):
+        """Reload in the background whenever the env file's mtime changes"""
+        if not self.env_file:
+            return
+        self.watch_interval = interval
+        self.watch_env_file = True
+        self._start_watcher()
+    
+    def _start_watcher(self):
+        if self.watcher:
+            return
+        
+        def poll():
+            while True:
+                if self.reload_requested.wait(self.watch_interval):
+                    self.reload_requested.clear()
+                    self._reload_and_report("SIGHUP")
+                    continue
+                if not self.watch_env_file:
+                    continue
+                try:
+                    mtime = os.stat(self.env_file).st_mtime_ns
+                except OSError:
+                    continue
+                if mtime != self.env_file_mtime:
+                    self._reload_and_report(f"{self.env_file} changed")
+        
+        self.watcher = threading.Thread(target=poll, name="config-watcher", daemon=True)
+        self.watcher.start()
+
+
+def benchmark(rounds: int = 5, number: int = 100000):
+    """Per-call cost of the cached lookups against rebuilding the config on every send"""
+    manager = ConfigManager()
+    manager.get_active_config()
+    cases = [
+        ("rebuild config", lambda: manager._resolve(manager.active_config)),
+        ("cached config", manager.get_active_config),
+        ("rebuild kafka dict", lambda: manager._kafka_config_dict(manager._resolve(manager.active_config))),
+        ("cached kafka dict", manager.get_kafka_config_dict),
+    ]
+    print(f"⏱️  ConfigManager benchmark ({manager.active_config}): {number} calls x {rounds} rounds")
+    print("-" * 40)
+    print(f"{'lookup':<20} {'us/call':>10}")
+    for name, fn in cases:
+        elapsed = min(timeit.repeat(fn, number=number, repeat=rounds))
+        print(f"{name:<20} {elapsed / number * 1e6:>10.3f}")
+
+
+if __name__ == "__main__":
+    benchmark(number=int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,595 @@
+#!/usr/bin/env python3
+"""
+Client engine abstraction so the orders producer and consumer run the same
+flow on kafka-python or on confluent-kafka (librdkafka).
+
+Settings are passed using kafka-python option names; the confluent engines
+translate them to librdkafka properties and build their connection config
+from ConfigManager.get_confluent_kafka_config_dict().
+"""
+
+import importlib.util
+import threading
+import time
+from collections import deque, namedtuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# kafka-python's package import pulls in the whole client (most of a client's start-up
+# import time); it is imported by the kafka-python engines, see _import_kafka_python()
+ConsumerRebalanceListener = KafkaAdminClient = KafkaConsumer = KafkaProducer = None
+KafkaError = KafkaTimeoutError = OffsetAndMetadata = None
+_KafkaPythonRebalanceListener = None
+
+# confluent-kafka loads librdkafka on import; only the confluent engines pay for it
+HAS_CONFLUENT_KAFKA = importlib.util.find_spec("confluent_kafka") is not None
+confluent_kafka = None
+
+# Shapes match kafka-python's namedtuples, so both engines hand back
+# interchangeable partitions, delivery reports and records.
+TopicPartition = namedtuple('TopicPartition', ['topic', 'partition'])
+DeliveryReport = namedtuple('DeliveryReport', ['topic', 'partition', 'offset'])
+ConsumerRecord = namedtuple('ConsumerRecord', ['topic', 'partition', 'offset', 'timestamp',
+                                               'key', 'value', 'headers'])
+
+# kafka-python option name -> librdkafka property
+CONFLUENT_PRODUCER_SETTINGS = {
+    'acks': 'acks',
+    'retries': 'retries',
+    'retry_backoff_ms': 'retry.backoff.ms',
+    'request_timeout_ms': 'request.timeout.ms',
+    'reconnect_backoff_ms': 'reconnect.backoff.ms',
+    'reconnect_backoff_max_ms': 'reconnect.backoff.max.ms',
+    'batch_size': 'batch.size',
+    'linger_ms': 'linger.ms',
+    'compression_type': 'compression.type',
+}
+
+CONFLUENT_CONSUMER_SETTINGS = {
+    'auto_offset_reset': 'auto.offset.reset',
+    'enable_auto_commit': 'enable.auto.commit',
+    'auto_commit_interval_ms': 'auto.commit.interval.ms',
+    'session_timeout_ms': 'session.timeout.ms',
+    'heartbeat_interval_ms': 'heartbeat.interval.ms',
+    'fetch_min_bytes': 'fetch.min.bytes',
+    'fetch_max_wait_ms': 'fetch.wait.max.ms',
+    'max_partition_fetch_bytes': 'max.partition.fetch.bytes',
+    'fetch_max_bytes': 'fetch.max.bytes',
+    'max_poll_interval_ms': 'max.poll.interval.ms',
+    'reconnect_backoff_ms': 'reconnect.backoff.ms',
+    'reconnect_backoff_max_ms': 'reconnect.backoff.max.ms',
+}
+
+DeliveryCallback = Callable[[Optional[Exception], Optional[Any]], None]
+CommitCallback = Callable[[Optional[Exception]], None]
+Headers = List[Tuple[str, bytes]]
+
+
+def _import_kafka_python():
+    global ConsumerRebalanceListener, KafkaAdminClient, KafkaConsumer, KafkaProducer
+    global KafkaError, KafkaTimeoutError, OffsetAndMetadata, _KafkaPythonRebalanceListener
+    if KafkaProducer is not None:
+        return
+    from kafka import ConsumerRebalanceListener, KafkaAdminClient, KafkaConsumer, KafkaProducer
+    from kafka.errors import KafkaError, KafkaTimeoutError
+    from kafka.structs import OffsetAndMetadata
+    # subscribe() only accepts subclasses of kafka-python's own listener class
+    _KafkaPythonRebalanceListener = type("_KafkaPythonRebalanceListener",
+                                         (_RebalanceListenerAdapter, ConsumerRebalanceListener), {})
+
+
+def kafka_errors() -> Tuple[type, ...]:
+    """kafka-python's KafkaError for except clauses, or () before any kafka-python client exists"""
+    return (KafkaError,) if KafkaError is not None else ()
+
+
+def _import_confluent_kafka():
+    global confluent_kafka
+    if not HAS_CONFLUENT_KAFKA:
+        raise RuntimeError("confluent-kafka is not installed. Install with: pip install confluent-kafka")
+    import confluent_kafka
+
+
+def _translate(settings: Dict[str, Any], mapping: Dict[str, str]) -> Dict[str, Any]:
+    return {mapping[key]: value for key, value in settings.items() if key in mapping}
+
+
+def _offset_and_metadata(offset: int) -> "OffsetAndMetadata":
+    # kafka-python 2.1 added leader_epoch to OffsetAndMetadata
+    return OffsetAndMetadata._make([offset, '', -1][:len(OffsetAndMetadata._fields)])
+
+
+# The kafka-python warmups below use client internals (producer._sender._client,
+# consumer._client/_coordinator, the fetcher's config); they are checked against
+# the range pinned in setup.sh.
+
+def _leaders(client, topic: str) -> Set[int]:
+    cluster = client.cluster
+    return {cluster.leader_for_partition(TopicPartition(topic, partition))
+            for partition in cluster.partitions_for_topic(topic) or ()} - {None, -1}
+
+
+def _connect(client, node_ids: Set[int], deadline: float, drive: bool):
+    """Open kafka-python connections to `node_ids`, giving up at `deadline`.
+
+    Connections only start here; a producer's sender thread completes them,
+    a consumer has no I/O thread so drive=True polls the client until done.
+    """
+    pending = set(node_ids)
+    while True:
+        pending = {node_id for node_id in pending if not client.ready(node_id)}
+        if not pending or time.monotonic() >= deadline:
+            return
+        if drive:
+            client.poll(timeout_ms=10)
+        else:
+            time.sleep(0.005)
+
+
+def _drive_until(client, future, deadline: float, what: str):
+    """Poll a kafka-python client until `future` resolves; never blocks past `deadline`"""
+    while not future.is_done:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise KafkaTimeoutError(f"Timed out waiting for {what}")
+        client.poll(timeout_ms=min(remaining, 0.05) * 1000)
+    if future.failed():
+        raise future.exception
+    return future.value
+
+
+def _call_with_timeout(fn, timeout: float, what: str):
+    """Run a blocking call on a helper thread and stop waiting for it after `timeout`.
+
+    Only for thread-safe clients: a call that times out keeps running in the background.
+    """
+    outcome = []
+
+    def run():
+        try:
+            outcome.append((fn(), None))
+        except Exception as e:
+            outcome.append((None, e))
+
+    thread = threading.Thread(target=run, name="warmup", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if not outcome:
+        raise KafkaTimeoutError(f"Timed out waiting for {what}")
+    value, error = outcome[0]
+    if error is not None:
+        raise error
+    return value
+
+
+class _RebalanceListenerAdapter:
+    """Adapts a plain listener object to kafka-python's required base class.
+
+    on_partitions_assigned may return {partition: offset} to start from.
+    """
+
+    def __init__(self, listener, consumer):
+        self.listener = listener
+        self.consumer = consumer
+
+    def on_partitions_revoked(self, revoked):
+        self.listener.on_partitions_revoked(sorted(TopicPartition(tp.topic, tp.partition) for tp in revoked))
+
+    def on_partitions_assigned(self, assigned):
+        start = self.listener.on_partitions_assigned(
+            sorted(TopicPartition(tp.topic, tp.partition) for tp in assigned))
+        for tp in assigned:
+            offset = (start or {}).get(TopicPartition(tp.topic, tp.partition))
+            if offset is not None:
+                self.consumer.seek(tp, offset)
+
+
+class KafkaPythonProducerEngine:
+    """kafka-python KafkaProducer; delivery callbacks run on its I/O thread"""
+    name = "kafka-python"
+    needs_poll = False
+
+    def __init__(self, config_manager, key_serializer, value_serializer, settings: Dict[str, Any]):
+        _import_kafka_python()
+
+        # Profiles spell "no compression" as 'none'; kafka-python expects None
+        if settings.get('compression_type') == 'none':
+            settings = {**settings, 'compression_type': None}
+        # Client settings override the connection defaults (e.g. request_timeout_ms)
+        self.producer = KafkaProducer(**{
+            **config_manager.get_kafka_config_dict(),
+            'key_serializer': key_serializer,
+            'value_serializer': value_serializer,
+            **settings,
+        })
+
+    def send(self, topic: str, key, value, on_delivery: DeliveryCallback, headers: Optional[Headers] = None):
+        future = self.producer.send(topic, key=key, value=value, headers=headers)
+        future.add_callback(lambda metadata: on_delivery(None, metadata))
+        future.add_errback(lambda exc: on_delivery(exc, None))
+
+    def send_and_wait(self, topic: str, key, value, timeout: float, headers: Optional[Headers] = None):
+        return self.producer.send(topic, key=key, value=value, headers=headers).get(timeout=timeout)
+
+    def warmup(self, topic: str, timeout: float = 10.0):
+        """Fetch the topic's metadata and connect to its partition leaders before the first send"""
+        deadline = time.monotonic() + timeout
+        # partitions_for() blocks for up to max_block_ms; KafkaProducer is thread-safe, so bound it
+        _call_with_timeout(lambda: self.producer.partitions_for(topic), timeout, f"metadata for {topic}")
+        client = self.producer._sender._client
+        _connect(client, _leaders(client, topic), deadline, drive=False)
+
+    def poll(self, timeout: float = 0):
+        """Nothing to serve: kafka-python resolves futures on its own thread"""
+
+    def flush(self, timeout: Optional[float] = None):
+        self.producer.flush(timeout)
+
+    def close(self):
+        self.producer.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        return self.producer.metrics()
+
+
+class ConfluentProducerEngine:
+    """confluent-kafka Producer; delivery callbacks are served by poll()/flush()"""
+    name = "confluent"
+    needs_poll = True
+
+    def __init__(self, config_manager, key_serializer, value_serializer, settings: Dict[str, Any]):
+        _import_confluent_kafka()
+
+        self.key_serializer = key_serializer
+        self.value_serializer = value_serializer
+        self.producer = confluent_kafka.Producer({
+            **config_manager.get_confluent_kafka_config_dict(),
+            **_translate(settings, CONFLUENT_PRODUCER_SETTINGS),
+        })
+
+    def send(self, topic: str, key, value, on_delivery: DeliveryCallback, headers: Optional[Headers] = None):
+        def delivered(err, msg):
+            if err is not None:
+                on_delivery(confluent_kafka.KafkaException(err), None)
+            else:
+                on_delivery(None, DeliveryReport(msg.topic(), msg.partition(), msg.offset()))
+
+        key_bytes = self.key_serializer(key)
+        value_bytes = self.value_serializer(value)
+        while True:
+            try:
+                self.producer.produce(topic, key=key_bytes, value=value_bytes, headers=headers,
+                                      on_delivery=delivered)
+                break
+            except BufferError:
+                # Local queue is full: serve delivery reports to make room
+                self.producer.poll(0.1)
+        self.producer.poll(0)
+
+    def send_and_wait(self, topic: str, key, value, timeout: float, headers: Optional[Headers] = None):
+        result = {}
+        self.send(topic, key, value, lambda err, metadata: result.update(err=err, metadata=metadata), headers)
+        self.producer.flush(timeout)
+        if not result:
+            raise TimeoutError(f"Delivery not confirmed within {timeout}s")
+        if result["err"] is not None:
+            raise result["err"]
+        return result["metadata"]
+
+    def warmup(self, topic: str, timeout: float = 10.0):
+        """Connect and fetch the topic's metadata before the first send"""
+        self.producer.list_topics(topic, timeout=timeout)
+
+    def poll(self, timeout: float = 0):
+        self.producer.poll(timeout)
+
+    def flush(self, timeout: Optional[float] = None):
+        self.producer.flush(-1 if timeout is None else timeout)
+
+    def close(self):
+        self.producer.flush()
+
+    def metrics(self) -> Dict[str, Any]:
+        # librdkafka only exposes statistics through statistics.interval.ms/stats_cb
+        return {}
+
+
+class KafkaPythonConsumerEngine:
+    """kafka-python KafkaConsumer"""
+    name = "kafka-python"
+
+    def __init__(self, config_manager, topic: str, group_id: str, key_deserializer,
+                 value_deserializer, settings: Dict[str, Any], rebalance_listener=None):
+        _import_kafka_python()
+
+        self.max_poll_records = settings.get('max_poll_records', 500)
+        # Client settings override the connection defaults (e.g. request_timeout_ms)
+        self.consumer = KafkaConsumer(**{
+            **config_manager.get_kafka_config_dict(),
+            'group_id': group_id,
+            'key_deserializer': key_deserializer,
+            'value_deserializer': value_deserializer,
+            **settings,
+        })
+        listener = _KafkaPythonRebalanceListener(rebalance_listener, self.consumer) if rebalance_listener else None
+        self.consumer.subscribe([topic], listener=listener)
+
+    def warmup(self, topic: str, timeout: float = 10.0):
+        """Fetch the topic's metadata and connect to the group coordinator and partition
+        leaders, so the first poll only has to join the group and fetch.
+
+        KafkaConsumer is not thread-safe, so instead of the blocking helpers
+        (partitions_for_topic, ensure_coordinator_ready) this polls the client
+        itself and raises KafkaTimeoutError once `timeout` is spent.
+        """
+        deadline = time.monotonic() + timeout
+        client = self.consumer._client
+        if client.cluster.partitions_for_topic(topic) is None:
+            _drive_until(client, client.cluster.request_update(), deadline, f"metadata for {topic}")
+        nodes = _leaders(client, topic)
+        # Start the leader connections first; the coordinator lookup below polls them along
+        _connect(client, nodes, deadline=0, drive=False)
+        coordinator = self.consumer._coordinator
+        if coordinator.coordinator_unknown():
+            _drive_until(client, coordinator.lookup_coordinator(), deadline, "the group coordinator")
+        if coordinator.coordinator_id is not None:
+            nodes.add(coordinator.coordinator_id)
+        _connect(client, nodes, deadline, drive=True)
+
+    def poll(self, timeout_ms: int, max_records: Optional[int] = None) -> Dict[Any, List[Any]]:
+        return self.consumer.poll(timeout_ms=timeout_ms, max_records=max_records)
+
+    def assignment(self) -> List[TopicPartition]:
+        return sorted(self.consumer.assignment())
+
+    def position(self, partition: TopicPartition) -> Optional[int]:
+        return self.consumer.position(partition)
+
+    def committed(self, partition: TopicPartition) -> Optional[int]:
+        return self.consumer.committed(partition)
+
+    def commit(self, offsets: Dict[TopicPartition, int], asynchronous: bool = False,
+               callback: Optional[CommitCallback] = None):
+        """Commit next-offset-to-consume per partition; async results arrive via callback during poll()"""
+        offsets = {tp: _offset_and_metadata(offset) for tp, offset in offsets.items()}
+        if not asynchronous:
+            self.consumer.commit(offsets)
+            return
+
+        def done(_offsets, response):
+            if callback:
+                callback(response if isinstance(response, Exception) else None)
+
+        self.consumer.commit_async(offsets, callback=done)
+
+    def tune_fetch(self, settings: Dict[str, Any]) -> bool:
+        """Change fetch thresholds on the live consumer; the fetcher reads them per request"""
+        config = getattr(getattr(self.consumer, '_fetcher', None), 'config', None)
+        if not isinstance(config, dict):
+            # Fetcher internals changed; keep the creation-time settings like the confluent engine
+            return False
+        config.update(settings)
+        return True
+
+    def pause(self, partitions: List[TopicPartition]):
+        self.consumer.pause(*partitions)
+
+    def resume(self, partitions: List[TopicPartition]):
+        self.consumer.resume(*partitions)
+
+    def close(self):
+        # Offsets are committed explicitly, never implicitly on close
+        self.consumer.close(autocommit=False)
+
+
+class ConfluentConsumerEngine:
+    """confluent-kafka Consumer using batch consume()"""
+    name = "confluent"
+
+    def __init__(self, config_manager, topic: str, group_id: str, key_deserializer,
+                 value_deserializer, settings: Dict[str, Any], rebalance_listener=None):
+        _import_confluent_kafka()
+
+        self.key_deserializer = key_deserializer
+        self.value_deserializer = value_deserializer
+        self.max_poll_records = settings.get('max_poll_records', 500)
+        # librdkafka reports every commit, sync or async, through one on_commit hook; async
+        # callbacks are matched to their result by the committed offsets
+        self.commit_callbacks: Dict[frozenset, deque] = {}
+        self.consumer = confluent_kafka.Consumer({
+            **config_manager.get_confluent_kafka_config_dict(),
+            'group.id': group_id,
+            'on_commit': self._on_commit,
+            **_translate(settings, CONFLUENT_CONSUMER_SETTINGS),
+        })
+
+        subscribe_args = {}
+        if rebalance_listener:
+            def partitions(tps):
+                return sorted(TopicPartition(tp.topic, tp.partition) for tp in tps)
+
+            def on_assign(consumer, tps):
+                # Start offsets can only be applied by assigning from inside this callback
+                start = rebalance_listener.on_partitions_assigned(partitions(tps)) or {}
+                for tp in tps:
+                    offset = start.get(TopicPartition(tp.topic, tp.partition))
+                    if offset is not None:
+                        tp.offset = offset
+                if start:
+                    consumer.assign(tps)
+
+            subscribe_args = {
+                'on_assign': on_assign,
+                'on_revoke': lambda _, tps: rebalance_listener.on_partitions_revoked(partitions(tps)),
+            }
+        self.consumer.subscribe([topic], **subscribe_args)
+
+    @staticmethod
+    def _commit_key(tps) -> frozenset:
+        return frozenset((tp.topic, tp.partition, tp.offset) for tp in tps)
+
+    def _on_commit(self, err, partitions):
+        # Results of sync commits (already returned to their caller) match no pending callback
+        key = self._commit_key(partitions)
+        pending = self.commit_callbacks.get(key)
+        if not pending:
+            return
+        callback = pending.popleft()
+        if not pending:
+            del self.commit_callbacks[key]
+        if callback:
+            callback(confluent_kafka.KafkaException(err) if err is not None else None)
+
+    def warmup(self, topic: str, timeout: float = 10.0):
+        """Connect and fetch the topic's metadata without joining the group"""
+        self.consumer.list_topics(topic, timeout=timeout)
+
+    def poll(self, timeout_ms: int, max_records: Optional[int] = None) -> Dict[TopicPartition, List[ConsumerRecord]]:
+        messages = self.consumer.consume(num_messages=max_records or self.max_poll_records,
+                                         timeout=timeout_ms / 1000)
+        batch: Dict[TopicPartition, List[ConsumerRecord]] = {}
+        for msg in messages:
+            error = msg.error()
+            if error is not None:
+                if error.code() == confluent_kafka.KafkaError._PARTITION_EOF:
+                    continue
+                raise confluent_kafka.KafkaException(error)
+
+            _, timestamp = msg.timestamp()
+            record = ConsumerRecord(
+                topic=msg.topic(),
+                partition=msg.partition(),
+                offset=msg.offset(),
+                timestamp=timestamp,
+                key=self.key_deserializer(msg.key()),
+                value=self.value_deserializer(msg.value()) if self.value_deserializer else msg.value(),
+                headers=msg.headers() or [],
+            )
+            batch.setdefault(TopicPartition(record.topic, record.partition), []).append(record)
+        return batch
+
+    @staticmethod
+    def _offset(partition) -> Optional[int]:
+        return partition.offset if partition.offset >= 0 else None
+
+    def assignment(self) -> List[TopicPartition]:
+        return sorted(TopicPartition(tp.topic, tp.partition) for tp in self.consumer.assignment())
+
+    def position(self, partition: TopicPartition) -> Optional[int]:
+        tp = confluent_kafka.TopicPartition(partition.topic, partition.partition)
+        return self._offset(self.consumer.position([tp])[0])
+
+    def committed(self, partition: TopicPartition) -> Optional[int]:
+        tp = confluent_kafka.TopicPartition(partition.topic, partition.partition)
+        return self._offset(self.consumer.committed([tp], timeout=10)[0])
+
+    def commit(self, offsets: Dict[TopicPartition, int], asynchronous: bool = False,
+               callback: Optional[CommitCallback] = None):
+        """Commit next-offset-to-consume per partition; async results arrive via callback during poll()"""
+        tps = [confluent_kafka.TopicPartition(tp.topic, tp.partition, offset) for tp, offset in offsets.items()]
+        if not asynchronous:
+            self.consumer.commit(offsets=tps, asynchronous=False)
+            return
+        key = self._commit_key(tps)
+        pending = self.commit_callbacks.setdefault(key, deque())
+        pending.append(callback)
+        try:
+            self.consumer.commit(offsets=tps, asynchronous=True)
+        except Exception:
+            # Never queued in librdkafka, so no on_commit will arrive for it
+            pending.pop()
+            if not pending:
+                del self.commit_callbacks[key]
+            raise
+
+    def tune_fetch(self, settings: Dict[str, Any]) -> bool:
+        """librdkafka fixes fetch thresholds at creation; only max_records per poll can adapt"""
+        return False
+
+    def pause(self, partitions: List[TopicPartition]):
+        self.consumer.pause([confluent_kafka.TopicPartition(tp.topic, tp.partition) for tp in partitions])
+
+    def resume(self, partitions: List[TopicPartition]):
+        self.consumer.resume([confluent_kafka.TopicPartition(tp.topic, tp.partition) for tp in partitions])
+
+    def close(self):
+        self.consumer.close()
+
+
+class KafkaPythonOffsetReader:
+    """Separate kafka-python clients for batched end/committed offset lookups off the poll thread"""
+
+    def __init__(self, config_manager, group_id: str):
+        _import_kafka_python()
+
+        config = config_manager.get_kafka_config_dict()
+        self.group_id = group_id
+        self.consumer = KafkaConsumer(**config, enable_auto_commit=False)
+        self.admin = KafkaAdminClient(**config)
+
+    def partitions(self, topic: str) -> List[TopicPartition]:
+        return sorted(TopicPartition(topic, p) for p in self.consumer.partitions_for_topic(topic) or ())
+
+    def end_offsets(self, partitions: List[TopicPartition]) -> Dict[TopicPartition, int]:
+        """One ListOffsets request for all partitions"""
+        return {TopicPartition(tp.topic, tp.partition): offset
+                for tp, offset in self.consumer.end_offsets(partitions).items()}
+
+    def committed_offsets(self, partitions: List[TopicPartition]) -> Dict[TopicPartition, Optional[int]]:
+        """One OffsetFetch request for the whole group"""
+        committed = self.admin.list_consumer_group_offsets(self.group_id, partitions=partitions)
+        return {tp: committed[tp].offset if tp in committed and committed[tp].offset >= 0 else None
+                for tp in partitions}
+
+    def close(self):
+        self.consumer.close(autocommit=False)
+        self.admin.close()
+
+
+class ConfluentOffsetReader:
+    """Separate confluent-kafka consumer (never subscribed) for batched offset lookups"""
+
+    def __init__(self, config_manager, group_id: str):
+        _import_confluent_kafka()
+
+        self.consumer = confluent_kafka.Consumer({
+            **config_manager.get_confluent_kafka_config_dict(),
+            'group.id': group_id,
+            'enable.auto.commit': False,
+        })
+
+    def partitions(self, topic: str) -> List[TopicPartition]:
+        metadata = self.consumer.list_topics(topic, timeout=10).topics.get(topic)
+        return sorted(TopicPartition(topic, p) for p in (metadata.partitions if metadata else ()))
+
+    def end_offsets(self, partitions: List[TopicPartition]) -> Dict[TopicPartition, int]:
+        # OFFSET_END as the timestamp asks for the log-end offset, in one request
+        tps = [confluent_kafka.TopicPartition(tp.topic, tp.partition, confluent_kafka.OFFSET_END)
+               for tp in partitions]
+        return {TopicPartition(tp.topic, tp.partition): tp.offset
+                for tp in self.consumer.offsets_for_times(tps, timeout=10)}
+
+    def committed_offsets(self, partitions: List[TopicPartition]) -> Dict[TopicPartition, Optional[int]]:
+        tps = [confluent_kafka.TopicPartition(tp.topic, tp.partition) for tp in partitions]
+        return {TopicPartition(tp.topic, tp.partition): ConfluentConsumerEngine._offset(tp)
+                for tp in self.consumer.committed(tps, timeout=10)}
+
+    def close(self):
+        self.consumer.close()
+
+
+PRODUCER_ENGINES = {
+    "kafka-python": KafkaPythonProducerEngine,
+    "confluent": ConfluentProducerEngine,
+}
+
+CONSUMER_ENGINES = {
+    "kafka-python": KafkaPythonConsumerEngine,
+    "confluent": ConfluentConsumerEngine,
+}
+
+OFFSET_READERS = {
+    "kafka-python": KafkaPythonOffsetReader,
+    "confluent": ConfluentOffsetReader,
+}
+
+ENGINES = list(PRODUCER_ENGINES)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Background consumer-lag tracker for OrdersConsumer.
+Every interval a daemon thread fetches the topic's log-end offsets and the
+group's committed offsets in one batched request each, using its own client
+so the poll thread is never blocked. Per-partition lag and consume/produce
+rates are kept in memory and exported through the metrics registry.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from client_metrics import MetricsRegistry
+from kafka_engines import OFFSET_READERS
+
+
+class PartitionLag:
+    """Latest offsets and rates for one partition"""
+
+    def __init__(self):
+        self.end_offset = 0
+        self.committed: Optional[int] = None
+        self.lag = 0
+        self.consume_rate = 0.0
+        self.produce_rate = 0.0
+
+
+class LagTracker:
+    """Polls end and committed offsets on a background thread"""
+
+    def __init__(self, config_manager, topic: str, group_id: str, metrics: MetricsRegistry, log,
+                 engine: str = "kafka-python", interval: float = 5.0):
+        self.config_manager = config_manager
+        self.topic = topic
+        self.group_id = group_id
+        self.metrics = metrics
+        self.log = log
+        self.engine = engine
+        self.interval = interval
+
+        self.partitions: Dict = {}
+        self.lock = threading.Lock()
+        self.last_refresh_at: Optional[float] = None
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.reader = None
+
+        self.refresh_errors_total = metrics.counter("lag_refresh_errors_total", "Failed lag refreshes")
+        metrics.gauge("lag_total", "Records behind the log end summed over partitions", self.total_lag,
+                      topic=topic)
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="lag-tracker", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=self.interval + 10)
+
+    def _run(self):
+        try:
+            self.reader = OFFSET_READERS[self.engine](self.config_manager, self.group_id)
+        except Exception as e:
+            self.log.error(f"⚠️  Lag tracker disabled: {e}", event="lag_error", error=str(e))
+            return
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    self.refresh()
+                except Exception as e:
+                    self.refresh_errors_total.inc()
+                    self.log.error(f"⚠️  Could not refresh consumer lag: {e}", event="lag_error", error=str(e))
+                self.stop_event.wait(self.interval)
+        finally:
+            self.reader.close()
+
+    def _register(self, partition):
+        labels = {"topic": partition.topic, "partition": str(partition.partition)}
+        state = self.partitions[partition]
+        self.metrics.gauge("lag", "Records between the committed offset and the log end",
+                           lambda: state.lag, **labels)
+        self.metrics.gauge("log_end_offset", "Log-end offset of the partition",
+                           lambda: state.end_offset, **labels)
+        self.metrics.gauge("consume_rate", "Committed records per second over the last interval",
+                           lambda: state.consume_rate, **labels)
+        self.metrics.gauge("produce_rate", "Records appended per second over the last interval",
+                           lambda: state.produce_rate, **labels)
+
+    def refresh(self):
+        """Fetch end and committed offsets for every partition of the topic"""
+        partitions = self.reader.partitions(self.topic)
+        end_offsets = self.reader.end_offsets(partitions)
+        committed = self.reader.committed_offsets(partitions)
+        now = time.monotonic()
+
+        with self.lock:
+            elapsed = now - self.last_refresh_at if self.last_refresh_at else None
+            for partition in partitions:
+                is_new = partition not in self.partitions
+                state = self.partitions.setdefault(partition, PartitionLag())
+                end_offset = end_offsets.get(partition, state.end_offset)
+                offset = committed.get(partition)
+
+                if elapsed and not is_new:
+                    state.produce_rate = max(end_offset - state.end_offset, 0) / elapsed
+                    if offset is not None and state.committed is not None:
+                        state.consume_rate = max(offset - state.committed, 0) / elapsed
+
+                state.end_offset = end_offset
+                state.committed = offset
+                # Nothing committed yet means the whole partition is still to be read
+                state.lag = max(end_offset - (offset or 0), 0)
+                if is_new:
+                    self._register(partition)
+            self.last_refresh_at = now
+
+    def total_lag(self) -> int:
+        return sum(state.lag for state in self.partitions.values())
+
+    def report(self) -> List[str]:
+        """Lines describing the latest snapshot; reads memory only, safe from any thread"""
+        with self.lock:
+            if self.last_refresh_at is None:
+                return ["📊 Consumer lag: no data yet"]
+            age = time.monotonic() - self.last_refresh_at
+            lines = [f"📊 Consumer lag for group {self.group_id} (as of {age:.1f}s ago):"]
+            for partition, state in sorted(self.partitions.items()):
+                committed = state.committed if state.committed is not None else 'N/A'
+                lines.append(f"   Topic: {partition.topic}, Partition: {partition.partition}, "
+                             f"Committed: {committed}, Log End: {state.end_offset}, Lag: {state.lag}, "
+                             f"Consume: {state.consume_rate:,.1f}/s, Produce: {state.produce_rate:,.1f}/s")
+            lines.append(f"   Total lag: {self.total_lag()}")
+        return lines
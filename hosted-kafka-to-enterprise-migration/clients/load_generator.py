@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Rate-controlled load generator built on top of OrdersProducer.
+Paces orders with a token bucket instead of time.sleep(interval), supports
+step/linear/burst ramp profiles and fans out across worker processes that
+each own a disjoint order_id range. Used to size clusters before migration.
+"""
+
+import time
+import signal
+import argparse
+import multiprocessing
+import queue
+from typing import Dict, Any, List
+
+from client_metrics import start_metrics_server
+from orders_producer import OrdersProducer
+from kafka_engines import ENGINES
+from order_serde import SERDES
+
+PROFILES = ["constant", "step", "linear", "burst"]
+
+
+class TokenBucket:
+    """Token bucket that refills continuously at `rate` tokens per second.
+
+    Tokens accrue between calls, so the long-run rate stays on target even
+    when individual sleeps overshoot; `burst` caps how much can be saved up.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def set_rate(self, rate: float):
+        self._refill()
+        self.rate = rate
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` are available, then consume them"""
+        while True:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return
+            deficit = tokens - self.tokens
+            time.sleep(deficit / self.rate if self.rate > 0 else 0.1)
+
+
+def rate_at(profile: str, target: float, elapsed: float, ramp_seconds: float,
+            steps: int, burst_factor: float, burst_seconds: float, burst_period: float) -> float:
+    """Target rate for a ramp profile `elapsed` seconds into the run"""
+    if profile == "step":
+        if steps < 1 or ramp_seconds <= 0:
+            return target
+        step_length = ramp_seconds / steps
+        current_step = min(int(elapsed // step_length) + 1, steps)
+        return target * current_step / steps
+    if profile == "linear":
+        if elapsed >= ramp_seconds:
+            return target
+        # Start at 10% so the bucket never stalls at a zero rate
+        return target * max(elapsed / ramp_seconds, 0.1)
+    if profile == "burst":
+        if elapsed % burst_period < burst_seconds:
+            return target * burst_factor
+        return target
+    return target
+
+
+def estimate_order_size(producer: OrdersProducer, samples: int = 100) -> float:
+    """Average serialized order size in bytes, used to pace in MB/s mode"""
+    counter = producer.order_counter
+    total = sum(len(producer.serialize_value(producer.generate_order())) for _ in range(samples))
+    producer.order_counter = counter
+    return total / samples
+
+
+def run_worker(worker_id: int, options: Dict[str, Any], results):
+    """Worker process: produce paced orders from this worker's order_id range.
+
+    Always puts exactly one result, even when setup fails, so the parent never waits forever.
+    """
+    producer = None
+    orders_sent = 0
+    cost = 1.0
+    try:
+        producer = OrdersProducer(serde=options['serde'], engine=options['engine'])
+        if options['producer_profile']:
+            producer.load_producer_profile(options['producer_profile'])
+        producer.order_counter = worker_id * options['id_range_size'] + 1
+        if options['batch_generation']:
+            seed = None if options['seed'] is None else options['seed'] + worker_id
+            producer.enable_batch_generation(options['batch_generation'], seed=seed)
+        last_order_id = producer.order_counter + options['id_range_size'] - 1
+
+        signal.signal(signal.SIGINT, producer.signal_handler)
+        signal.signal(signal.SIGTERM, producer.signal_handler)
+
+        workers = options['workers']
+        target = options['target'] / workers
+        if options['mb_per_sec']:
+            cost = estimate_order_size(producer)
+            target = target * 1024 * 1024 / cost
+        # Work in messages internally; a quarter second of credit absorbs sleep jitter
+        bucket = TokenBucket(target, max(target / 4, 1.0))
+
+        if options['metrics_port']:
+            start_metrics_server(producer.metrics, options['metrics_port'] + worker_id)
+
+        producer.setup_producer()
+        topic_name = producer.config_manager.get_active_config().topic_name
+        producer.start_pipeline(options['window'])
+        started_at = producer.pipeline_started_at
+        next_report = started_at + options['report_interval']
+        orders = producer.order_stream()
+
+        while producer.running:
+            now = time.monotonic()
+            elapsed = now - started_at
+            if options['duration'] and elapsed >= options['duration']:
+                break
+            bucket.set_rate(rate_at(options['profile'], target, elapsed, options['ramp_seconds'],
+                                    options['steps'], options['burst_factor'],
+                                    options['burst_seconds'], options['burst_period']))
+            bucket.acquire()
+
+            order_id, value = next(orders)
+            if order_id > last_order_id:
+                print(f"⚠️  [worker {worker_id}] Exhausted order_id range, stopping...")
+                break
+            if producer.send_value_async(order_id, value, topic_name):
+                orders_sent += 1
+
+            if now >= next_report:
+                print(f"[worker {worker_id}] target {bucket.rate:,.0f} msgs/s | ", end="")
+                producer.report_throughput(orders_sent)
+                next_report += options['report_interval']
+
+        producer.producer.flush()
+    except Exception as e:
+        print(f"❌ [worker {worker_id}] Load generator error: {e}")
+    finally:
+        started_at = producer.pipeline_started_at if producer else None
+        results.put({
+            "worker_id": worker_id,
+            "sent": orders_sent,
+            "acked": producer.orders_acked if producer else 0,
+            "failed": producer.orders_failed if producer else 0,
+            "elapsed": time.monotonic() - started_at if started_at else 0.0,
+            "bytes_per_order": cost if options['mb_per_sec'] else None,
+        })
+        if producer:
+            producer.cleanup()
+
+
+def collect_results(results_queue, processes: List[multiprocessing.Process]) -> List[Dict[str, Any]]:
+    """One result per worker; stops waiting once every worker has exited without one"""
+    results = []
+    while len(results) < len(processes):
+        try:
+            results.append(results_queue.get(timeout=1.0))
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                # A worker that dies hard (SIGKILL, OOM) never reaches its finally block
+                dead = [str(process.exitcode) for process in processes if process.exitcode]
+                print(f"⚠️  {len(processes) - len(results)} worker(s) exited without a result "
+                      f"(exit codes: {', '.join(dead) or 'n/a'})")
+                break
+    return results
+
+
+def print_summary(results: List[Dict[str, Any]], mb_per_sec: bool):
+    """Print aggregate results across all workers"""
+    sent = sum(r["sent"] for r in results)
+    acked = sum(r["acked"] for r in results)
+    failed = sum(r["failed"] for r in results)
+    elapsed = max((r["elapsed"] for r in results), default=0.0)
+    rate = acked / elapsed if elapsed else 0.0
+
+    print("=" * 60)
+    print("📊 Load Generator Summary:")
+    print(f"   Workers: {len(results)}")
+    print(f"   Sent: {sent}, Acked: {acked}, Failed: {failed}")
+    print(f"   Elapsed: {elapsed:.1f}s")
+    print(f"   Achieved rate: {rate:,.0f} msgs/s")
+    if mb_per_sec and results:
+        bytes_per_order = sum(r["bytes_per_order"] or 0 for r in results) / len(results)
+        print(f"   Achieved throughput: {rate * bytes_per_order / (1024 * 1024):,.2f} MB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rate-controlled load generator for the orders topic')
+    parser.add_argument('--rate', type=float, default=1000.0,
+                       help='Target rate across all workers, in msgs/s (default: 1000)')
+    parser.add_argument('--mb-per-sec', action='store_true',
+                       help='Interpret --rate as MB/s of serialized order payload')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Number of producer processes (default: 1)')
+    parser.add_argument('--duration', type=float, default=60.0,
+                       help='Run time in seconds, 0 for unlimited (default: 60)')
+    parser.add_argument('--profile', choices=PROFILES, default='constant',
+                       help='Ramp profile (default: constant)')
+    parser.add_argument('--ramp-seconds', type=float, default=30.0,
+                       help='Ramp duration for step/linear profiles (default: 30)')
+    parser.add_argument('--steps', type=int, default=5,
+                       help='Number of steps for the step profile (default: 5)')
+    parser.add_argument('--burst-factor', type=float, default=3.0,
+                       help='Rate multiplier during bursts (default: 3.0)')
+    parser.add_argument('--burst-seconds', type=float, default=5.0,
+                       help='Length of each burst in seconds (default: 5)')
+    parser.add_argument('--burst-period', type=float, default=30.0,
+                       help='Seconds between burst starts (default: 30)')
+    parser.add_argument('--window', type=int, default=1000,
+                       help='Max in-flight sends per worker (default: 1000)')
+    parser.add_argument('--id-range-size', type=int, default=100_000_000,
+                       help='Size of each worker\'s order_id range (default: 100000000)')
+    parser.add_argument('--batch-generation', type=int, default=0,
+                       help='Generate orders in vectorized NumPy batches of this size (default: 0)')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Base random seed for batch generation; worker N uses seed + N')
+    parser.add_argument('--engine', choices=ENGINES, default='kafka-python',
+                       help='Client library to run on (default: kafka-python)')
+    parser.add_argument('--serde', choices=list(SERDES), default='json',
+                       help='Value serializer (default: json)')
+    parser.add_argument('--producer-profile', type=str, default=None,
+                       help='JSON batching/compression profile written by producer_tuner.py')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                       help='Base port for per-worker Prometheus metrics; worker N serves on PORT + N')
+    parser.add_argument('--report-interval', type=float, default=5.0,
+                       help='Seconds between per-worker progress reports (default: 5)')
+    parser.add_argument('--env', choices=['msk', 'msk-scram', 'gateway', 'cc', 'local'],
+                       help='Kafka environment (overrides KAFKA_ENV)')
+
+    args = parser.parse_args()
+
+    if args.steps < 1:
+        parser.error('--steps must be at least 1')
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    if args.batch_generation and args.serde == 'avro':
+        parser.error('--batch-generation emits JSON payloads and cannot be used with --serde avro')
+
+    if args.env:
+        import os
+        os.environ['KAFKA_ENV'] = args.env
+
+    options = {key: value for key, value in vars(args).items() if key != 'env'}
+    options['target'] = options.pop('rate')
+
+    unit = "MB/s" if args.mb_per_sec else "msgs/s"
+    print(f"🚀 Starting load generator: {args.rate:,.2f} {unit} across {args.workers} worker(s)")
+    print(f"📈 Profile: {args.profile}, Duration: {args.duration or 'unlimited'}s")
+    print("-" * 60)
+
+    # Workers handle SIGINT themselves; the parent just waits for them to drain
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    results_queue = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(worker_id, options, results_queue))
+        for worker_id in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+
+    results = collect_results(results_queue, processes)
+    for process in processes:
+        process.join()
+
+    print_summary(results, args.mb_per_sec)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Minimal in-memory Schema Registry for local testing of the avro serde and
+setup_schemas.py. Implements only the endpoints those scripts call:
+
+  POST /subjects/<subject>/versions     register a schema
+  POST /subjects/<subject>              look up a schema's ID
+  GET  /subjects                        list subjects
+  GET  /subjects/<subject>/versions/latest
+  GET  /schemas/ids/<id>
+
+Every request is logged, which makes it easy to confirm the clients only
+contact the registry at startup.
+"""
+
+import json
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class RegistryState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.schemas = {}      # id -> schema string
+        self.ids = {}          # normalized schema -> id
+        self.subjects = {}     # subject -> [id, ...] in version order
+
+    @staticmethod
+    def normalize(schema_str: str) -> str:
+        return json.dumps(json.loads(schema_str), sort_keys=True)
+
+    def register(self, subject: str, schema_str: str) -> int:
+        with self.lock:
+            key = self.normalize(schema_str)
+            schema_id = self.ids.get(key)
+            if schema_id is None:
+                schema_id = len(self.schemas) + 1
+                self.ids[key] = schema_id
+                self.schemas[schema_id] = schema_str
+            versions = self.subjects.setdefault(subject, [])
+            if schema_id not in versions:
+                versions.append(schema_id)
+            return schema_id
+
+    def lookup(self, subject: str, schema_str: str):
+        with self.lock:
+            schema_id = self.ids.get(self.normalize(schema_str))
+            versions = self.subjects.get(subject, [])
+            if schema_id not in versions:
+                return None
+            return self.version_info(subject, versions.index(schema_id) + 1)
+
+    def version_info(self, subject: str, version: int):
+        schema_id = self.subjects[subject][version - 1]
+        return {"subject": subject, "version": version, "id": schema_id, "schema": self.schemas[schema_id]}
+
+
+class RegistryHandler(BaseHTTPRequestHandler):
+    state = RegistryState()
+
+    def send_json(self, status: int, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/vnd.schemaregistry.v1+json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def not_found(self, message: str):
+        self.send_json(404, {"error_code": 40403, "message": message})
+
+    def do_POST(self):
+        parts = self.path.strip('/').split('/')
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            schema_str = json.loads(self.rfile.read(length))["schema"]
+            json.loads(schema_str)
+        except (ValueError, KeyError):
+            self.send_json(422, {"error_code": 42201, "message": "Invalid schema"})
+            return
+
+        if len(parts) == 3 and parts[0] == "subjects" and parts[2] == "versions":
+            self.send_json(200, {"id": self.state.register(parts[1], schema_str)})
+        elif len(parts) == 2 and parts[0] == "subjects":
+            info = self.state.lookup(parts[1], schema_str)
+            if info is None:
+                self.not_found("Schema not found")
+            else:
+                self.send_json(200, info)
+        else:
+            self.not_found("Unknown endpoint")
+
+    def do_GET(self):
+        parts = self.path.strip('/').split('/')
+        state = self.state
+
+        if parts == ["subjects"]:
+            with state.lock:
+                self.send_json(200, sorted(state.subjects))
+        elif len(parts) == 4 and parts[0] == "subjects" and parts[2:] == ["versions", "latest"]:
+            with state.lock:
+                if parts[1] not in state.subjects:
+                    self.not_found("Subject not found")
+                else:
+                    self.send_json(200, state.version_info(parts[1], len(state.subjects[parts[1]])))
+        elif len(parts) == 3 and parts[:2] == ["schemas", "ids"] and parts[2].isdigit():
+            with state.lock:
+                schema_str = state.schemas.get(int(parts[2]))
+            if schema_str is None:
+                self.not_found("Schema not found")
+            else:
+                self.send_json(200, {"schema": schema_str})
+        else:
+            self.not_found("Unknown endpoint")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='In-memory mock Schema Registry for local testing')
+    parser.add_argument('--host', default='localhost', help='Bind address (default: localhost)')
+    parser.add_argument('--port', type=int, default=8081, help='Port (default: 8081)')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), RegistryHandler)
+    print(f"🧪 Mock Schema Registry listening on http://{args.host}:{args.port}")
+    print(f"   export SCHEMA_REGISTRY_URL=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping mock Schema Registry")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
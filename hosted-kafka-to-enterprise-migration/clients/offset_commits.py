@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Manual, batched offset commits for OrdersConsumer (at-least-once).
+Offsets are marked only after a record has been processed and are committed
+asynchronously once enough records or enough time has accumulated. Commits
+are synchronous only when partitions are revoked and at shutdown, so a
+restart during cutover re-reads at most one commit batch.
+"""
+
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from client_metrics import MetricsRegistry
+
+
+class CommitManager:
+    """Tracks processed offsets per partition and commits them in batches.
+
+    Doubles as the engine's rebalance listener: pass it to the consumer engine
+    and bind() the engine once it exists.
+    """
+
+    def __init__(self, metrics: MetricsRegistry, log, commit_every: int = 500,
+                 commit_interval: float = 1.0, checkpoint=None,
+                 holds: Optional[Callable[[], Dict]] = None):
+        self.consumer = None
+        # Optional StateCheckpoint saved with the same offsets just before each commit
+        self.checkpoint = checkpoint
+        # Optional partition -> lowest offset that must not be committed past yet (unacked dead letters)
+        self.holds = holds
+        self.log = log
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+
+        # Next offset to consume per partition, as Kafka expects in a commit
+        self.processed: Dict = {}
+        self.committed: Dict = {}
+        # First offset seen per partition, to count uncommitted records before the first commit
+        self.base: Dict = {}
+        self.marked_since_commit = 0
+        self.last_commit_at = time.monotonic()
+
+        commit_help = "Latency of offset commits in seconds"
+        self.async_latency = metrics.histogram("commit_latency_seconds", commit_help, mode="commit_async")
+        self.sync_latency = metrics.histogram("commit_latency_seconds", commit_help, mode="commit_sync")
+        self.commit_failures_total = metrics.counter("commit_failures_total", "Offset commits that failed")
+        metrics.gauge("uncommitted_records", "Processed records whose offsets are not committed yet",
+                      self.uncommitted)
+
+    def bind(self, consumer):
+        """Attach the consumer engine that commits are sent through"""
+        self.consumer = consumer
+
+    def mark(self, partition, offset: int, count: int = 1):
+        """Record that everything up to and including offset has been processed"""
+        self.base.setdefault(partition, offset - count + 1)
+        self.processed[partition] = offset + 1
+        self.marked_since_commit += count
+
+    def uncommitted(self) -> int:
+        return sum(offset - self.committed.get(partition, self.base[partition])
+                   for partition, offset in self.processed.items())
+
+    def _pending(self, partitions: Optional[Iterable] = None) -> Dict:
+        wanted = self.processed if partitions is None else {p: self.processed[p] for p in partitions
+                                                            if p in self.processed}
+        if self.holds:
+            holds = self.holds()
+            # Committing the held offset itself means the record is read again after a restart
+            wanted = {p: min(offset, holds[p]) if p in holds else offset for p, offset in wanted.items()}
+        return {p: offset for p, offset in wanted.items() if self.committed.get(p, -1) < offset}
+
+    def _on_commit_done(self, offsets: Dict, started: float, error):
+        if error is not None:
+            # Offsets stay pending and are retried with the next batch
+            self.commit_failures_total.inc()
+            self.log.error(f"⚠️  Async offset commit failed: {error}", event="commit_error", error=str(error))
+            return
+        self.async_latency.record(time.perf_counter() - started)
+        for partition, offset in offsets.items():
+            if offset > self.committed.get(partition, -1):
+                self.committed[partition] = offset
+
+    def maybe_commit(self):
+        """Commit asynchronously once commit_every records or commit_interval seconds have passed"""
+        now = time.monotonic()
+        if self.marked_since_commit < self.commit_every and now - self.last_commit_at < self.commit_interval:
+            return
+        self.last_commit_at = now
+        self.marked_since_commit = 0
+
+        offsets = self._pending()
+        if not offsets:
+            return
+        if not self._save_checkpoint(offsets):
+            return
+        started = time.perf_counter()
+        try:
+            self.consumer.commit(offsets, asynchronous=True,
+                                 callback=lambda error: self._on_commit_done(offsets, started, error))
+        except Exception as e:
+            self._on_commit_done(offsets, started, e)
+
+    def commit_sync(self, partitions: Optional[Iterable] = None) -> bool:
+        """Commit pending offsets and wait for the result; used on revocation and shutdown"""
+        offsets = self._pending(partitions)
+        if not offsets or self.consumer is None:
+            return True
+        if not self._save_checkpoint(offsets, durable=True):
+            return False
+        started = time.perf_counter()
+        try:
+            self.consumer.commit(offsets)
+        except Exception as e:
+            self.commit_failures_total.inc()
+            self.log.error(f"❌ Offset commit failed: {e}", event="commit_error", error=str(e))
+            return False
+        self.sync_latency.record(time.perf_counter() - started)
+        self.committed.update(offsets)
+        self.marked_since_commit = 0
+        return True
+
+    def _save_checkpoint(self, offsets: Dict, durable: bool = False) -> bool:
+        """Checkpoint state first, so it never trails the committed offsets"""
+        if self.checkpoint is None:
+            return True
+        try:
+            self.checkpoint.save(offsets, durable=durable)
+            return True
+        except Exception as e:
+            self.commit_failures_total.inc()
+            self.log.error(f"❌ State checkpoint failed, offsets not committed: {e}",
+                           event="checkpoint_error", error=str(e))
+            return False
+
+    def on_partitions_revoked(self, revoked):
+        """Commit what was processed for partitions we are about to lose, then forget them"""
+        self.commit_sync(revoked)
+        if self.checkpoint is not None:
+            self.checkpoint.forget(revoked)
+        for partition in revoked:
+            self.processed.pop(partition, None)
+            self.committed.pop(partition, None)
+            self.base.pop(partition, None)
+
+    def on_partitions_assigned(self, assigned) -> Dict:
+        """Offsets to seek to: the checkpoint's, if any, else the group's committed offsets apply"""
+        if self.checkpoint is None:
+            return {}
+        return self.checkpoint.start_offsets(assigned, self.consumer.committed if self.consumer else None)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Vectorized batch order generation with NumPy.
+Draws customers, products, quantities, statuses, payment methods and
+timestamps for thousands of orders at once and renders them straight to
+JSON payload bytes, with the same field set as get_orders_value_schema().
+"""
+
+import importlib.util
+import json
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+# Loaded by the first OrderBatchGenerator so per-order producers start without numpy
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+np = None
+
+# Field order matches the Avro value schema in setup_schemas.py
+ORDER_TEMPLATE = (
+    '{"order_id": %d, "customer_id": %s, "product_id": %s, "product_name": %s, '
+    '"quantity": %d, "unit_price": %r, "total_amount": %r, "status": %s, '
+    '"timestamp": "%s", "region": %s, "payment_method": %s}'
+)
+
+MAX_QUANTITY = 5
+
+
+class OrderBatchGenerator:
+    """Generate batches of orders using NumPy arrays instead of per-order random calls"""
+
+    def __init__(self, customers: List[str], products: List[Dict[str, Any]], statuses: List[str],
+                 payment_methods: List[str], region: str, seed: Optional[int] = None,
+                 start_time: Optional[datetime] = None):
+        if not HAS_NUMPY:
+            raise RuntimeError("numpy is not installed. Install with: pip install numpy")
+        global np
+        import numpy as np
+
+        self.rng = np.random.default_rng(seed)
+
+        # Pre-encode every string field once so a batch only needs formatting
+        self.customers = [json.dumps(c) for c in customers]
+        self.product_ids = [json.dumps(p["id"]) for p in products]
+        self.product_names = [json.dumps(p["name"]) for p in products]
+        self.unit_prices = [p["price"] for p in products]
+        self.statuses = [json.dumps(s) for s in statuses]
+        self.payment_methods = [json.dumps(m) for m in payment_methods]
+        self.region = json.dumps(region)
+
+        # round() per (product, quantity) pair so totals match generate_order exactly
+        self.totals = np.array([
+            [round(price * quantity, 2) for quantity in range(1, MAX_QUANTITY + 1)]
+            for price in self.unit_prices
+        ])
+
+        # With a fixed start_time timestamps advance 1us per order, so a seed
+        # plus start_time fully reproduces a run; otherwise use the wall clock.
+        self.clock = np.datetime64(start_time, 'us') if start_time else None
+
+    def _timestamps(self, count: int):
+        if self.clock is None:
+            base = np.datetime64(datetime.utcnow(), 'us')
+        else:
+            base = self.clock
+            self.clock = base + np.timedelta64(count, 'us')
+        return np.datetime_as_string(base + np.arange(count).astype('timedelta64[us]'), unit='us')
+
+    def _draw(self, count: int):
+        """Draw all random columns for a batch"""
+        return (
+            self.rng.integers(0, len(self.customers), count),
+            self.rng.integers(0, len(self.product_ids), count),
+            self.rng.integers(1, MAX_QUANTITY + 1, count),
+            self.rng.integers(0, len(self.statuses), count),
+            self.rng.integers(0, len(self.payment_methods), count),
+            self._timestamps(count),
+        )
+
+    def generate_payloads(self, start_order_id: int, count: int) -> List[Tuple[int, bytes]]:
+        """Generate `count` orders as (order_id, JSON payload bytes) pairs"""
+        customer_idx, product_idx, quantities, status_idx, payment_idx, timestamps = self._draw(count)
+        totals = self.totals[product_idx, quantities - 1]
+
+        customers, product_ids, product_names = self.customers, self.product_ids, self.product_names
+        unit_prices, statuses, payment_methods = self.unit_prices, self.statuses, self.payment_methods
+        region = self.region
+
+        return [
+            (order_id, (ORDER_TEMPLATE % (
+                order_id, customers[c], product_ids[p], product_names[p], q,
+                unit_prices[p], total, statuses[s], ts, region, payment_methods[m]
+            )).encode('utf-8'))
+            for order_id, c, p, q, total, s, m, ts in zip(
+                range(start_order_id, start_order_id + count),
+                customer_idx.tolist(), product_idx.tolist(), quantities.tolist(),
+                totals.tolist(), status_idx.tolist(), payment_idx.tolist(), timestamps.tolist()
+            )
+        ]
+
+    def generate(self, start_order_id: int, count: int) -> List[Dict[str, Any]]:
+        """Generate `count` orders as dicts (same draws as generate_payloads)"""
+        return [json.loads(payload) for _, payload in self.generate_payloads(start_order_id, count)]
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Bounded-memory duplicate suppression for at-least-once consumption.
+Every producer numbers its orders from 1, so an order is identified by the
+producer run that sent it plus its order_id: orders_producer.py stamps each
+record with a random per-process run id header, and a producer restarted
+during a cutover starts a new run instead of replaying old order_ids.
+Records without the header (older producers, Kafka Connect) are keyed by
+order_id alone.
+
+Recent keys are kept exactly in an LRU window (bounded by size and age);
+older history lives in a pair of rotating Bloom filters sized from a memory
+cap and a target false-positive rate. A hit in either drops the order, so
+replays after consumer restarts are not counted twice. The only cost of the
+filters is that roughly `fp_rate` of genuinely new, older-than-window
+orders are dropped too.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from client_metrics import MetricsRegistry
+
+MASK64 = (1 << 64) - 1
+# Rough CPython cost of one OrderedDict entry keyed by an int
+WINDOW_ENTRY_BYTES = 100
+
+PRODUCER_RUN_HEADER = 'producer_run'
+_RUN_ID_BYTES = 8
+
+
+def new_producer_run() -> Tuple[str, bytes]:
+    """Record header identifying one producer process; random so restarts never reuse it"""
+    return PRODUCER_RUN_HEADER, os.urandom(_RUN_ID_BYTES)
+
+
+def producer_run(message) -> Optional[int]:
+    """The run id stamped by new_producer_run(), or None for records without one"""
+    for key, value in message.headers or ():
+        if key == PRODUCER_RUN_HEADER and len(value) == _RUN_ID_BYTES:
+            return int.from_bytes(value, 'big')
+    return None
+
+
+def _mix(value: int, seed: int) -> int:
+    """splitmix64 finalizer: cheap, well-distributed 64-bit hash of an int"""
+    z = (value + seed) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over ints using double hashing"""
+
+    def __init__(self, capacity: int, fp_rate: float):
+        self.capacity = max(capacity, 1)
+        self.bits = max(int(-self.capacity * math.log(fp_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.bits / self.capacity * math.log(2))), 1)
+        self.array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value: int):
+        h1 = _mix(value, 0x9E3779B97F4A7C15)
+        h2 = _mix(value, 0x632BE59BD9B4E019) | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, value: int):
+        for position in self._positions(value):
+            self.array[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: int) -> bool:
+        return all(self.array[p >> 3] & (1 << (p & 7)) for p in self._positions(value))
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+
+class DedupeCache:
+    """Exact LRU window in front of two generations of Bloom filters, keyed by (run, order_id).
+
+    When the current filter reaches its capacity it becomes the previous
+    generation and a fresh one starts, so memory stays fixed and the
+    false-positive rate never exceeds the configured one by much.
+    """
+
+    def __init__(self, metrics: MetricsRegistry, window_size: int = 100000, window_seconds: float = None,
+                 fp_rate: float = 0.001, memory_mb: float = 64.0):
+        memory_bytes = memory_mb * 1024 * 1024
+        # A quarter of the budget for the exact window, the rest split between the two filters
+        self.window_size = max(min(window_size, int(memory_bytes * 0.25 / WINDOW_ENTRY_BYTES)), 1)
+        self.window_seconds = window_seconds
+        self.fp_rate = fp_rate
+        bits_per_entry = -math.log(fp_rate) / math.log(2) ** 2
+        self.filter_capacity = int(memory_bytes * 0.75 / 2 * 8 / bits_per_entry)
+
+        self.window: "OrderedDict[int, float]" = OrderedDict()
+        self.current = BloomFilter(self.filter_capacity, fp_rate)
+        self.previous = None
+        self.lock = threading.Lock()
+
+        self.window_hits = metrics.counter("dedupe_dropped_total", "Duplicate orders dropped", source="window")
+        self.filter_hits = metrics.counter("dedupe_dropped_total", "Duplicate orders dropped", source="filter")
+        metrics.gauge("dedupe_window_entries", "(run, order_id) keys held exactly in the LRU window", lambda: len(self.window))
+        metrics.gauge("dedupe_filter_fill", "Fraction of the current Bloom filter's capacity used",
+                      lambda: self.current.count / self.current.capacity)
+        metrics.gauge("dedupe_memory_bytes", "Approximate memory used by the dedupe cache", self.memory_bytes)
+
+    def memory_bytes(self) -> int:
+        filters = len(self.current.array) + (len(self.previous.array) if self.previous else 0)
+        return filters + len(self.window) * WINDOW_ENTRY_BYTES
+
+    def _expire(self, now: float):
+        while len(self.window) > self.window_size:
+            self.window.popitem(last=False)
+        if self.window_seconds:
+            while self.window:
+                _, seen_at = next(iter(self.window.items()))
+                if now - seen_at <= self.window_seconds:
+                    break
+                self.window.popitem(last=False)
+
+    def seen(self, order_id: int, run: Optional[int] = None) -> bool:
+        """Return True if this run's order_id was (probably) seen before; otherwise remember it"""
+        # One 64-bit key per (run, order_id); unstamped records keep the bare order_id
+        key = order_id if run is None else _mix(order_id, run)
+        now = time.monotonic()
+        with self.lock:
+            if key in self.window:
+                self.window.move_to_end(key)
+                self.window[key] = now
+                self.window_hits.inc()
+                return True
+            if key in self.current or (self.previous is not None and key in self.previous):
+                self.filter_hits.inc()
+                return True
+
+            self.window[key] = now
+            self._expire(now)
+            if self.current.full:
+                self.previous, self.current = self.current, BloomFilter(self.filter_capacity, self.fp_rate)
+            self.current.add(key)
+            return False
+
+    def describe(self) -> str:
+        return (f"window {self.window_size:,} ids"
+                + (f" / {self.window_seconds:g}s" if self.window_seconds else "")
+                + f", filters 2 x {self.filter_capacity:,} ids at {self.fp_rate:g} false-positive rate")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Pluggable serializer/deserializer registry for order values.
+The producer and consumer pick a serde by name (--serde); running this
+module directly benchmarks encode and decode cost per order.
+"""
+
+import importlib.util
+import json
+import sys
+import timeit
+from typing import Dict, Any, List
+
+from avro_serde import AvroSerde
+
+# Every client imports this registry, so each codec's library is only imported
+# once its serde is built
+HAS_ORJSON = importlib.util.find_spec("orjson") is not None
+HAS_MSGSPEC = importlib.util.find_spec("msgspec") is not None
+orjson = None
+msgspec = None
+# msgspec Order struct, defined by the first MsgspecSerde
+Order = None
+
+
+class JsonSerde:
+    """Standard library json (the original client behaviour)"""
+    name = "json"
+
+    def encode(self, order: Dict[str, Any]) -> bytes:
+        return json.dumps(order).encode('utf-8')
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        return json.loads(data)
+
+
+class OrjsonSerde:
+    """orjson: Rust-backed JSON that encodes straight to bytes"""
+    name = "orjson"
+
+    def __init__(self):
+        if not HAS_ORJSON:
+            raise RuntimeError("orjson is not installed. Install with: pip install orjson")
+        global orjson
+        import orjson
+
+    def encode(self, order: Dict[str, Any]) -> bytes:
+        return orjson.dumps(order)
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        return orjson.loads(data)
+
+
+def _define_order():
+    class Order(msgspec.Struct):
+        """Typed order matching get_orders_value_schema() in setup_schemas.py"""
+        order_id: int
+        customer_id: str
+        product_id: str
+        product_name: str
+        quantity: int
+        unit_price: float
+        total_amount: float
+        status: str
+        timestamp: str
+        region: str
+        payment_method: str
+
+        # Dict-style access so consumer code written against dicts keeps working
+        def __getitem__(self, field: str):
+            return getattr(self, field)
+
+        def __contains__(self, field: str) -> bool:
+            return field in self.__struct_fields__
+
+    return Order
+
+
+class MsgspecSerde:
+    """msgspec: decodes directly into a typed Order struct, validating fields"""
+    name = "msgspec"
+
+    def __init__(self):
+        if not HAS_MSGSPEC:
+            raise RuntimeError("msgspec is not installed. Install with: pip install msgspec")
+        global msgspec, Order
+        import msgspec
+        if Order is None:
+            Order = _define_order()
+        self.encoder = msgspec.json.Encoder()
+        self.decoder = msgspec.json.Decoder(Order)
+
+    def encode(self, order) -> bytes:
+        return self.encoder.encode(order)
+
+    def decode(self, data: bytes):
+        return self.decoder.decode(data)
+
+
+SERDES = {
+    "json": JsonSerde,
+    "orjson": OrjsonSerde,
+    "msgspec": MsgspecSerde,
+    "avro": AvroSerde,
+}
+
+
+def get_serde(name: str):
+    """Instantiate a serde from the registry by name"""
+    if name not in SERDES:
+        raise ValueError(f"Unknown serde: {name}")
+    return SERDES[name]()
+
+
+def benchmark(orders: List[Dict[str, Any]], rounds: int = 5):
+    """Print encode/decode cost per order for every available serde"""
+    print(f"⏱️  Serde benchmark: {len(orders)} orders x {rounds} rounds")
+    print("-" * 60)
+    print(f"{'serde':<10} {'encode us/order':>16} {'decode us/order':>16} {'bytes/order':>12}")
+
+    for name in SERDES:
+        try:
+            serde = get_serde(name)
+        except (RuntimeError, ValueError, OSError) as e:
+            print(f"{name:<10} skipped: {e}")
+            continue
+
+        payloads = [serde.encode(order) for order in orders]
+        encode_time = min(timeit.repeat(lambda: [serde.encode(o) for o in orders], number=1, repeat=rounds))
+        decode_time = min(timeit.repeat(lambda: [serde.decode(p) for p in payloads], number=1, repeat=rounds))
+        size = sum(len(p) for p in payloads) / len(payloads)
+
+        print(f"{name:<10} {encode_time / len(orders) * 1e6:>16.2f} "
+              f"{decode_time / len(orders) * 1e6:>16.2f} {size:>12.1f}")
+
+
+if __name__ == "__main__":
+    from orders_producer import OrdersProducer
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    producer = OrdersProducer()
+    benchmark([producer.generate_order() for _ in range(count)])
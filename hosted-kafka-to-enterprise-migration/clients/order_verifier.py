@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Order-stream verifier for cutover runs.
+Tracks every order_id seen in a roaring-style compressed bitmap and reports
+duplicates, out-of-order arrivals and offset gaps per partition as they
+happen, plus the order_ids missing from the observed range at the end.
+orders_producer.py numbers orders from 1 in every process and stamps each
+record with its producer run (see order_dedupe.py), so ids, ranges and
+ordering are tracked per run: a restarted producer's orders are neither
+duplicates of the previous run's nor out of order after them, and a hole
+in one run's id range is a lost order. Records without a run header are
+tracked together as one run.
+"""
+
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from client_metrics import MetricsRegistry
+
+CHUNK_BITS = 16
+CHUNK_SIZE = 1 << CHUNK_BITS
+LOW_MASK = CHUNK_SIZE - 1
+# Past this many values a chunk is cheaper as a bitmap (8 KiB) than a sorted uint16 array
+ARRAY_MAX = 4096
+BITMAP_BYTES = CHUNK_SIZE // 8
+_NOT_FULL = re.compile(rb'[^\xff]')
+
+
+class RoaringBitmap:
+    """Set of non-negative ints split into 2^16-value chunks, each a sorted array or a bitmap"""
+
+    def __init__(self):
+        self.containers: Dict[int, object] = {}
+        self.cardinality = 0
+
+    def add(self, value: int) -> bool:
+        """Add a value; returns False if it was already present"""
+        high, low = value >> CHUNK_BITS, value & LOW_MASK
+        container = self.containers.get(high)
+        if container is None:
+            self.containers[high] = array('H', [low])
+        elif isinstance(container, bytearray):
+            index, bit = low >> 3, 1 << (low & 7)
+            if container[index] & bit:
+                return False
+            container[index] |= bit
+        else:
+            position = bisect_left(container, low)
+            if position < len(container) and container[position] == low:
+                return False
+            container.insert(position, low)
+            if len(container) > ARRAY_MAX:
+                self.containers[high] = self._to_bitmap(container)
+        self.cardinality += 1
+        return True
+
+    @staticmethod
+    def _to_bitmap(values) -> bytearray:
+        bitmap = bytearray(BITMAP_BYTES)
+        for low in values:
+            bitmap[low >> 3] |= 1 << (low & 7)
+        return bitmap
+
+    def __contains__(self, value: int) -> bool:
+        container = self.containers.get(value >> CHUNK_BITS)
+        if container is None:
+            return False
+        low = value & LOW_MASK
+        if isinstance(container, bytearray):
+            return bool(container[low >> 3] & (1 << (low & 7)))
+        position = bisect_left(container, low)
+        return position < len(container) and container[position] == low
+
+    def __len__(self) -> int:
+        return self.cardinality
+
+    def memory_bytes(self) -> int:
+        return sum(len(c) if isinstance(c, bytearray) else len(c) * 2 for c in self.containers.values())
+
+    def _missing_in_chunk(self, high: int, container) -> Iterator[int]:
+        base = high << CHUNK_BITS
+        if container is None:
+            yield from range(base, base + CHUNK_SIZE)
+        elif isinstance(container, bytearray):
+            # Skip full bytes at C speed; only partially set bytes are inspected bit by bit
+            for match in _NOT_FULL.finditer(container):
+                index = match.start()
+                byte = container[index]
+                for bit in range(8):
+                    if not byte & (1 << bit):
+                        yield base + (index << 3) + bit
+        else:
+            previous = -1
+            for low in container:
+                yield from range(base + previous + 1, base + low)
+                previous = low
+            yield from range(base + previous + 1, base + CHUNK_SIZE)
+
+    def missing_ranges(self, first: int, last: int, limit: int = 20) -> List[Tuple[int, int]]:
+        """Up to `limit` inclusive (start, end) ranges absent between first and last"""
+        ranges: List[Tuple[int, int]] = []
+        for high in range(first >> CHUNK_BITS, (last >> CHUNK_BITS) + 1):
+            container = self.containers.get(high)
+            if container is None:
+                start = max(high << CHUNK_BITS, first)
+                end = min((high << CHUNK_BITS) + LOW_MASK, last)
+                missing = iter(range(start, end + 1))
+            else:
+                missing = self._missing_in_chunk(high, container)
+            for value in missing:
+                if value < first or value > last:
+                    continue
+                if ranges and ranges[-1][1] == value - 1:
+                    ranges[-1] = (ranges[-1][0], value)
+                elif len(ranges) == limit:
+                    return ranges
+                else:
+                    ranges.append((value, value))
+        return ranges
+
+
+class RunStats:
+    """order_ids seen from one producer run and the range they span"""
+
+    def __init__(self):
+        self.seen = RoaringBitmap()
+        self.min_order_id = None
+        self.max_order_id = None
+
+    def add(self, order_id: int) -> bool:
+        self.min_order_id = order_id if self.min_order_id is None else min(self.min_order_id, order_id)
+        self.max_order_id = order_id if self.max_order_id is None else max(self.max_order_id, order_id)
+        return self.seen.add(order_id)
+
+    def missing_count(self) -> int:
+        if self.min_order_id is None:
+            return 0
+        return self.max_order_id - self.min_order_id + 1 - len(self.seen)
+
+
+def run_label(run: Optional[int]) -> str:
+    return "unstamped" if run is None else f"{run:016x}"
+
+
+class PartitionStats:
+    """Per-partition anomaly counts and the last position seen"""
+
+    def __init__(self):
+        self.received = 0
+        self.duplicates = 0
+        self.out_of_order = 0
+        self.offset_gaps = 0
+        self.skipped_offsets = 0
+        self.last_offset = None
+        # Highest order_id seen on the partition, per producer run
+        self.last_order_ids: Dict[Optional[int], int] = {}
+
+
+class OrderVerifier:
+    """Detects lost, duplicated and reordered orders; safe to call from worker threads"""
+
+    def __init__(self, metrics: MetricsRegistry, log):
+        self.metrics = metrics
+        self.log = log
+        self.runs: Dict[Optional[int], RunStats] = {}
+        self.partitions: Dict[int, PartitionStats] = {}
+        self.lock = threading.RLock()
+
+        metrics.gauge("verifier_unique_orders", "Distinct (run, order_id) pairs seen", self.unique_count)
+        metrics.gauge("verifier_missing_orders", "order_ids absent between the lowest and highest seen, "
+                                                 "summed over producer runs", self.missing_count)
+        metrics.gauge("verifier_producer_runs", "Producer runs seen", lambda: len(self.runs))
+        metrics.gauge("verifier_bitmap_bytes", "Memory used by the order_id bitmaps", self.memory_bytes)
+
+    def _partition(self, partition: int) -> PartitionStats:
+        stats = self.partitions.get(partition)
+        if stats is None:
+            stats = self.partitions[partition] = PartitionStats()
+            labels = {"partition": str(partition)}
+            for name, help_text in (("duplicates", "Orders received more than once"),
+                                    ("out_of_order", "Orders older than one already seen on the partition"),
+                                    ("skipped_offsets", "Offsets skipped between consecutive records")):
+                self.metrics.gauge(f"verifier_{name}_total", help_text,
+                                   lambda name=name: getattr(stats, name), kind="counter", **labels)
+        return stats
+
+    def observe(self, partition: int, offset: int, order_id: int, run: Optional[int] = None) -> str:
+        """Record one order of a producer run; returns "ok", "duplicate" or "out_of_order" """
+        with self.lock:
+            stats = self._partition(partition)
+            stats.received += 1
+
+            if stats.last_offset is not None and offset > stats.last_offset + 1:
+                stats.offset_gaps += 1
+                stats.skipped_offsets += offset - stats.last_offset - 1
+            stats.last_offset = offset
+
+            run_stats = self.runs.get(run)
+            if run_stats is None:
+                run_stats = self.runs[run] = RunStats()
+
+            last_order_id = stats.last_order_ids.get(run)
+            if not run_stats.add(order_id):
+                stats.duplicates += 1
+                status = "duplicate"
+            elif last_order_id is not None and order_id < last_order_id:
+                stats.out_of_order += 1
+                status = "out_of_order"
+            else:
+                status = "ok"
+            stats.last_order_ids[run] = order_id if last_order_id is None else max(order_id, last_order_id)
+
+        if status != "ok":
+            self.log.info(f"🔎 {status.replace('_', '-')} order #{order_id} (run {run_label(run)}) on partition "
+                          f"{partition} at offset {offset}", event=f"verify_{status}", partition=partition,
+                          offset=offset, order_id=order_id, producer_run=run_label(run))
+        return status
+
+    def unique_count(self) -> int:
+        with self.lock:
+            return sum(len(r.seen) for r in self.runs.values())
+
+    def missing_count(self) -> int:
+        with self.lock:
+            return sum(r.missing_count() for r in self.runs.values())
+
+    def memory_bytes(self) -> int:
+        with self.lock:
+            return sum(r.seen.memory_bytes() for r in self.runs.values())
+
+    def summary(self) -> str:
+        with self.lock:
+            duplicates = sum(s.duplicates for s in self.partitions.values())
+            out_of_order = sum(s.out_of_order for s in self.partitions.values())
+            return (f"🔎 Verifier: {self.unique_count()} unique, {self.missing_count()} missing, "
+                    f"{duplicates} duplicates, {out_of_order} out of order, "
+                    f"{len(self.runs)} producer run{'s' if len(self.runs) != 1 else ''}")
+
+    def report(self, limit: int = 20) -> List[str]:
+        """Final per-partition table and the first `limit` missing order_id ranges"""
+        with self.lock:
+            lines = ["🔎 Order stream verification:", self.summary().replace("🔎 Verifier: ", "   Totals: ")]
+            for partition, stats in sorted(self.partitions.items()):
+                lines.append(f"   Partition {partition}: received {stats.received}, "
+                             f"duplicates {stats.duplicates}, out of order {stats.out_of_order}, "
+                             f"offset gaps {stats.offset_gaps} ({stats.skipped_offsets} offsets)")
+            for run, stats in self.runs.items():
+                line = (f"   Run {run_label(run)}: order_id {stats.min_order_id}-{stats.max_order_id}, "
+                        f"{len(stats.seen)} unique, {stats.missing_count()} missing")
+                if stats.missing_count():
+                    ranges = stats.seen.missing_ranges(stats.min_order_id, stats.max_order_id, limit)
+                    text = ", ".join(str(start) if start == end else f"{start}-{end}" for start, end in ranges)
+                    line += f": {text}" + (" ..." if len(ranges) == limit else "")
+                lines.append(line)
+            lines.append(f"   Bitmap memory: {self.memory_bytes() / 1024:,.1f} KiB")
+            verdict = ("✅ No lost or duplicated orders" if not self.missing_count()
+                       and all(not s.duplicates for s in self.partitions.values())
+                       else "❌ Lost or duplicated orders detected")
+            lines.append(f"   {verdict}")
+        return lines
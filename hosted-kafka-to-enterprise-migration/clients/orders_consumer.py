@@ -1,82 +1,336 @@
 #!/usr/bin/env python3
 
-import json
 import signal
 import sys
+import threading
+import time
 import argparse
 from datetime import datetime
 from typing import Dict, Any, Optional
 
-from kafka import KafkaConsumer
-from kafka.errors import KafkaError
-
+from batch_processing import REQUIRED_FIELDS, OrderBatchProcessor
+from client_logging import RecordLogger, add_logging_arguments, logger_from_args
+from client_metrics import MetricsRegistry, start_metrics_server
+from client_readiness import ReadinessFile
+from dead_letters import DeadLetter, DeadLetterQueue
+from end_to_end_latency import EndToEndLatency
 from kafka_config import ConfigManager
+from fetch_profiles import FETCH_MODES, AdaptiveFetchController, fetch_settings
+from kafka_engines import ENGINES, CONSUMER_ENGINES, kafka_errors
+from lag_tracker import LagTracker
+from offset_commits import CommitManager
+from order_dedupe import DedupeCache, producer_run
+from order_verifier import OrderVerifier
+from partition_workers import PartitionWorkerPool
+from window_aggregations import StateCheckpoint, WindowAggregator
+from order_serde import SERDES, get_serde
+from startup_timing import StartupTimer
 
 class OrdersConsumer:
-    def __init__(self, group_id: str = "orders-consumer-group"):
-        self.config_manager = ConfigManager()
+    def __init__(self, group_id: str = "orders-consumer-group", serde: str = "json",
+                 record_logger: RecordLogger = None, engine: str = "kafka-python",
+                 batch_mode: bool = False, commit_every: int = 500, commit_interval: float = 1.0,
+                 workers: int = 0, worker_queue: int = 1000, lag_interval: float = 5.0,
+                 fetch_profile: str = "balanced", verify: bool = False,
+                 dedupe: Optional[Dict[str, Any]] = None, window_size: Optional[int] = None,
+                 window_slide: Optional[int] = None, checkpoint_file: Optional[str] = None,
+                 dlq_topic: Optional[str] = None, env_file: Optional[str] = None,
+                 ready_file: Optional[str] = None, settings_overrides: Optional[Dict[str, Any]] = None,
+                 warmup: bool = True):
+        # Process start -> first record, logged once, see startup_timing.py
+        self.startup = StartupTimer()
+        self.warmup = warmup
+        self.config_manager = ConfigManager(env_file)
+        # Readiness events for cutover.py, see client_readiness.py
+        self.readiness = ReadinessFile(ready_file) if ready_file else None
+        self.engine_name = engine
         self.consumer = None
+        self.log = record_logger or RecordLogger()
+        self.serde = get_serde(serde)
         self.group_id = group_id
         self.running = True
         self.total_orders = 0
         self.total_value = 0.0
         
-    def display_current_offsets(self):
-        """Display current consumer group offsets"""
-        try:
-            if self.consumer:
-                # Get current assignment
-                assignment = self.consumer.assignment()
-                if assignment:
-                    print("📊 Current Consumer Group Offsets:")
-                    for topic_partition in assignment:
-                        position = self.consumer.position([topic_partition])
-                        committed = self.consumer.committed([topic_partition])
-                        print(f"   Topic: {topic_partition.topic}, "
-                              f"Partition: {topic_partition.partition}, "
-                              f"Current Position: {position[0] if position else 'N/A'}, "
-                              f"Committed Offset: {committed[0] if committed else 'N/A'}")
-                else:
-                    print("📊 No partitions currently assigned to consumer")
-                print("-" * 80)
-        except Exception as e:
-            print(f"⚠️  Could not display offsets: {e}")
+        # Columnar path: whole poll batches are validated and aggregated with NumPy
+        self.batch_processor = OrderBatchProcessor() if batch_mode else None
+        self.lag_interval = lag_interval
+        self.lag_tracker = None
+        self.fetch_profile = fetch_profile
+        self.fetch_controller = None
+        # Undecodable or invalid records are forwarded here, see dead_letters.py
+        self.dlq_topic = dlq_topic
+        self.dlq = None
+        # A config reload that changes the target cluster switches the client in place, see retarget()
+        self.consumer_settings = None
+        # Extra kafka-python settings applied last, e.g. timeouts tried by cutover_benchmark.py
+        self.settings_overrides = settings_overrides or {}
+        self.retarget_to = None
+        self.retargeted_at = None
+        self.config_manager.add_reload_listener(self.request_retarget)
+        
+        # Stage latency histograms and throughput counters, see client_metrics.py
+        self.metrics = MetricsRegistry("orders_consumer")
+        stage_help = "Latency of each consumer stage in seconds"
+        self.poll_latency = self.metrics.histogram("stage_latency_seconds", stage_help, stage="poll")
+        self.deserialize_latency = self.metrics.histogram("stage_latency_seconds", stage_help, stage="deserialize")
+        self.process_latency = self.metrics.histogram("stage_latency_seconds", stage_help, stage="process")
+        self.invalid_orders_total = self.metrics.counter("invalid_orders_total", "Orders that failed validation")
+        self.errors_total = self.metrics.counter("errors_total", "Errors raised while polling or processing")
+        self.metrics.gauge("orders_processed_total", "Orders processed successfully",
+                           lambda: self.total_orders, kind="counter")
+        # Producer send -> poll return per partition, from the producer's sent_at_ns header
+        self.end_to_end = EndToEndLatency(self.metrics, self.config_manager.active_config)
+        self.retarget_pause = self.metrics.histogram("retarget_pause_seconds",
+                                                     "Time processing was paused while switching clusters")
+        
+        # Per-minute revenue windows, see window_aggregations.py
+        self.aggregator = None
+        if window_size:
+            self.aggregator = WindowAggregator(self.metrics, self.log, window_seconds=window_size,
+                                               slide_seconds=window_slide)
+        
+        # State is checkpointed with the offsets it covers and restored here
+        self.checkpoint = None
+        if checkpoint_file:
+            self.checkpoint = StateCheckpoint(checkpoint_file, self.checkpoint_state, self.metrics)
+            self.restore_checkpoint()
+        
+        # Offsets are committed only after processing, see offset_commits.py
+        self.commits = CommitManager(self.metrics, self.log, commit_every=commit_every,
+                                     commit_interval=commit_interval, checkpoint=self.checkpoint,
+                                     holds=self.commit_holds)
+        
+        # Gap/duplicate detection over order_ids, see order_verifier.py
+        self.verifier = OrderVerifier(self.metrics, self.log) if verify else None
+        
+        # Drops replayed orders before they are counted, see order_dedupe.py
+        self.dedupe = DedupeCache(self.metrics, **dedupe) if dedupe is not None else None
+        
+        # Partition-parallel mode: process_order runs on worker threads, one thread per partition
+        self.stats_lock = threading.Lock()
+        self.workers = None
+        if workers:
+            self.workers = PartitionWorkerPool(self.process_order, self.commits, self.metrics, self.log,
+                                               workers=workers, max_queue=worker_queue)
+        
+    def commit_holds(self) -> Dict[Any, int]:
+        """Offsets of dead letters not yet acknowledged by the DLQ topic; commits stop short of them"""
+        return self.dlq.unacked() if self.dlq else {}
+    
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """Consumer state saved alongside committed offsets"""
+        return {
+            "total_orders": self.total_orders,
+            "total_value": self.total_value,
+            "windows": self.aggregator.snapshot() if self.aggregator else None,
+        }
+    
+    def restore_checkpoint(self):
+        """Load the last checkpoint so assigned partitions resume where it left off"""
+        started = time.perf_counter()
+        state = self.checkpoint.load()
+        if state is None:
+            print("💾 No checkpoint found, starting fresh")
+            return
+        self.total_orders = state["total_orders"]
+        self.total_value = state["total_value"]
+        if self.aggregator and state.get("windows"):
+            self.aggregator.restore(state["windows"])
+        positions = ", ".join(f"{tp.partition}@{offset}" for tp, offset in sorted(self.checkpoint.offsets.items()))
+        print(f"♻️  Restored checkpoint in {(time.perf_counter() - started) * 1000:.1f}ms: "
+              f"{self.total_orders} orders, resuming partitions {positions}")
+    
+    def display_lag(self):
+        """Log the lag tracker's latest snapshot; never calls the broker"""
+        if self.lag_tracker:
+            self.log.info("\n".join(self.lag_tracker.report() + ["-" * 80]), event="lag")
 
     def setup_consumer(self):
         """Initialize Kafka consumer"""
         try:
-            kafka_config = self.config_manager.get_kafka_config_dict()
             config = self.config_manager.get_active_config()
             
-            # Add consumer-specific configurations
-            consumer_config = {
-                **kafka_config,
-                'group_id': self.group_id,
-                'value_deserializer': lambda m: json.loads(m.decode('utf-8')),
-                'key_deserializer': lambda k: k.decode('utf-8') if k else None,
+            # Add consumer-specific configurations (kafka-python names, translated per engine)
+            consumer_settings = {
                 'auto_offset_reset': 'earliest',
-                'enable_auto_commit': True,
-                'auto_commit_interval_ms': 1000,
+                'enable_auto_commit': False,
                 'session_timeout_ms': 30000,
                 'heartbeat_interval_ms': 10000,
-                'max_poll_records': 500,
-                'fetch_min_bytes': 1,
-                'fetch_max_wait_ms': 500
+                'max_poll_interval_ms': 300000,
+                # fetch_min_bytes, fetch_max_wait_ms, max_poll_records, ... see fetch_profiles.py
+                **fetch_settings(self.fetch_profile),
+                **self.settings_overrides,
             }
+            if self.fetch_profile == "adaptive":
+                self.fetch_controller = AdaptiveFetchController(
+                    consumer_settings, self.metrics,
+                    max_poll_interval_ms=consumer_settings['max_poll_interval_ms'])
+            
+            self.consumer_settings = consumer_settings
+            self.consumer = self.build_consumer(config.topic_name)
+            self.commits.bind(self.consumer)
+            self.startup.mark("client")
+            if self.warmup:
+                self.warmup_consumer(config.topic_name)
             
-            self.consumer = KafkaConsumer(
-                config.topic_name,
-                **consumer_config
-            )
+            if self.dlq_topic:
+                self.dlq = DeadLetterQueue(self.config_manager, self.dlq_topic, self.group_id,
+                                           self.metrics, self.log, engine=self.engine_name)
+            self.start_lag_tracker(config.topic_name)
+            if self.readiness:
+                self.readiness.event("connected", bootstrap_servers=config.bootstrap_servers)
             
-            print(f"✅ Consumer connected to: {kafka_config['bootstrap_servers']}")
+            print(f"✅ Consumer connected to: {config.bootstrap_servers} ({self.engine_name})")
             print(f"📊 Consumer group: {self.group_id}")
             print(f"📥 Subscribed to topic: {config.topic_name}")
+            print(f"📦 Fetch profile: {self.fetch_profile}")
+            if self.dedupe:
+                print(f"🧽 Dedupe: {self.dedupe.describe()}")
+            if self.dlq:
+                print(f"📮 Dead letters go to: {self.dlq_topic}")
             
         except Exception as e:
             print(f"❌ Failed to create consumer: {e}")
             raise
     
+    def build_consumer(self, topic: str):
+        """Create a consumer engine for the active config, subscribed but not yet joined"""
+        settings = dict(self.consumer_settings)
+        if self.fetch_controller:
+            # Keep the fetch sizes the adaptive controller has settled on
+            settings.update(self.fetch_controller.fetch_overrides())
+        return CONSUMER_ENGINES[self.engine_name](
+            self.config_manager,
+            topic,
+            self.group_id,
+            key_deserializer=lambda k: k.decode('utf-8') if k else None,
+            # Values are decoded by decode_batch(), where failures keep their original bytes
+            value_deserializer=None,
+            settings=settings,
+            rebalance_listener=self.workers or self.commits
+        )
+    
+    def warmup_consumer(self, topic: str):
+        """Fetch metadata and connect to the coordinator and leaders before the first poll"""
+        try:
+            self.consumer.warmup(topic)
+            self.startup.mark("warmup")
+        except Exception as e:
+            self.log.error(f"⚠️  Warmup failed, the first poll will connect instead: {e}",
+                           event="warmup_failed", topic=topic, error=str(e))
+    
+    def start_lag_tracker(self, topic: str):
+        """Lag is fetched on its own thread and client, see lag_tracker.py"""
+        if self.lag_interval:
+            self.lag_tracker = LagTracker(self.config_manager, topic, self.group_id,
+                                          self.metrics, self.log, engine=self.engine_name,
+                                          interval=self.lag_interval)
+            self.lag_tracker.start()
+    
+    def request_retarget(self, previous, config):
+        """Reload listener: ask the poll loop to switch clusters before its next poll"""
+        print(f"🔀 Retarget requested: {previous.bootstrap_servers} -> {config.bootstrap_servers}")
+        self.retarget_to = config
+    
+    def retarget(self):
+        """Switch to the reloaded config in place: build and warm up first, then drain, commit and swap"""
+        config, self.retarget_to = self.retarget_to, None
+        started = time.perf_counter()
+        try:
+            consumer = self.build_consumer(config.topic_name)
+            consumer.warmup(config.topic_name)
+            dlq = (DeadLetterQueue(self.config_manager, self.dlq_topic, self.group_id, self.metrics,
+                                   self.log, engine=self.engine_name) if self.dlq_topic else None)
+        except Exception as e:
+            self.log.error(f"❌ Retarget to {config.bootstrap_servers} failed, still consuming from the "
+                           f"previous cluster: {e}", event="retarget_failed", error=str(e))
+            return
+        
+        # Processing stops here: finish in-flight records and commit them to the old cluster,
+        # after the old DLQ has delivered what it holds so those offsets can be committed too
+        paused_at = time.perf_counter()
+        if self.workers:
+            self.workers.on_partitions_revoked(list(self.workers.depth))
+        if self.dlq:
+            self.dlq.close()
+        self.commits.on_partitions_revoked(list(self.commits.processed))
+        previous = self.consumer
+        previous.close()
+        self.consumer = consumer
+        self.commits.bind(consumer)
+        self.dlq = dlq
+        pause = time.perf_counter() - paused_at
+        self.retarget_pause.record(pause)
+        
+        if self.lag_tracker:
+            self.lag_tracker.stop()
+            self.start_lag_tracker(config.topic_name)
+        self.end_to_end = EndToEndLatency(self.metrics, self.config_manager.active_config)
+        self.retargeted_at = time.perf_counter()
+        
+        self.log.info(f"🔀 Retargeted to {self.config_manager.active_config} at {config.bootstrap_servers}: "
+                      f"client ready in {(paused_at - started) * 1000:.1f}ms, processing paused "
+                      f"{pause * 1000:.1f}ms", event="retargeted", bootstrap_servers=config.bootstrap_servers,
+                      prepare_ms=(paused_at - started) * 1000, pause_ms=pause * 1000)
+    
+    def report_readiness(self, message_batch: Dict[Any, list]):
+        """First assignment and first/last polled records, for cutover.py"""
+        if "assigned" not in self.readiness.written and self.consumer.assignment():
+            self.readiness.event("assigned")
+        if message_batch:
+            self.readiness.observe("record")
+    
+    def report_startup(self, message_batch: Dict[Any, list]):
+        """Mark the group join, then log the startup breakdown at the first records"""
+        if not self.startup.marked("assigned") and self.consumer.assignment():
+            self.startup.mark("assigned")
+        if message_batch:
+            self.startup.finish("first_record", self.log)
+    
+    def decode_value(self, data: Optional[bytes]):
+        """Decode and validate a value; failures come back as a DeadLetter holding the original bytes"""
+        try:
+            order = self.serde.decode(data)
+        except Exception as e:
+            return DeadLetter(data, "decode_error", str(e))
+        try:
+            missing = [field for field in REQUIRED_FIELDS if field not in order]
+        except TypeError:
+            return DeadLetter(data, "invalid_order", f"expected an object, got {type(order).__name__}")
+        if missing:
+            return DeadLetter(data, "invalid_order", f"missing {', '.join(missing)}")
+        amount = order['total_amount']
+        if not isinstance(amount, (int, float)) or isinstance(amount, bool):
+            return DeadLetter(data, "invalid_order", f"total_amount is not a number: {amount!r}")
+        return order
+    
+    def decode_batch(self, message_batch: Dict[Any, list]) -> Dict[Any, list]:
+        """Decode a poll batch outside the client, so one bad record cannot fail the whole poll"""
+        started = time.perf_counter()
+        decoded = {}
+        count = 0
+        for topic_partition, messages in message_batch.items():
+            decoded[topic_partition] = [message._replace(value=self.decode_value(message.value))
+                                        for message in messages]
+            count += len(messages)
+        if count:
+            self.deserialize_latency.record((time.perf_counter() - started) / count, count)
+        return decoded
+    
+    def dead_letter(self, message, letter: DeadLetter):
+        """Count and log a record that cannot be processed, and forward it to the DLQ if configured"""
+        if letter.kind == "invalid_order":
+            self.invalid_orders_total.inc()
+            self.log.error(f"⚠️  Invalid order format ({letter.reason}): {letter.raw!r}", event="invalid_order",
+                           partition=message.partition, offset=message.offset, reason=letter.reason)
+        else:
+            self.errors_total.inc()
+            self.log.error(f"❌ Decode error: {letter.reason}", event="decode_error",
+                           partition=message.partition, offset=message.offset, error=letter.reason)
+        if self.dlq:
+            self.dlq.send(message, letter)
+    
     def format_order(self, order: Dict[str, Any]) -> str:
         """Format order for display"""
         timestamp = datetime.fromisoformat(order['timestamp'].replace('Z', '+00:00'))
@@ -97,50 +351,119 @@ class OrdersConsumer:
         try:
             order = message.value
             
-            # Validate order structure
-            required_fields = ['order_id', 'customer_id', 'total_amount', 'timestamp']
-            if not all(field in order for field in required_fields):
-                print(f"⚠️  Invalid order format: {order}")
+            # Records that failed decode_batch() carry a DeadLetter instead of an order
+            if isinstance(order, DeadLetter):
+                self.dead_letter(message, order)
                 return False
             
+            # The verifier sees every delivery; dedupe then drops replays before they are counted
+            run = producer_run(message)
+            if self.verifier:
+                self.verifier.observe(message.partition, message.offset, order['order_id'], run)
+            if self.dedupe and self.dedupe.seen(order['order_id'], run):
+                return True
+            
             # Update statistics
-            self.total_orders += 1
-            self.total_value += order['total_amount']
+            with self.stats_lock:
+                self.total_orders += 1
+                self.total_value += order['total_amount']
+                total_orders, total_value = self.total_orders, self.total_value
             
-            # Display offset information prominently
-            print(f"📍 [Partition:{message.partition} | Offset:{message.offset} | Group:{self.group_id}]")
+            if self.aggregator:
+                self.aggregator.add(message.timestamp, order)
             
-            # Display order
-            print(self.format_order(order))
+            # Display offset information prominently, then the order itself
+            if self.log.sampled():
+                self.log.info(f"📍 [Partition:{message.partition} | Offset:{message.offset} | Group:{self.group_id}]\n"
+                              f"{self.format_order(order)}",
+                              event="order_consumed", partition=message.partition, offset=message.offset,
+                              order_id=order['order_id'], customer_id=order['customer_id'],
+                              total_amount=order['total_amount'])
             
             # Show statistics every 10 orders
-            if self.total_orders % 10 == 0:
-                avg_value = self.total_value / self.total_orders
-                print(f"📊 Statistics: {self.total_orders} orders, "
-                      f"Total value: ${self.total_value:,.2f}, "
-                      f"Average: ${avg_value:,.2f}")
-                print("-" * 80)
+            if total_orders % 10 == 0:
+                avg_value = total_value / total_orders
+                self.log.info(f"📊 Statistics: {total_orders} orders, "
+                              f"Total value: ${total_value:,.2f}, "
+                              f"Average: ${avg_value:,.2f}\n" + "-" * 80,
+                              event="statistics", total_orders=total_orders,
+                              total_value=total_value)
+                if self.verifier:
+                    self.log.info(self.verifier.summary(), event="verification")
             
-            # Display offsets every 20 orders for monitoring
-            if self.total_orders % 20 == 0:
-                self.display_current_offsets()
+            # Display lag every 20 orders for monitoring
+            if total_orders % 20 == 0:
+                self.display_lag()
             
             return True
             
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON decode error: {e}")
-            return False
         except Exception as e:
-            print(f"❌ Error processing order: {e}")
+            self.errors_total.inc()
+            self.log.error(f"❌ Error processing order: {e}", event="process_error",
+                           partition=message.partition, offset=message.offset, error=str(e))
             return False
     
+    def process_batch(self, message_batch: Dict[Any, list]) -> int:
+        """Process a whole poll batch in columnar form; returns the number of valid orders"""
+        records = [message for messages in message_batch.values() for message in messages]
+        
+        def keep(message) -> bool:
+            order_id, run = message.value['order_id'], producer_run(message)
+            if self.verifier:
+                self.verifier.observe(message.partition, message.offset, order_id, run)
+            return not (self.dedupe and self.dedupe.seen(order_id, run))
+        
+        result = self.batch_processor.process(records, keep if self.verifier or self.dedupe else None)
+        
+        for message, letter in result.invalid:
+            self.dead_letter(message, letter)
+        
+        if self.aggregator:
+            for message in result.valid:
+                self.aggregator.add(message.timestamp, message.value)
+        
+        previous_total = self.total_orders
+        self.total_orders += result.valid_count
+        self.total_value += result.total_value
+        
+        if result.valid_count and self.log.sampled():
+            partitions = ", ".join(f"{tp.partition}:{messages[0].offset}-{messages[-1].offset}"
+                                   for tp, messages in message_batch.items())
+            self.log.info(f"📦 [Batch | Partitions {partitions} | Group:{self.group_id}] "
+                          f"{result.valid_count} orders, ${result.total_value:,.2f}",
+                          event="batch_consumed", orders=result.valid_count,
+                          total_amount=result.total_value)
+        
+        # Same cadence as the per-record path, checked once per batch
+        if self.total_orders // 10 > previous_total // 10:
+            avg_value = self.total_value / self.total_orders
+            self.log.info(f"📊 Statistics: {self.total_orders} orders, "
+                          f"Total value: ${self.total_value:,.2f}, "
+                          f"Average: ${avg_value:,.2f}\n" + "-" * 80,
+                          event="statistics", total_orders=self.total_orders,
+                          total_value=self.total_value)
+            if self.verifier:
+                self.log.info(self.verifier.summary(), event="verification")
+        if self.total_orders // 20 > previous_total // 20:
+            self.display_lag()
+        
+        return result.valid_count
+    
+    def adapt_fetch(self, records: int, processing_seconds: float, processed: Optional[int] = None):
+        """Let the adaptive controller resize the next poll and, where supported, the fetches"""
+        if self.fetch_controller and self.fetch_controller.observe(records, processing_seconds, processed):
+            self.consumer.tune_fetch(self.fetch_controller.fetch_overrides())
+    
     def signal_handler(self, signum, frame):
         """Handle graceful shutdown"""
         print(f"\n🛑 Received signal {signum}, shutting down gracefully...")
         self.running = False
     
-    def run(self, timeout_ms: Optional[int] = 1000):
+    def run(self, timeout_ms: Optional[int] = 1000, metrics_port: int = None):
         """Run the consumer"""
+        if metrics_port:
+            start_metrics_server(self.metrics, metrics_port)
+
         print(f"🚀 Starting Orders Consumer")
         print(f"📊 Environment: {self.config_manager.active_config}")
         print(f"👥 Consumer group: {self.group_id}")
@@ -150,19 +473,76 @@ class OrdersConsumer:
         # Setup signal handlers
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
+        # SIGHUP or an edited --env-file reloads the cached config, see kafka_config.py
+        self.config_manager.install_reload_signal()
+        self.config_manager.watch()
         
         try:
             self.setup_consumer()
-            self.display_current_offsets() # Display offsets at startup
             
             print("🔍 Starting to consume orders...")
             print("-" * 80)
             
             while self.running:
+                if self.dlq and self.dlq.failure is not None:
+                    # Its hold pins the commits for good, so restart rather than consume uncommitted
+                    self.log.error(f"❌ Dead-letter topic {self.dlq_topic} is not writable, stopping: "
+                                   f"{self.dlq.failure}", event="dlq_unhealthy", error=str(self.dlq.failure))
+                    break
                 try:
-                    message_batch = self.consumer.poll(timeout_ms=timeout_ms)
+                    if self.retarget_to is not None:
+                        self.retarget()
+                    
+                    started = time.perf_counter()
+                    max_records = self.fetch_controller.max_records if self.fetch_controller else None
+                    message_batch = self.consumer.poll(timeout_ms=timeout_ms, max_records=max_records)
+                    polled_at = time.perf_counter()
+                    self.poll_latency.record(polled_at - started)
+                    if self.readiness:
+                        self.report_readiness(message_batch)
+                    if self.startup.pending:
+                        self.report_startup(message_batch)
+                    
+                    if self.workers:
+                        # Offsets completed by workers since the last poll, then backpressure
+                        self.workers.mark_completed()
+                        self.workers.flow_control(self.consumer)
                     
                     if not message_batch:
+                        self.commits.maybe_commit()
+                        self.adapt_fetch(0, 0.0)
+                        continue
+                    
+                    self.end_to_end.record_batch(message_batch)
+                    if self.retargeted_at is not None:
+                        # Includes the group join on the new cluster, which the pause above does not
+                        self.log.info(f"📥 First records after retarget in "
+                                      f"{(polled_at - self.retargeted_at) * 1000:.1f}ms",
+                                      event="retarget_first_records",
+                                      delay_ms=(polled_at - self.retargeted_at) * 1000)
+                        self.retargeted_at = None
+                    message_batch = self.decode_batch(message_batch)
+                    polled_records = sum(len(messages) for messages in message_batch.values())
+                    
+                    if self.workers:
+                        for topic_partition, messages in message_batch.items():
+                            self.workers.submit(topic_partition, messages)
+                        self.commits.maybe_commit()
+                        # Submitting only queues the batch; the cost is what the workers spent on records
+                        processed, busy_seconds = self.workers.take_processing_time()
+                        self.adapt_fetch(polled_records, busy_seconds, processed)
+                        continue
+                    
+                    if self.batch_processor:
+                        # Record the per-order cost so the process histogram stays comparable
+                        started = time.perf_counter()
+                        self.process_batch(message_batch)
+                        self.process_latency.record((time.perf_counter() - started) / polled_records,
+                                                    polled_records)
+                        for topic_partition, messages in message_batch.items():
+                            self.commits.mark(topic_partition, messages[-1].offset, len(messages))
+                        self.commits.maybe_commit()
+                        self.adapt_fetch(polled_records, time.perf_counter() - polled_at)
                         continue
                     
                     for topic_partition, messages in message_batch.items():
@@ -170,14 +550,23 @@ class OrdersConsumer:
                             if not self.running:
                                 break
                             
+                            started = time.perf_counter()
                             self.process_order(message)
+                            self.process_latency.record(time.perf_counter() - started)
+                            # Invalid orders are skipped, so they count as processed too
+                            self.commits.mark(topic_partition, message.offset)
+                    
+                    self.commits.maybe_commit()
+                    self.adapt_fetch(polled_records, time.perf_counter() - polled_at)
                             
-                except KafkaError as e:
-                    print(f"❌ Kafka error: {e}")
+                except kafka_errors() as e:
+                    self.errors_total.inc()
+                    self.log.error(f"❌ Kafka error: {e}", event="kafka_error", error=str(e))
                     if not self.running:
                         break
                 except Exception as e:
-                    print(f"❌ Unexpected error: {e}")
+                    self.errors_total.inc()
+                    self.log.error(f"❌ Unexpected error: {e}", event="consumer_error", error=str(e))
                     if not self.running:
                         break
                         
@@ -190,9 +579,33 @@ class OrdersConsumer:
     
     def cleanup(self):
         """Clean up resources"""
+        if self.workers:
+            print("⏳ Waiting for workers to finish in-flight orders...")
+            self.workers.shutdown()
+        
+        if self.lag_tracker:
+            self.lag_tracker.stop()
+        
+        # Dead letters are delivered before their offsets are committed for the last time
+        if self.dlq:
+            self.dlq.close()
+        
+        if self.consumer is None and self.checkpoint:
+            self.checkpoint.close()
+        
         if self.consumer:
+            if self.commits.commit_sync():
+                print("💾 Committed processed offsets")
             print("🧹 Closing consumer...")
             self.consumer.close()
+            if self.checkpoint:
+                self.checkpoint.close()
+        
+        if self.readiness:
+            self.readiness.close()
+        
+        # Drain queued record logs before the summary so output stays in order
+        self.log.close()
         
         print(f"📊 Final Statistics:")
         print(f"   Total orders processed: {self.total_orders}")
@@ -200,6 +613,33 @@ class OrdersConsumer:
         if self.total_orders > 0:
             avg_value = self.total_value / self.total_orders
             print(f"   Average order value: ${avg_value:,.2f}")
+        
+        if self.batch_processor and self.total_orders > 0:
+            print("🏆 Top customers by revenue:")
+            for customer, revenue, orders in self.batch_processor.top_customers():
+                print(f"   {customer}: ${revenue:,.2f} ({orders} orders)")
+            print("🏆 Top products by revenue:")
+            for product, revenue, quantity in self.batch_processor.top_products():
+                print(f"   {product}: ${revenue:,.2f} ({quantity} units)")
+        
+        if self.aggregator:
+            end, window = self.aggregator.current()
+            if window:
+                print(self.aggregator.format_window(end, window).replace("🪟 Window", "🪟 Open window"))
+        if self.dedupe:
+            print(f"🧽 Duplicates dropped: {self.dedupe.window_hits.value} in window, "
+                  f"{self.dedupe.filter_hits.value} by filter")
+        if self.dlq:
+            stats = self.dlq.stats()
+            print(f"📮 Dead letters: {stats['sent']} sent, {stats['retried']} retried, {stats['failed']} failed, "
+                  f"{stats['waited']} waited for queue room")
+        if self.verifier:
+            print("\n".join(self.verifier.report()))
+        
+        stage_summary = self.metrics.summary()
+        if stage_summary:
+            print("📊 Stage latencies:")
+            print(stage_summary)
         print("✅ Consumer stopped")
 
 def main():
@@ -208,18 +648,85 @@ def main():
                        help='Consumer group ID (default: orders-consumer-group)')
     parser.add_argument('--timeout', type=int, default=1000,
                        help='Poll timeout in milliseconds (default: 1000)')
-    parser.add_argument('--env', choices=['msk', 'msk-scram', 'cc'], 
+    parser.add_argument('--metrics-port', type=int, default=None,
+                       help='Serve Prometheus metrics on http://localhost:PORT/metrics')
+    parser.add_argument('--engine', choices=ENGINES, default='kafka-python',
+                       help='Client library to run on (default: kafka-python)')
+    parser.add_argument('--serde', choices=list(SERDES), default='json',
+                       help='Value deserializer (default: json)')
+    parser.add_argument('--batch-mode', action='store_true',
+                       help='Validate and aggregate each poll batch with NumPy instead of per record')
+    parser.add_argument('--workers', type=int, default=0,
+                       help='Process orders on this many worker threads, keyed by partition (default: 0, poll thread)')
+    parser.add_argument('--worker-queue', type=int, default=1000,
+                       help='Pause a partition once this many of its records are in flight (default: 1000)')
+    parser.add_argument('--fetch-profile', choices=FETCH_MODES, default='balanced',
+                       help='Fetch sizing: fixed profile or adaptive (default: balanced)')
+    parser.add_argument('--verify', action='store_true',
+                       help='Track order_ids to report gaps, duplicates and out-of-order arrivals')
+    parser.add_argument('--dedupe', action='store_true',
+                       help='Drop orders whose order_id was already processed')
+    parser.add_argument('--dedupe-window', type=int, default=100000,
+                       help='order_ids kept exactly in the LRU window (default: 100000)')
+    parser.add_argument('--dedupe-ttl', type=float, default=None,
+                       help='Also expire window entries older than this many seconds')
+    parser.add_argument('--dedupe-fp-rate', type=float, default=0.001,
+                       help='Bloom filter false-positive rate for ids older than the window (default: 0.001)')
+    parser.add_argument('--dedupe-memory-mb', type=float, default=64.0,
+                       help='Memory cap for the dedupe window and filters in MiB (default: 64)')
+    parser.add_argument('--window-size', type=int, default=None,
+                       help='Aggregate revenue per customer, product and region in windows of N seconds')
+    parser.add_argument('--window-slide', type=int, default=None,
+                       help='Slide windows every N seconds (default: tumbling, slide = window size)')
+    parser.add_argument('--checkpoint-file', type=str, default=None,
+                       help="Checkpoint consumer state with committed offsets to this file (e.g. orders_state.ckpt) and resume from it")
+    parser.add_argument('--dlq-topic', type=str, default=None,
+                       help='Forward undecodable or invalid orders, with their original bytes, to this topic')
+    parser.add_argument('--lag-interval', type=float, default=5.0,
+                       help='Refresh consumer lag in the background every N seconds, 0 to disable (default: 5)')
+    parser.add_argument('--commit-every', type=int, default=500,
+                       help='Commit offsets asynchronously after this many processed records (default: 500)')
+    parser.add_argument('--commit-interval', type=float, default=1.0,
+                       help='Commit offsets asynchronously at least this often, in seconds (default: 1.0)')
+    parser.add_argument('--env', choices=['msk', 'msk-scram', 'gateway', 'cc', 'local'],
                        help='Kafka environment (overrides KAFKA_ENV)')
+    parser.add_argument('--env-file', type=str, default=None,
+                       help='Load settings from an env.* file and reload it on change or SIGHUP')
+    parser.add_argument('--ready-file', type=str, default=None,
+                       help='Append readiness events (connected, assigned, first/last record) as JSON lines for cutover.py')
+    parser.add_argument('--no-warmup', action='store_true',
+                       help='Skip fetching metadata and connecting to the coordinator before the first poll')
+    add_logging_arguments(parser)
     
     args = parser.parse_args()
+    if args.env and args.env_file:
+        parser.error("--env and --env-file cannot be combined; set KAFKA_ENV in the env file")
+    if args.batch_mode and args.workers:
+        parser.error("--batch-mode and --workers cannot be combined")
+    if args.checkpoint_file and args.workers:
+        # Workers finish records ahead of the offsets marked for commit, so state could run ahead
+        parser.error("--checkpoint-file cannot be combined with --workers")
     
     # Override environment if specified
     if args.env:
         import os
         os.environ['KAFKA_ENV'] = args.env
     
-    consumer = OrdersConsumer(group_id=args.group_id)
-    consumer.run(timeout_ms=args.timeout)
+    dedupe = None
+    if args.dedupe:
+        dedupe = {'window_size': args.dedupe_window, 'window_seconds': args.dedupe_ttl,
+                  'fp_rate': args.dedupe_fp_rate, 'memory_mb': args.dedupe_memory_mb}
+    
+    consumer = OrdersConsumer(group_id=args.group_id, serde=args.serde,
+                              record_logger=logger_from_args(args), engine=args.engine,
+                              batch_mode=args.batch_mode, commit_every=args.commit_every,
+                              commit_interval=args.commit_interval, workers=args.workers,
+                              worker_queue=args.worker_queue, lag_interval=args.lag_interval,
+                              fetch_profile=args.fetch_profile, verify=args.verify, dedupe=dedupe,
+                              window_size=args.window_size, window_slide=args.window_slide,
+                              checkpoint_file=args.checkpoint_file, dlq_topic=args.dlq_topic,
+                              env_file=args.env_file, ready_file=args.ready_file, warmup=not args.no_warmup)
+    consumer.run(timeout_ms=args.timeout, metrics_port=args.metrics_port)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 
-import json
 import time
 import random
 from datetime import datetime
@@ -8,19 +7,57 @@ from typing import Dict, Any
 import argparse
 import signal
 import sys
+import threading
+import json
+from functools import partial
 
-from kafka import KafkaProducer
-from kafka.errors import KafkaError
-
+from client_logging import RecordLogger, add_logging_arguments, logger_from_args
+from client_metrics import MetricsRegistry, start_metrics_server
+from client_readiness import ReadinessFile
+from end_to_end_latency import sent_at_headers
 from kafka_config import ConfigManager
+from kafka_engines import ENGINES, PRODUCER_ENGINES, kafka_errors
+from order_batch import OrderBatchGenerator
+from order_dedupe import new_producer_run
+from order_serde import SERDES, get_serde
+from startup_timing import StartupTimer
+
+DEFAULT_PRODUCER_SETTINGS = {
+    'compression_type': 'gzip',
+    'batch_size': 16384,
+    'linger_ms': 10,
+}
 
 class OrdersProducer:
-    def __init__(self):
-        self.config_manager = ConfigManager()
+    def __init__(self, serde: str = "json", record_logger: RecordLogger = None, engine: str = "kafka-python",
+                 env_file: str = None, ready_file: str = None, warmup: bool = True):
+        # Process start -> first ack, logged once, see startup_timing.py
+        self.startup = StartupTimer()
+        self.warmup = warmup
+        self.config_manager = ConfigManager(env_file)
+        # Readiness events for cutover.py, see client_readiness.py
+        self.readiness = ReadinessFile(ready_file) if ready_file else None
+        self.engine_name = engine
         self.producer = None
+        self.serde = get_serde(serde)
+        self.log = record_logger or RecordLogger()
         self.order_counter = 1
+        # order_ids restart at 1 with every process; this header tells consumers which run sent them
+        self.run_header = new_producer_run()
         self.running = True
         
+        # Pipelined send state (only used when a send window is configured)
+        self.pipeline_window = 0
+        self.in_flight = None
+        self.stats_lock = threading.Lock()
+        self.orders_acked = 0
+        self.orders_failed = 0
+        self.pipeline_started_at = None
+        
+        # A config reload that changes the target cluster switches the client in place, see retarget()
+        self.retarget_to = None
+        self.config_manager.add_reload_listener(self.request_retarget)
+        
         # Sample data for realistic orders
         self.customers = [
             "customer_001", "customer_002", "customer_003", "customer_004", "customer_005",
@@ -36,32 +73,124 @@ class OrdersProducer:
         ]
         
         self.statuses = ["pending", "processing", "shipped", "delivered"]
+        self.payment_methods = ["credit_card", "debit_card", "paypal", "apple_pay"]
+        self.region = "us-west-2"
+        
+        # Vectorized generation (only used when a generation batch size is configured)
+        self.batch_generator = None
+        self.generation_batch_size = 0
+        
+        # Batching/compression settings; override with load_producer_profile()
+        self.producer_settings = dict(DEFAULT_PRODUCER_SETTINGS)
         
+        # Stage latency histograms and throughput counters, see client_metrics.py
+        self.metrics = MetricsRegistry("orders_producer")
+        stage_help = "Latency of each producer stage in seconds"
+        self.generate_latency = self.metrics.histogram("stage_latency_seconds", stage_help, stage="generate")
+        self.serialize_latency = self.metrics.histogram("stage_latency_seconds", stage_help, stage="serialize")
+        self.send_to_ack_latency = self.metrics.histogram("stage_latency_seconds", stage_help, stage="send_to_ack")
+        self.orders_sent_total = self.metrics.counter("orders_sent_total", "Orders handed to the Kafka client")
+        self.metrics.gauge("orders_acked_total", "Orders acknowledged by the cluster",
+                           lambda: self.orders_acked, kind="counter")
+        self.metrics.gauge("orders_failed_total", "Orders that failed to send",
+                           lambda: self.orders_failed, kind="counter")
+        self.retarget_pause = self.metrics.histogram("retarget_pause_seconds",
+                                                     "Time sends were paused while switching clusters")
+        
+    def load_producer_profile(self, path: str):
+        """Load batching/compression settings written by producer_tuner.py"""
+        with open(path) as f:
+            profile = json.load(f)
+        
+        unknown = set(profile) - set(DEFAULT_PRODUCER_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown producer profile settings: {', '.join(sorted(unknown))}")
+        
+        self.producer_settings.update(profile)
+        print(f"🎛️  Loaded producer profile {path}: {self.producer_settings}")
+        
+    def build_producer(self):
+        """Create a producer engine for the active config"""
+        # Add producer-specific configurations (kafka-python names, translated per engine)
+        producer_settings = {
+            'acks': 'all',
+            'retries': 3,
+            'retry_backoff_ms': 1000,
+            **self.producer_settings,
+        }
+        
+        return PRODUCER_ENGINES[self.engine_name](
+            self.config_manager,
+            key_serializer=lambda k: str(k).encode('utf-8'),
+            value_serializer=self.serialize_value,
+            settings=producer_settings
+        )
+    
     def setup_producer(self):
         """Initialize Kafka producer"""
         try:
-            kafka_config = self.config_manager.get_kafka_config_dict()
-            
-            # Add producer-specific configurations
-            producer_config = {
-                **kafka_config,
-                'value_serializer': lambda v: json.dumps(v).encode('utf-8'),
-                'key_serializer': lambda k: str(k).encode('utf-8'),
-                'acks': 'all',
-                'retries': 3,
-                'retry_backoff_ms': 1000,
-                'batch_size': 16384,
-                'linger_ms': 10,
-                'compression_type': 'gzip'
-            }
-            
-            self.producer = KafkaProducer(**producer_config)
-            print(f"✅ Producer connected to: {kafka_config['bootstrap_servers']}")
+            config = self.config_manager.get_active_config()
+            self.producer = self.build_producer()
+            self.startup.mark("client")
+            if self.warmup:
+                self.warmup_producer(config.topic_name)
+            if self.readiness:
+                self.readiness.event("connected", bootstrap_servers=config.bootstrap_servers)
+            print(f"✅ Producer connected to: {config.bootstrap_servers} ({self.engine_name})")
             
         except Exception as e:
             print(f"❌ Failed to create producer: {e}")
             raise
     
+    def warmup_producer(self, topic: str):
+        """Fetch metadata and connect to the leaders now so the first send doesn't wait on them"""
+        try:
+            self.producer.warmup(topic)
+            self.startup.mark("warmup")
+        except Exception as e:
+            self.log.error(f"⚠️  Warmup failed, the first send will connect instead: {e}",
+                           event="warmup_failed", topic=topic, error=str(e))
+    
+    def request_retarget(self, previous, config):
+        """Reload listener: ask the send loop to switch clusters before its next send"""
+        print(f"🔀 Retarget requested: {previous.bootstrap_servers} -> {config.bootstrap_servers}")
+        self.retarget_to = config
+    
+    def retarget(self):
+        """Switch to the reloaded config in place: build and warm up first, then drain and swap"""
+        config, self.retarget_to = self.retarget_to, None
+        started = time.perf_counter()
+        try:
+            producer = self.build_producer()
+            producer.warmup(config.topic_name)
+        except Exception as e:
+            self.log.error(f"❌ Retarget to {config.bootstrap_servers} failed, still sending to the previous "
+                           f"cluster: {e}", event="retarget_failed", error=str(e))
+            return
+        
+        # Sends stop here: everything in flight must reach the old cluster before the new one takes over
+        paused_at = time.perf_counter()
+        previous = self.producer
+        previous.flush()
+        self.producer = producer
+        pause = time.perf_counter() - paused_at
+        self.retarget_pause.record(pause)
+        previous.close()
+        
+        self.log.info(f"🔀 Retargeted to {self.config_manager.active_config} at {config.bootstrap_servers}: "
+                      f"client ready in {(paused_at - started) * 1000:.1f}ms, sends paused {pause * 1000:.1f}ms",
+                      event="retargeted", bootstrap_servers=config.bootstrap_servers,
+                      prepare_ms=(paused_at - started) * 1000, pause_ms=pause * 1000)
+    
+    def serialize_value(self, value) -> bytes:
+        """Encode an order with the selected serde; pre-serialized payloads pass through"""
+        if isinstance(value, bytes):
+            return value
+        started = time.perf_counter()
+        payload = self.serde.encode(value)
+        self.serialize_latency.record(time.perf_counter() - started)
+        return payload
+    
     def generate_order(self) -> Dict[str, Any]:
         """Generate a realistic order"""
         product = random.choice(self.products)
@@ -77,60 +206,225 @@ class OrdersProducer:
             "total_amount": round(product["price"] * quantity, 2),
             "status": random.choice(self.statuses),
             "timestamp": datetime.utcnow().isoformat(),
-            "region": "us-west-2",
-            "payment_method": random.choice(["credit_card", "debit_card", "paypal", "apple_pay"])
+            "region": self.region,
+            "payment_method": random.choice(self.payment_methods)
         }
         
         self.order_counter += 1
         return order
     
+    def enable_batch_generation(self, batch_size: int, seed: int = None):
+        """Generate orders in vectorized batches of pre-serialized payloads"""
+        self.batch_generator = OrderBatchGenerator(
+            self.customers, self.products, self.statuses, self.payment_methods,
+            self.region, seed=seed
+        )
+        self.generation_batch_size = batch_size
+    
+    def next_orders(self):
+        """Return the next (order_id, value) pairs; values are bytes in batch mode"""
+        started = time.perf_counter()
+        if self.batch_generator:
+            payloads = self.batch_generator.generate_payloads(self.order_counter, self.generation_batch_size)
+            self.order_counter += len(payloads)
+            # Amortize the batch cost over its orders
+            self.generate_latency.record((time.perf_counter() - started) / len(payloads), len(payloads))
+            return payloads
+        
+        order = self.generate_order()
+        self.generate_latency.record(time.perf_counter() - started)
+        return [(order["order_id"], order)]
+    
+    def order_stream(self):
+        """Endless stream of (order_id, value) pairs"""
+        while True:
+            yield from self.next_orders()
+    
     def send_order(self, order: Dict[str, Any]) -> bool:
         """Send order to Kafka topic"""
+        if self.retarget_to is not None:
+            self.retarget()
         try:
             config = self.config_manager.get_active_config()
             
-            future = self.producer.send(
+            sent_at = time.monotonic()
+            self.orders_sent_total.inc()
+            
+            # Wait for message to be sent
+            result = self.producer.send_and_wait(
                 config.topic_name,
                 key=order["order_id"],
-                value=order
+                value=order,
+                timeout=10,
+                headers=sent_at_headers() + [self.run_header]
             )
+            self.send_to_ack_latency.record(time.monotonic() - sent_at)
+            if self.readiness:
+                self.readiness.observe("ack")
+            if self.startup.pending:
+                self.startup.finish("first_ack", self.log)
+            with self.stats_lock:
+                self.orders_acked += 1
             
-            # Wait for message to be sent
-            result = future.get(timeout=10)
-            
-            print(f"📦 Sent order {order['order_id']}: ${order['total_amount']:.2f} "
-                  f"to {result.topic} partition {result.partition} offset {result.offset}")
+            if self.log.sampled():
+                self.log.info(f"📦 Sent order {order['order_id']}: ${order['total_amount']:.2f} "
+                              f"to {result.topic} partition {result.partition} offset {result.offset}",
+                              event="order_sent", order_id=order['order_id'],
+                              total_amount=order['total_amount'], topic=result.topic,
+                              partition=result.partition, offset=result.offset)
             
             return True
             
-        except KafkaError as e:
-            print(f"❌ Failed to send order {order['order_id']}: {e}")
+        except kafka_errors() as e:
+            with self.stats_lock:
+                self.orders_failed += 1
+            self.log.error(f"❌ Failed to send order {order['order_id']}: {e}",
+                           event="send_failed", order_id=order['order_id'], error=str(e))
             return False
         except Exception as e:
-            print(f"❌ Unexpected error sending order {order['order_id']}: {e}")
+            with self.stats_lock:
+                self.orders_failed += 1
+            self.log.error(f"❌ Unexpected error sending order {order['order_id']}: {e}",
+                           event="send_failed", order_id=order['order_id'], error=str(e))
             return False
     
+    def _on_delivery(self, order_id, sent_at, exc, record_metadata):
+        """Delivery callback for pipelined sends (runs on the engine's callback thread)"""
+        if exc is None:
+            self.send_to_ack_latency.record(time.monotonic() - sent_at)
+            if self.readiness:
+                self.readiness.observe("ack")
+            if self.startup.pending:
+                self.startup.finish("first_ack", self.log)
+            with self.stats_lock:
+                self.orders_acked += 1
+        else:
+            with self.stats_lock:
+                self.orders_failed += 1
+            self.log.error(f"❌ Failed to send order {order_id}: {exc}",
+                           event="send_failed", order_id=order_id, error=str(exc))
+        self.in_flight.release()
+    
+    def start_pipeline(self, window: int):
+        """Reset pipelined send state for a window of in-flight sends"""
+        self.pipeline_window = window
+        self.in_flight = threading.BoundedSemaphore(window)
+        with self.stats_lock:
+            self.orders_acked = 0
+            self.orders_failed = 0
+        self.pipeline_started_at = time.monotonic()
+    
+    def send_order_async(self, order: Dict[str, Any], topic_name: str) -> bool:
+        """Send order without waiting for the ack, bounded by the in-flight window"""
+        return self.send_value_async(order["order_id"], order, topic_name)
+    
+    def send_value_async(self, order_id: int, value, topic_name: str) -> bool:
+        """Send an order dict or pre-serialized payload without waiting for the ack"""
+        if self.retarget_to is not None:
+            self.retarget()
+        # Block until a slot in the window frees up, but keep honouring shutdown.
+        # Engines that deliver callbacks from poll() are polled while we wait.
+        wait = 0.001 if self.producer.needs_poll else 0.5
+        while not self.in_flight.acquire(timeout=wait):
+            self.producer.poll(0.05)
+            if not self.running:
+                return False
+        
+        try:
+            self.producer.send(
+                topic_name,
+                order_id,
+                value,
+                partial(self._on_delivery, order_id, time.monotonic()),
+                headers=sent_at_headers() + [self.run_header]
+            )
+        except Exception as e:
+            self.in_flight.release()
+            with self.stats_lock:
+                self.orders_failed += 1
+            self.log.error(f"❌ Failed to send order {order_id}: {e}",
+                           event="send_failed", order_id=order_id, error=str(e))
+            return False
+        
+        self.orders_sent_total.inc()
+        return True
+    
+    def report_throughput(self, orders_sent: int, final: bool = False):
+        """Print pipelined throughput and acknowledged/failed counts"""
+        elapsed = max(time.monotonic() - self.pipeline_started_at, 1e-9)
+        with self.stats_lock:
+            acked = self.orders_acked
+            failed = self.orders_failed
+        in_flight = orders_sent - acked - failed
+        label = "Final throughput" if final else "Throughput"
+        print(f"📈 {label}: {acked / elapsed:,.0f} acked msgs/s | "
+              f"Sent: {orders_sent} | Acked: {acked} | Failed: {failed} | "
+              f"In flight: {max(in_flight, 0)} | Elapsed: {elapsed:.1f}s")
+    
     def signal_handler(self, signum, frame):
         """Handle graceful shutdown"""
         print(f"\n🛑 Received signal {signum}, shutting down gracefully...")
         self.running = False
     
-    def run(self, interval: float = 1.0, max_orders: int = None):
+    def run_pipelined(self, interval: float, max_orders: int = None, report_interval: float = 5.0) -> int:
+        """Send orders keeping up to pipeline_window sends in flight"""
+        topic_name = self.config_manager.get_active_config().topic_name
+        self.start_pipeline(self.pipeline_window)
+        next_report = self.pipeline_started_at + report_interval
+        orders = self.order_stream()
+        
+        orders_sent = 0
+        while self.running:
+            if max_orders and orders_sent >= max_orders:
+                print(f"✅ Reached maximum orders ({max_orders}), stopping...")
+                break
+            
+            order_id, value = next(orders)
+            if self.send_value_async(order_id, value, topic_name):
+                orders_sent += 1
+            
+            if time.monotonic() >= next_report:
+                self.report_throughput(orders_sent)
+                next_report += report_interval
+            
+            if interval > 0:
+                time.sleep(interval)
+        
+        return orders_sent
+    
+    def run(self, interval: float = 1.0, max_orders: int = None, pipeline_window: int = 0,
+            metrics_port: int = None):
         """Run the producer"""
+        self.pipeline_window = pipeline_window
+        if metrics_port:
+            start_metrics_server(self.metrics, metrics_port)
+        
         print(f"🚀 Starting Orders Producer")
         print(f"📊 Environment: {self.config_manager.active_config}")
         print(f"⏱️  Interval: {interval} seconds")
         print(f"📈 Max orders: {max_orders or 'unlimited'}")
+        if self.pipeline_window:
+            print(f"🚚 Pipelined sends: up to {self.pipeline_window} in flight")
         print(f"🔄 Press Ctrl+C to stop")
         print("-" * 50)
         
         # Setup signal handlers
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
+        # SIGHUP or an edited --env-file reloads the cached config, see kafka_config.py
+        self.config_manager.install_reload_signal()
+        self.config_manager.watch()
         
         try:
             self.setup_producer()
             
+            if self.pipeline_window:
+                orders_sent = self.run_pipelined(interval, max_orders)
+                print("🧹 Waiting for in-flight sends to be acknowledged...")
+                self.producer.flush()
+                self.report_throughput(orders_sent, final=True)
+                return
+            
             orders_sent = 0
             while self.running:
                 if max_orders and orders_sent >= max_orders:
@@ -156,6 +450,16 @@ class OrdersProducer:
             print("🧹 Flushing and closing producer...")
             self.producer.flush()
             self.producer.close()
+        if self.readiness:
+            self.readiness.close()
+        
+        # Drain queued record logs before the summary so output stays in order
+        self.log.close()
+        
+        stage_summary = self.metrics.summary()
+        if stage_summary:
+            print("📊 Stage latencies:")
+            print(stage_summary)
         print("✅ Producer stopped")
 
 def main():
@@ -164,18 +468,53 @@ def main():
                        help='Interval between orders in seconds (default: 1.0)')
     parser.add_argument('--max-orders', type=int, default=None,
                        help='Maximum number of orders to send (default: unlimited)')
-    parser.add_argument('--env', choices=['msk', 'msk-scram', 'gateway', 'cc'],
+    parser.add_argument('--pipeline-window', type=int, default=0,
+                       help='Max in-flight sends for pipelined mode; 0 waits for each ack '
+                            '(default: 0). Combine with --interval 0 for max throughput')
+    parser.add_argument('--batch-generation', type=int, default=0,
+                       help='Generate orders in vectorized NumPy batches of this size '
+                            '(pipelined mode only, default: 0 = per-order generation)')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Random seed for batch generation (default: unseeded)')
+    parser.add_argument('--producer-profile', type=str, default=None,
+                       help='JSON batching/compression profile written by producer_tuner.py')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                       help='Serve Prometheus metrics on http://localhost:PORT/metrics')
+    parser.add_argument('--engine', choices=ENGINES, default='kafka-python',
+                       help='Client library to run on (default: kafka-python)')
+    parser.add_argument('--serde', choices=list(SERDES), default='json',
+                       help='Value serializer (default: json)')
+    parser.add_argument('--env', choices=['msk', 'msk-scram', 'gateway', 'cc', 'local'],
                        help='Kafka environment (overrides KAFKA_ENV)')
+    parser.add_argument('--env-file', type=str, default=None,
+                       help='Load settings from an env.* file and reload it on change or SIGHUP')
+    parser.add_argument('--ready-file', type=str, default=None,
+                       help='Append readiness events (connected, first/last ack) as JSON lines for cutover.py')
+    parser.add_argument('--no-warmup', action='store_true',
+                       help='Skip fetching metadata and connecting before the first send')
+    add_logging_arguments(parser)
     
     args = parser.parse_args()
+    if args.env and args.env_file:
+        parser.error("--env and --env-file cannot be combined; set KAFKA_ENV in the env file")
     
     # Override environment if specified
     if args.env:
         import os
         os.environ['KAFKA_ENV'] = args.env
     
-    producer = OrdersProducer()
-    producer.run(interval=args.interval, max_orders=args.max_orders)
+    producer = OrdersProducer(serde=args.serde, record_logger=logger_from_args(args), engine=args.engine,
+                              env_file=args.env_file, ready_file=args.ready_file, warmup=not args.no_warmup)
+    if args.producer_profile:
+        producer.load_producer_profile(args.producer_profile)
+    if args.batch_generation:
+        if not args.pipeline_window:
+            parser.error('--batch-generation requires --pipeline-window')
+        if args.serde == 'avro':
+            parser.error('--batch-generation emits JSON payloads and cannot be used with --serde avro')
+        producer.enable_batch_generation(args.batch_generation, seed=args.seed)
+    producer.run(interval=args.interval, max_orders=args.max_orders,
+                 pipeline_window=args.pipeline_window, metrics_port=args.metrics_port)
 
 if __name__ == "__main__":
     main() 
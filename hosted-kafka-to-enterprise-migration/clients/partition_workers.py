@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Partition-parallel processing for OrdersConsumer.
+Records are dispatched to a fixed pool of worker threads keyed by partition,
+so each partition is handled by exactly one thread in offset order while the
+poll thread keeps fetching. Each partition has a bounded in-flight depth:
+when it fills up the partition is paused, and resumed once it drains to half.
+Workers report completed offsets, which are contiguous per partition because
+of the ordering, and the poll thread hands them to the CommitManager.
+Handler time is measured per record so the adaptive fetch controller sees
+the real processing cost rather than the time spent queueing.
+"""
+
+import queue
+import threading
+import time
+import zlib
+from typing import Callable, Dict, List, Tuple
+
+from client_metrics import MetricsRegistry
+
+_STOP = object()
+
+
+class PartitionWorkerPool:
+    """Thread pool with per-partition ordering, bounded queues and pause/resume.
+
+    Also acts as the consumer's rebalance listener: revoked partitions are
+    drained and their completed offsets committed before they are given up.
+    """
+
+    def __init__(self, handler: Callable, commits, metrics: MetricsRegistry, log,
+                 workers: int = 4, max_queue: int = 1000):
+        self.handler = handler
+        self.commits = commits
+        self.log = log
+        self.max_queue = max_queue
+        self.resume_at = max_queue // 2
+
+        self.lock = threading.Condition()
+        self.depth: Dict = {}
+        # Highest completed offset and completed count per partition since the last drain
+        self.completed: Dict = {}
+        # Records handled and handler seconds spent on them since the last take_processing_time()
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self.paused = set()
+
+        self.queues = [queue.Queue() for _ in range(workers)]
+        self.threads = [threading.Thread(target=self._work, args=(q,), name=f"order-worker-{i}", daemon=True)
+                        for i, q in enumerate(self.queues)]
+        for thread in self.threads:
+            thread.start()
+
+        metrics.gauge("worker_queue_depth", "Records dispatched to workers but not processed yet",
+                      lambda: sum(self.depth.values()))
+        metrics.gauge("paused_partitions", "Partitions paused because their worker queue is full",
+                      lambda: len(self.paused))
+
+    def _queue_for(self, partition) -> queue.Queue:
+        # Stable across runs, unlike hash() on strings
+        key = f"{partition.topic}:{partition.partition}".encode()
+        return self.queues[zlib.crc32(key) % len(self.queues)]
+
+    def _work(self, work_queue: queue.Queue):
+        while True:
+            item = work_queue.get()
+            if item is _STOP:
+                return
+            partition, record = item
+            started = time.perf_counter()
+            try:
+                self.handler(record)
+            except Exception as e:
+                self.log.error(f"❌ Worker error: {e}", event="worker_error",
+                               partition=record.partition, offset=record.offset, error=str(e))
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.processed += 1
+                self.busy_seconds += elapsed
+                _, count = self.completed.get(partition, (None, 0))
+                self.completed[partition] = (record.offset, count + 1)
+                self.depth[partition] -= 1
+                self.lock.notify_all()
+
+    def submit(self, partition, records: List):
+        """Queue a partition's records from one poll; never blocks the poll thread"""
+        with self.lock:
+            self.depth[partition] = self.depth.get(partition, 0) + len(records)
+        work_queue = self._queue_for(partition)
+        for record in records:
+            work_queue.put((partition, record))
+
+    def flow_control(self, consumer):
+        """Pause full partitions and resume drained ones; call from the poll thread"""
+        with self.lock:
+            to_pause = [p for p, depth in self.depth.items() if depth >= self.max_queue and p not in self.paused]
+            to_resume = [p for p in self.paused if self.depth.get(p, 0) <= self.resume_at]
+        if to_pause:
+            consumer.pause(to_pause)
+            self.paused.update(to_pause)
+        if to_resume:
+            consumer.resume(to_resume)
+            self.paused.difference_update(to_resume)
+
+    def mark_completed(self):
+        """Pass completed offset ranges to the CommitManager; call from the poll thread"""
+        with self.lock:
+            completed, self.completed = self.completed, {}
+        for partition, (offset, count) in completed.items():
+            self.commits.mark(partition, offset, count)
+
+    def take_processing_time(self) -> Tuple[int, float]:
+        """Records handled and total handler seconds since the previous call"""
+        with self.lock:
+            timing = (self.processed, self.busy_seconds)
+            self.processed, self.busy_seconds = 0, 0.0
+        return timing
+
+    def wait_idle(self, partitions=None, timeout: float = None) -> bool:
+        """Block until the given partitions (default: all) have no records in flight"""
+        with self.lock:
+            return self.lock.wait_for(
+                lambda: all(self.depth.get(p, 0) == 0 for p in (self.depth if partitions is None else partitions)),
+                timeout=timeout)
+
+    def on_partitions_revoked(self, revoked):
+        self.wait_idle(revoked)
+        self.mark_completed()
+        for partition in revoked:
+            self.paused.discard(partition)
+            self.depth.pop(partition, None)
+        self.commits.on_partitions_revoked(revoked)
+
+    def on_partitions_assigned(self, assigned):
+        return self.commits.on_partitions_assigned(assigned)
+
+    def shutdown(self, timeout: float = 30.0):
+        """Finish in-flight records, stop the workers and mark what completed"""
+        if not self.wait_idle(timeout=timeout):
+            self.log.error("⚠️  Workers did not drain in time; unfinished records will be re-read",
+                           event="worker_drain_timeout")
+        for work_queue in self.queues:
+            work_queue.put(_STOP)
+        for thread in self.threads:
+            thread.join(timeout)
+        self.mark_completed()
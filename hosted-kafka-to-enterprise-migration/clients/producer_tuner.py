@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Compression and batching auto-tuner for OrdersProducer.
+Sweeps compression codec, batch_size and linger_ms against the configured
+cluster (or a local broker with --env local), reports throughput, p50/p99
+ack latency, CPU seconds per MB and compression ratio for each combination,
+and writes the winning settings as a profile for --producer-profile.
+"""
+
+import json
+import time
+import argparse
+from typing import Dict, Any, List, Optional
+
+from orders_producer import OrdersProducer
+from load_generator import estimate_order_size
+from order_serde import SERDES
+
+CODECS = ["none", "gzip", "snappy", "lz4", "zstd"]
+
+
+def compression_ratio(producer) -> Optional[float]:
+    """Compressed/uncompressed size ratio reported by kafka-python, if available"""
+    try:
+        return producer.metrics()['producer-metrics']['compression-rate-avg']
+    except (KeyError, TypeError):
+        return None
+
+
+def run_trial(settings: Dict[str, Any], orders: int, window: int, serde: str) -> Dict[str, Any]:
+    """Produce `orders` orders with one combination of settings and measure it"""
+    producer = OrdersProducer(serde=serde)
+    producer.producer_settings.update(settings)
+    bytes_per_order = estimate_order_size(producer)
+
+    result = {**settings, "error": None}
+    try:
+        producer.setup_producer()
+        topic_name = producer.config_manager.get_active_config().topic_name
+        producer.start_pipeline(window)
+        cpu_started = time.process_time()
+
+        stream = producer.order_stream()
+        for _ in range(orders):
+            order_id, value = next(stream)
+            producer.send_value_async(order_id, value, topic_name)
+        producer.producer.flush()
+
+        elapsed = time.monotonic() - producer.pipeline_started_at
+        cpu = time.process_time() - cpu_started
+        megabytes = producer.orders_acked * bytes_per_order / (1024 * 1024)
+        latencies = producer.send_to_ack_latency
+
+        result.update({
+            "acked": producer.orders_acked,
+            "failed": producer.orders_failed,
+            "throughput": producer.orders_acked / elapsed,
+            "mb_per_sec": megabytes / elapsed,
+            "p50_ms": latencies.percentile(0.50) * 1000,
+            "p99_ms": latencies.percentile(0.99) * 1000,
+            "cpu_per_mb": cpu / megabytes if megabytes else None,
+            "compression_ratio": compression_ratio(producer.producer),
+        })
+    except Exception as e:
+        # Typically a codec whose library (python-snappy, lz4, zstandard) is missing
+        result["error"] = str(e)
+    finally:
+        if producer.producer:
+            producer.producer.close()
+        producer.log.close()
+
+    return result
+
+
+def print_result(result: Dict[str, Any]):
+    label = f"{result['compression_type']:<7} batch={result['batch_size']:<7} linger={result['linger_ms']:<4}"
+    if result["error"]:
+        print(f"   {label} ❌ skipped: {result['error']}")
+        return
+
+    ratio = result["compression_ratio"]
+    cpu = result["cpu_per_mb"]
+    print(f"   {label} {result['throughput']:>9,.0f} msgs/s {result['mb_per_sec']:>7.2f} MB/s | "
+          f"p50 {result['p50_ms']:>7.1f}ms p99 {result['p99_ms']:>7.1f}ms | "
+          f"CPU {cpu if cpu is not None else float('nan'):.3f}s/MB | "
+          f"ratio {ratio if ratio is not None else float('nan'):.2f} | failed {result['failed']}")
+
+
+def pick_winner(results: List[Dict[str, Any]], max_p99_ms: Optional[float]) -> Optional[Dict[str, Any]]:
+    """Highest throughput without failures, optionally within a p99 latency budget"""
+    candidates = [r for r in results if not r["error"] and not r["failed"]]
+    if max_p99_ms is not None:
+        candidates = [r for r in candidates if r["p99_ms"] <= max_p99_ms]
+    return max(candidates, key=lambda r: r["throughput"], default=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep producer compression and batching settings')
+    parser.add_argument('--codecs', type=str, default=','.join(CODECS),
+                       help=f'Comma-separated codecs to try (default: {",".join(CODECS)})')
+    parser.add_argument('--batch-sizes', type=str, default='16384,65536,262144',
+                       help='Comma-separated batch_size values in bytes (default: 16384,65536,262144)')
+    parser.add_argument('--linger-ms', type=str, default='0,10,50',
+                       help='Comma-separated linger_ms values (default: 0,10,50)')
+    parser.add_argument('--orders', type=int, default=20000,
+                       help='Orders to send per combination (default: 20000)')
+    parser.add_argument('--window', type=int, default=5000,
+                       help='Max in-flight sends per trial (default: 5000)')
+    parser.add_argument('--max-p99-ms', type=float, default=None,
+                       help='Only pick settings whose p99 ack latency is within this budget')
+    parser.add_argument('--serde', choices=list(SERDES), default='json',
+                       help='Value serializer used for the trials (default: json)')
+    parser.add_argument('--output', type=str, default='producer_profile.json',
+                       help='Where to write the winning profile (default: producer_profile.json)')
+    parser.add_argument('--env', choices=['msk', 'msk-scram', 'gateway', 'cc', 'local'],
+                       help='Kafka environment (overrides KAFKA_ENV)')
+
+    args = parser.parse_args()
+
+    if args.env:
+        import os
+        os.environ['KAFKA_ENV'] = args.env
+
+    codecs = [c.strip() for c in args.codecs.split(',') if c.strip()]
+    unknown = set(codecs) - set(CODECS)
+    if unknown:
+        parser.error(f"Unknown codecs: {', '.join(sorted(unknown))}")
+    batch_sizes = [int(b) for b in args.batch_sizes.split(',')]
+    linger_values = [int(l) for l in args.linger_ms.split(',')]
+
+    print(f"🎛️  Tuning producer: {len(codecs) * len(batch_sizes) * len(linger_values)} combinations, "
+          f"{args.orders} orders each")
+    print("-" * 80)
+
+    results = []
+    for codec in codecs:
+        for batch_size in batch_sizes:
+            for linger_ms in linger_values:
+                settings = {"compression_type": codec, "batch_size": batch_size, "linger_ms": linger_ms}
+                result = run_trial(settings, args.orders, args.window, args.serde)
+                print_result(result)
+                results.append(result)
+
+    print("=" * 80)
+    winner = pick_winner(results, args.max_p99_ms)
+    if not winner:
+        print("❌ No combination completed without errors within the latency budget")
+        return
+
+    profile = {key: winner[key] for key in ("compression_type", "batch_size", "linger_ms")}
+    with open(args.output, 'w') as f:
+        json.dump(profile, f, indent=2)
+
+    print(f"🏆 Winner: {profile}")
+    print(f"   {winner['throughput']:,.0f} msgs/s, p99 {winner['p99_ms']:.1f}ms")
+    print(f"✅ Profile written to {args.output}")
+    print(f"   Use it with: python3 orders_producer.py --producer-profile {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,15 @@ sudo yum install -y python3 python3-pip
 
 # Install required Python packages
 echo "📚 Installing Python dependencies..."
-sudo pip3 install kafka-python boto3 requests
+sudo pip3 install -r requirements.txt
+
+# Optional packages behind --serde, --engine, --batch-mode and async_fleet.py; a failed one
+# only disables its feature
+echo "📚 Installing optional Python dependencies..."
+grep -v '^#' requirements-extras.txt | sed 's/#.*//' | while read -r package; do
+    [ -n "$package" ] || continue
+    sudo pip3 install "$package" || echo "⚠️  Could not install $package; the features that need it stay unavailable"
+done
 
 # Make scripts executable
 echo "🔧 Making scripts executable..."
@@ -24,6 +32,14 @@ chmod +x orders_consumer.py
 chmod +x setup_acls.py
 chmod +x setup_schemas.py
 chmod +x setup_connector.py
+chmod +x load_generator.py
+chmod +x mock_schema_registry.py
+chmod +x producer_tuner.py
+chmod +x engine_benchmark.py
+chmod +x async_fleet.py
+chmod +x cutover.py
+chmod +x cutover_benchmark.py
+chmod +x startup_benchmark.py
 chmod +x setup_gateway.sh
 chmod +x configure_gateway_target.sh
 
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the orders clients. Compares the old start path
+("before": kafka-python, numpy, requests, fastavro, http.server,
+confluent-kafka, orjson and msgspec imported up front, no warmup) with the
+current one ("after": deferred imports, metadata and connection warmup in
+setup). Import timing needs no
+broker; pass --env to also time spawn -> connected/assigned/first message
+against a cluster, read from the clients' --ready-file events.
+"""
+
+import argparse
+import importlib.util
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from client_readiness import read_events
+
+# Modules the clients imported at start-up before they were deferred: kafka-python, which
+# the original clients imported at module level, and the libraries added since
+EAGER_IMPORTS = ("kafka", "numpy", "requests", "fastavro", "setup_schemas", "http.server",
+                 "confluent_kafka", "orjson", "msgspec")
+
+# name -> (module, last readiness event before the client is useful)
+CLIENTS = {
+    "producer": ("orders_producer", "first_ack"),
+    "consumer": ("orders_consumer", "first_record"),
+}
+
+
+def _preload(eager: bool) -> str:
+    if not eager:
+        return ""
+    modules = [name for name in EAGER_IMPORTS if importlib.util.find_spec(name) is not None]
+    return f"import {', '.join(modules)}; " if modules else ""
+
+
+def _median_ms(samples: List[float]) -> str:
+    return f"{statistics.median(samples) * 1000:,.1f}" if samples else "-"
+
+
+def benchmark_imports(runs: int) -> Dict[Tuple[str, str], List[float]]:
+    """Wall time of a fresh interpreter importing each client, with and without the eager imports"""
+    results = {}
+    for mode, eager in (("before", True), ("after", False)):
+        for name, (module, _) in CLIENTS.items():
+            samples = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                subprocess.run([sys.executable, "-c", f"{_preload(eager)}import {module}"], check=True)
+                samples.append(time.perf_counter() - started)
+            results[(mode, name)] = samples
+    return results
+
+
+def _run_client(name: str, eager: bool, env: str, timeout: float) -> Dict[str, float]:
+    """Start one client the way it starts in a cutover; event -> seconds after spawn"""
+    module, last_event = CLIENTS[name]
+    with tempfile.TemporaryDirectory() as tmp:
+        ready_file = os.path.join(tmp, f"{name}.ready")
+        argv = [f"{module}.py", "--env", env, "--ready-file", ready_file]
+        if name == "producer":
+            argv += ["--max-orders", "1", "--interval", "0"]
+        else:
+            argv += ["--group-id", f"startup-benchmark-{uuid.uuid4().hex[:8]}", "--lag-interval", "0"]
+        if eager:
+            argv.append("--no-warmup")
+        code = (f"{_preload(eager)}import runpy, sys; sys.argv = {argv!r}; "
+                f"runpy.run_path({argv[0]!r}, run_name='__main__')")
+
+        spawned_at = time.time()
+        process = subprocess.Popen([sys.executable, "-c", code],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + timeout
+        try:
+            while last_event not in read_events(ready_file):
+                if process.poll() is not None or time.monotonic() >= deadline:
+                    break
+                time.sleep(0.01)
+        finally:
+            if process.poll() is None:
+                process.send_signal(signal.SIGTERM)
+            process.wait(timeout=30)
+        return {event: ts - spawned_at for event, ts in read_events(ready_file).items()}
+
+
+def benchmark_clients(env: str, runs: int, timeout: float) -> Dict[Tuple[str, str], Dict[str, List[float]]]:
+    results = {}
+    for mode, eager in (("before", True), ("after", False)):
+        for name in ("producer", "consumer"):
+            samples: Dict[str, List[float]] = {}
+            for _ in range(runs):
+                for event, seconds in _run_client(name, eager, env, timeout).items():
+                    samples.setdefault(event, []).append(seconds)
+            results[(mode, name)] = samples
+    return results
+
+
+def benchmark(runs: int = 5, env: Optional[str] = None, timeout: float = 60.0):
+    """Print cold-start medians before and after deferred imports and warmup"""
+    print(f"⏱️  Cold-start benchmark: {runs} runs per case")
+    print("-" * 72)
+    print(f"{'mode':<8} {'client':<10} {'import ms':>10}")
+    for (mode, name), samples in benchmark_imports(runs).items():
+        print(f"{mode:<8} {name:<10} {_median_ms(samples):>10}")
+
+    if not env:
+        print("Pass --env to also time connect and first message against a cluster.")
+        return
+
+    print("-" * 72)
+    print(f"{'mode':<8} {'client':<10} {'connected ms':>13} {'assigned ms':>12} {'first msg ms':>13} {'ok':>6}")
+    for (mode, name), samples in benchmark_clients(env, runs, timeout).items():
+        last_event = CLIENTS[name][1]
+        print(f"{mode:<8} {name:<10} {_median_ms(samples.get('connected', [])):>13} "
+              f"{_median_ms(samples.get('assigned', [])):>12} {_median_ms(samples.get(last_event, [])):>13} "
+              f"{f'{len(samples.get(last_event, []))}/{runs}':>6}")
+    print("'before' preloads the formerly eager imports and runs with --no-warmup; times are from spawn.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare orders client cold starts before and after '
+                                                 'deferred imports and metadata warmup')
+    parser.add_argument('--runs', type=int, default=5,
+                       help='Runs per case (default: 5)')
+    parser.add_argument('--env', choices=['msk', 'msk-scram', 'gateway', 'cc', 'local'],
+                       help='Also start the clients against this environment')
+    parser.add_argument('--timeout', type=float, default=60.0,
+                       help='Give up on a client run after this many seconds (default: 60)')
+    args = parser.parse_args()
+    benchmark(args.runs, args.env, args.timeout)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Startup timing for the orders clients: where a fresh process spends its
+time before the first ack (producer) or first polled record (consumer).
+Phases are measured from process start, read from /proc on Linux, so
+interpreter start-up and imports count too:
+  imports      process start -> client object created
+  client       Kafka client built from the active config
+  warmup       topic metadata fetched, broker (and coordinator) connections open
+  assigned     consumer group joined (consumer only)
+  first_ack / first_record
+The breakdown is logged once per process with event="startup"; see
+startup_benchmark.py for a before/after cold-start comparison.
+"""
+
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+
+def process_age() -> Optional[float]:
+    """Seconds since this process started, or None where /proc is unavailable"""
+    try:
+        with open("/proc/self/stat") as f:
+            # starttime is field 22; fields are counted after the parenthesised command name
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return None
+    return max(0.0, uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+
+
+class StartupTimer:
+    """Durations of consecutive start-up phases, logged once when the client is first useful"""
+
+    def __init__(self):
+        now = time.perf_counter()
+        age = process_age()
+        self.started_at = now - age if age is not None else now
+        self.last = self.started_at
+        self.phases: List[Tuple[str, float]] = []
+        self.lock = threading.Lock()
+        # Checked on the hot path; False once the report has been logged
+        self.pending = True
+        if age is not None:
+            self.mark("imports", now)
+
+    def mark(self, phase: str, now: Optional[float] = None):
+        now = now or time.perf_counter()
+        with self.lock:
+            self.phases.append((phase, now - self.last))
+            self.last = now
+
+    def marked(self, phase: str) -> bool:
+        return any(name == phase for name, _ in self.phases)
+
+    def finish(self, phase: str, log):
+        """Mark the final phase and log the breakdown; later calls do nothing"""
+        with self.lock:
+            if not self.pending:
+                return
+            self.pending = False
+        self.mark(phase)
+        total = self.last - self.started_at
+        breakdown = ", ".join(f"{name} {seconds * 1000:,.1f}ms" for name, seconds in self.phases)
+        log.info(f"🚀 Startup {total * 1000:,.1f}ms: {breakdown}", event="startup",
+                 total_ms=round(total * 1000, 1),
+                 **{f"{name}_ms": round(seconds * 1000, 1) for name, seconds in self.phases})
+
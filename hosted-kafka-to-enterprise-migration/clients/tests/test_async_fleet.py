@@ -0,0 +1,63 @@
+import asyncio
+import json
+from collections import namedtuple
+
+import async_fleet
+from client_metrics import MetricsRegistry
+from order_serde import get_serde
+
+Record = namedtuple("Record", "value")
+
+ORDER = {"order_id": 1, "customer_id": "c1", "total_amount": 9.5, "timestamp": "2024-01-01T00:00:00"}
+
+
+class _Consumer:
+    """Serves each batch once, then stops the fleet"""
+
+    def __init__(self, fleet, batches):
+        self.fleet = fleet
+        self.batches = list(batches)
+
+    async def getmany(self, timeout_ms, max_records):
+        batch = self.batches.pop(0)
+        if not self.batches:
+            self.fleet.stop_event.set()
+        return {"orders-0": batch}
+
+
+def _fleet():
+    fleet = async_fleet.AsyncFleet.__new__(async_fleet.AsyncFleet)
+    fleet.serde = get_serde("json")
+    metrics = MetricsRegistry("test")
+    fleet.orders_consumed = metrics.counter("orders_consumed_total", "Valid orders consumed")
+    fleet.invalid_orders = metrics.counter("invalid_orders_total", "Invalid orders")
+    return fleet
+
+
+def test_bad_records_are_counted_and_consuming_continues():
+    fleet = _fleet()
+    good = Record(json.dumps(ORDER).encode())
+    batches = [[good, Record(b"{not json"), Record(b"[1, 2]"), Record(json.dumps({"order_id": 2}).encode())],
+               [good, good]]
+
+    async def run():
+        fleet.stop_event = asyncio.Event()
+        await fleet.run_consumer(_Consumer(fleet, batches))
+
+    asyncio.run(run())
+    assert fleet.orders_consumed.value == 3
+    assert fleet.invalid_orders.value == 3
+
+
+def test_failed_tasks_are_reported_when_cancelled(capsys):
+    async def broken():
+        raise ConnectionError("broker went away")
+
+    async def run():
+        tasks = [asyncio.create_task(broken(), name="consumer-0"), asyncio.create_task(asyncio.sleep(60))]
+        await asyncio.sleep(0)
+        await async_fleet.AsyncFleet.cancel(None, tasks)
+
+    asyncio.run(run())
+    out = capsys.readouterr().out
+    assert "consumer-0" in out and "broker went away" in out
@@ -0,0 +1,33 @@
+import json
+
+from avro_serde import SchemaIdCache
+
+
+def _cache(tmp_path, url):
+    return SchemaIdCache(url, path=str(tmp_path / "ids.json"))
+
+
+def _seed(cache):
+    cache.subjects["orders-value"] = {"id": 7, "schema": "{}"}
+    cache.schemas[7] = "{}"
+    cache.save()
+
+
+def test_cache_reloads_for_the_same_registry(tmp_path):
+    _seed(_cache(tmp_path, "http://source-registry:8081/"))
+    cache = _cache(tmp_path, "http://source-registry:8081")
+    assert cache.subjects["orders-value"]["id"] == 7
+    assert cache.schemas == {7: "{}"}
+
+
+def test_cache_from_another_registry_is_ignored(tmp_path):
+    _seed(_cache(tmp_path, "http://source-registry:8081"))
+    cache = _cache(tmp_path, "https://psrc-123.confluent.cloud")
+    assert cache.subjects == {}
+    assert cache.schemas == {}
+
+
+def test_cache_without_registry_url_is_ignored(tmp_path):
+    (tmp_path / "ids.json").write_text(json.dumps({"subjects": {"orders-value": {"id": 7, "schema": "{}"}},
+                                                   "schemas": {"7": "{}"}}))
+    assert _cache(tmp_path, "http://source-registry:8081").subjects == {}
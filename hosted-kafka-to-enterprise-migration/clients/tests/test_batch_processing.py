@@ -0,0 +1,84 @@
+from collections import namedtuple
+
+import pytest
+
+from batch_processing import OrderBatchProcessor
+from dead_letters import DeadLetter
+
+Record = namedtuple("Record", "partition offset value")
+
+
+def _order(order_id, customer, amount, product="p1", quantity=1):
+    return {"order_id": order_id, "customer_id": customer, "total_amount": amount,
+            "timestamp": "2024-01-01T00:00:00", "product_id": product, "quantity": quantity}
+
+
+@pytest.fixture
+def processor():
+    pytest.importorskip("numpy")
+    return OrderBatchProcessor()
+
+
+def test_aggregates_valid_orders_and_returns_invalid_ones(processor):
+    missing_customer = _order(4, None, 1.0)
+    del missing_customer["customer_id"]
+    records = [Record(0, 0, _order(1, "alice", 10.0, "p1", 2)),
+               Record(0, 1, _order(2, "bob", 5.5, "p2")),
+               Record(0, 2, DeadLetter(b"{", "decode_error", "bad json")),
+               Record(0, 3, missing_customer),
+               Record(0, 4, _order(3, "alice", 4.5, "p2", 3))]
+
+    result = processor.process(records)
+
+    assert [r.offset for r in result.valid] == [0, 1, 4]
+    assert [r.offset for r, _ in result.invalid] == [2, 3]
+    assert result.invalid[0][1] is records[2].value
+    assert result.invalid[1][1].reason == "missing customer_id"
+    assert result.total_value == pytest.approx(20.0)
+    assert processor.top_customers() == [("alice", 14.5, 2), ("bob", 5.5, 1)]
+    assert processor.top_products() == [("p1", 10.0, 2), ("p2", 10.0, 4)]
+
+
+def test_keep_drops_valid_records(processor):
+    records = [Record(0, offset, _order(offset, "alice", 1.0)) for offset in range(4)]
+
+    result = processor.process(records, keep=lambda record: record.offset % 2 == 0)
+
+    assert [r.offset for r in result.valid] == [0, 2]
+    assert result.total_value == 2.0
+    assert processor.top_customers() == [("alice", 2.0, 2)]
+
+
+def test_batch_without_valid_orders(processor):
+    result = processor.process([Record(0, 0, DeadLetter(None, "decode_error", "empty"))])
+    assert result.valid_count == 0 and result.total_value == 0.0 and len(result.invalid) == 1
+    assert processor.process([]).valid_count == 0
+
+
+def test_msgspec_orders_are_processed(processor):
+    order_serde = pytest.importorskip("order_serde")
+    if not order_serde.HAS_MSGSPEC:
+        pytest.skip("msgspec is not installed")
+    serde = order_serde.get_serde("msgspec")
+    order = dict(_order(1, "alice", 12.5, "p1", 2), product_name="Laptop", unit_price=6.25,
+                 status="pending", region="us-west-2", payment_method="paypal")
+    records = [Record(0, 0, serde.decode(serde.encode(order)))]
+
+    result = processor.process(records, keep=lambda record: record.value['order_id'] == 1)
+
+    assert result.valid_count == 1 and result.invalid == []
+    assert result.total_value == 12.5
+    assert processor.top_products() == [("p1", 12.5, 2)]
+
+
+def test_non_numeric_amounts_are_dead_lettered_not_raised(processor):
+    records = [Record(0, 0, _order(1, "alice", 10.0)),
+               Record(0, 1, _order(2, "bob", "n/a")),
+               Record(0, 2, _order(3, "carol", "7.5")),
+               Record(0, 3, _order(4, "dave", 1.0, quantity="many"))]
+
+    result = processor.process(records)
+
+    assert [r.offset for r in result.valid] == [0, 2]
+    assert result.total_value == 17.5
+    assert [(r.offset, letter.kind) for r, letter in result.invalid] == [(1, "invalid_order"), (3, "invalid_order")]
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from client_metrics import HALF_COUNT, LatencyHistogram, MetricsRegistry
+
+
+def test_percentiles_are_within_the_bucket_error():
+    histogram = LatencyHistogram()
+    values = [random.uniform(0.0001, 2.0) for _ in range(10000)]
+    for value in values:
+        histogram.record(value)
+    values.sort()
+    for fraction in (0.5, 0.9, 0.99, 0.999):
+        exact = values[int(fraction * len(values)) - 1]
+        assert histogram.percentile(fraction) == pytest.approx(exact, rel=2 / HALF_COUNT)
+    assert histogram.percentile(1.0) == max(values)
+
+
+def test_small_values_are_exact_and_counts_are_weighted():
+    histogram = LatencyHistogram()
+    histogram.record(0.000005, count=99)
+    histogram.record(0.000100)
+    assert histogram.percentile(0.5) == 0.000005
+    assert histogram.percentile(0.99) == 0.000005
+    assert histogram.percentile(1.0) == 0.0001
+    assert histogram.count == 100
+    assert LatencyHistogram().percentile(0.99) == 0.0
+
+
+def test_render_exports_cumulative_buckets_and_gauges():
+    registry = MetricsRegistry("orders")
+    histogram = registry.histogram("stage_latency_seconds", "Stage latency", stage="poll")
+    for seconds in (0.0002, 0.003, 0.2):
+        histogram.record(seconds)
+    registry.counter("orders_total", "Orders").inc(3)
+    registry.gauge("queue_depth", "Depth", lambda: 7)
+    registry.gauge("broken", "Raises", lambda: 1 / 0)
+
+    text = registry.render()
+    assert 'orders_stage_latency_seconds_bucket{stage="poll",le="0.00025"} 1' in text
+    assert 'orders_stage_latency_seconds_bucket{stage="poll",le="0.005"} 2' in text
+    assert 'orders_stage_latency_seconds_bucket{stage="poll",le="+Inf"} 3' in text
+    assert 'orders_stage_latency_seconds_count{stage="poll"} 3' in text
+    assert "orders_orders_total 3" in text
+    assert "orders_queue_depth 7" in text
+    assert "\norders_broken " not in text
@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import namedtuple
+
+import pytest
+
+import dead_letters
+from client_metrics import MetricsRegistry
+from dead_letters import DeadLetter, DeadLetterQueue
+from kafka_engines import TopicPartition
+from offset_commits import CommitManager
+
+Record = namedtuple("Record", "topic partition offset key headers")
+TP = TopicPartition("orders", 0)
+
+
+class _Log:
+    def __init__(self):
+        self.events = []
+
+    def info(self, message, event=None, **fields):
+        self.events.append(event)
+
+    error = info
+
+
+class _Producer:
+    """Producer engine that holds delivery callbacks until the test acks them"""
+    needs_poll = False
+
+    def __init__(self, config_manager, key_serializer, value_serializer, settings):
+        self.callbacks = []
+        self.sending = threading.Event()
+        self.sending.set()
+
+    def send(self, topic, key, value, on_delivery, headers=None):
+        self.sending.wait()
+        self.callbacks.append(on_delivery)
+
+    def ack_all(self, exc=None):
+        callbacks, self.callbacks = self.callbacks, []
+        for on_delivery in callbacks:
+            on_delivery(exc, None)
+
+    def poll(self, timeout):
+        pass
+
+    def flush(self, timeout=None):
+        pass
+
+    def close(self):
+        pass
+
+
+class _Consumer:
+    def __init__(self):
+        self.commits = []
+
+    def commit(self, offsets, asynchronous=False, callback=None):
+        self.commits.append(dict(offsets))
+        if callback:
+            callback(None)
+
+
+@pytest.fixture
+def dlq(monkeypatch):
+    monkeypatch.setitem(dead_letters.PRODUCER_ENGINES, "fake", _Producer)
+    queue = DeadLetterQueue(None, "orders-dlq", "group", MetricsRegistry("test"), _Log(),
+                            engine="fake", max_queue=1, max_batch=1)
+    yield queue
+    queue.producer.sending.set()
+    queue.close(timeout=5)
+
+
+def _letter(offset):
+    return Record("orders", 0, offset, b"k", []), DeadLetter(b"{", "decode_error", "bad json")
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_full_queue_blocks_instead_of_dropping(dlq):
+    dlq.producer.sending.clear()
+    sender = threading.Thread(target=lambda: [dlq.send(*_letter(offset)) for offset in range(4)])
+    sender.start()
+    _wait_for(lambda: dlq.waited_total.value >= 1)
+    assert sender.is_alive()
+
+    dlq.producer.sending.set()
+    sender.join(timeout=5)
+    _wait_for(lambda: len(dlq.producer.callbacks) == 4)
+    dlq.producer.ack_all()
+    assert dlq.stats()["sent"] == 4
+    assert dlq.unacked() == {}
+
+
+def test_commits_stop_at_unacked_dead_letters(dlq):
+    consumer = _Consumer()
+    commits = CommitManager(MetricsRegistry("test"), _Log(), commit_every=1, holds=dlq.unacked)
+    commits.bind(consumer)
+
+    dlq.send(*_letter(5))
+    commits.mark(TP, 9, count=10)
+    commits.maybe_commit()
+    # The dead letter itself is the next record to read after a restart
+    assert consumer.commits == [{TP: 5}]
+
+    _wait_for(lambda: dlq.producer.callbacks)
+    dlq.producer.ack_all()
+    assert commits.commit_sync()
+    assert consumer.commits[-1] == {TP: 10}
+
+
+def test_retried_dead_letter_releases_its_hold(dlq):
+    consumer = _Consumer()
+    commits = CommitManager(MetricsRegistry("test"), _Log(), holds=dlq.unacked)
+    commits.bind(consumer)
+    dlq.retry_backoff = 0.01
+
+    dlq.send(*_letter(3))
+    _wait_for(lambda: dlq.producer.callbacks)
+    dlq.producer.ack_all(exc=RuntimeError("leader not available"))
+    commits.mark(TP, 7, count=8)
+    assert commits.commit_sync()
+    assert consumer.commits == [{TP: 3}]
+
+    # The retry is sent again after its backoff and, once acked, the rest can be committed
+    _wait_for(lambda: dlq.producer.callbacks)
+    dlq.producer.ack_all()
+    assert dlq.unacked() == {}
+    assert commits.commit_sync()
+    assert consumer.commits[-1] == {TP: 8}
+    assert dlq.stats()["retried"] == 1
+    assert dlq.stats()["failed"] == 0
+    assert dlq.failure is None
+
+
+def test_dead_letter_out_of_attempts_keeps_its_hold_and_fails_the_queue(dlq):
+    consumer = _Consumer()
+    commits = CommitManager(MetricsRegistry("test"), _Log(), holds=dlq.unacked)
+    commits.bind(consumer)
+    dlq.max_attempts, dlq.retry_backoff = 2, 0.01
+
+    dlq.send(*_letter(3))
+    for _ in range(2):
+        _wait_for(lambda: dlq.producer.callbacks)
+        dlq.producer.ack_all(exc=RuntimeError("topic missing"))
+    commits.mark(TP, 7, count=8)
+    assert commits.commit_sync()
+    assert consumer.commits == [{TP: 3}]
+    assert dlq.stats()["failed"] == 1
+    assert dlq.unacked() == {TP: 3}
+    assert isinstance(dlq.failure, RuntimeError)
@@ -0,0 +1,63 @@
+import time
+from collections import namedtuple
+
+from client_metrics import MetricsRegistry
+from fetch_profiles import MAX_FETCH_WAIT_MS, MIN_POLL_RECORDS, AdaptiveFetchController, fetch_settings
+from partition_workers import PartitionWorkerPool
+
+Record = namedtuple("Record", "partition offset value")
+Partition = namedtuple("Partition", "topic partition")
+
+
+class _Log:
+    def error(self, *args, **kwargs):
+        pass
+
+
+def _controller(**kwargs):
+    return AdaptiveFetchController(fetch_settings("adaptive"), MetricsRegistry("test"), **kwargs)
+
+
+def test_full_batches_grow_fetches_and_sparse_ones_shrink_them():
+    controller = _controller()
+    assert controller.observe(1000, 0.001)
+    assert controller.max_records == 1500
+    assert controller.fetch_max_wait_ms == 200
+
+    for _ in range(50):
+        controller.observe(0, 0.0)
+    assert controller.max_records == MIN_POLL_RECORDS
+    assert controller.fetch_min_bytes == 1
+    assert controller.fetch_max_wait_ms < MAX_FETCH_WAIT_MS
+
+
+def test_slow_processing_caps_the_poll_size():
+    # 1s budget (5s interval x 0.2) at 10ms a record allows 100 records per poll
+    controller = _controller(max_poll_interval_ms=5000)
+    controller.observe(1000, 10.0)
+    assert controller.max_records == 100
+
+
+def test_processing_time_is_per_processed_record_not_per_polled_record():
+    controller = _controller(max_poll_interval_ms=5000)
+    # A full poll that was only queued, while workers spent 1s on 100 earlier records
+    controller.observe(1000, 1.0, processed=100)
+    assert controller.per_record_seconds == 0.01
+    assert controller.max_records == 100
+
+    # Nothing finished yet: the fill still counts, the per-record estimate is kept
+    controller.observe(100, 0.0, processed=0)
+    assert controller.per_record_seconds == 0.01
+
+
+def test_worker_pool_reports_handler_time():
+    pool = PartitionWorkerPool(lambda record: time.sleep(0.01), commits=None,
+                               metrics=MetricsRegistry("test"), log=_Log(), workers=2)
+    partition = Partition("orders", 0)
+    pool.submit(partition, [Record(0, offset, None) for offset in range(5)])
+    assert pool.wait_idle(timeout=5)
+
+    processed, seconds = pool.take_processing_time()
+    assert processed == 5
+    assert 0.05 <= seconds < 1.0
+    assert pool.take_processing_time() == (0, 0.0)
@@ -0,0 +1,92 @@
+import os
+import signal
+import time
+
+import pytest
+
+from kafka_config import CONFIG_INPUTS, ConfigManager
+
+LOCAL = 'export KAFKA_ENV=local\nexport LOCAL_BOOTSTRAP_SERVERS="localhost:9092"\n'
+CC = ('export KAFKA_ENV=cc\nexport CC_BOOTSTRAP_SERVERS=cc.example:9092\n'
+      'export CC_API_KEY=key\nexport CC_API_SECRET=secret\n')
+
+
+@pytest.fixture
+def env_file(tmp_path, monkeypatch):
+    """An env file and a process environment the test may change freely"""
+    for name in CONFIG_INPUTS + ("KAFKA_ENV", "EXTRA"):
+        monkeypatch.delenv(name, raising=False)
+    path = tmp_path / "env.test"
+    path.write_text(LOCAL)
+    return path
+
+
+def test_reload_switches_config_and_notifies(env_file):
+    manager = ConfigManager(str(env_file))
+    assert manager.get_active_config().bootstrap_servers == "localhost:9092"
+    changes = []
+    manager.add_reload_listener(lambda old, new: changes.append((old.bootstrap_servers, new.bootstrap_servers)))
+
+    assert not manager.reload()
+    env_file.write_text(CC)
+    assert manager.reload()
+    assert manager.active_config == "cc"
+    assert changes == [("localhost:9092", "cc.example:9092")]
+    assert os.environ["CC_API_KEY"] == "key"
+
+
+def test_invalid_reload_leaves_the_environment_alone(env_file):
+    manager = ConfigManager(str(env_file))
+    config = manager.get_active_config()
+    # Switches to cc without the credentials it needs
+    env_file.write_text('export KAFKA_ENV=cc\nexport CC_BOOTSTRAP_SERVERS=cc.example:9092\nexport EXTRA=1\n')
+
+    with pytest.raises(ValueError):
+        manager.reload()
+    assert os.environ["KAFKA_ENV"] == "local"
+    assert "CC_BOOTSTRAP_SERVERS" not in os.environ
+    assert "EXTRA" not in os.environ
+    assert manager.get_active_config() is config
+
+
+def test_variables_removed_from_the_file_are_unset(env_file, monkeypatch):
+    monkeypatch.setenv("EXTRA", "from-shell")
+    env_file.write_text(LOCAL + "export EXTRA=from-file\nexport LOCAL_ONLY_FLAG=1\n")
+    monkeypatch.delenv("LOCAL_ONLY_FLAG", raising=False)
+    manager = ConfigManager(str(env_file))
+    assert os.environ["EXTRA"] == "from-file"
+
+    env_file.write_text(LOCAL)
+    manager.reload()
+    assert "LOCAL_ONLY_FLAG" not in os.environ
+    # Variables the shell had set go back to the shell's value
+    assert os.environ["EXTRA"] == "from-shell"
+
+
+def test_reload_without_env_file_reads_the_process_environment(env_file, monkeypatch):
+    monkeypatch.setenv("KAFKA_ENV", "local")
+    manager = ConfigManager()
+    assert manager.get_active_config().bootstrap_servers == "localhost:9092"
+    monkeypatch.setenv("LOCAL_BOOTSTRAP_SERVERS", "localhost:19092")
+    assert manager.reload()
+    assert manager.get_active_config().bootstrap_servers == "localhost:19092"
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="no SIGHUP on this platform")
+def test_sighup_while_holding_the_lock_reloads_on_the_watcher(env_file):
+    manager = ConfigManager(str(env_file))
+    manager.get_active_config()
+    previous = signal.getsignal(signal.SIGHUP)
+    try:
+        manager.install_reload_signal()
+        env_file.write_text(CC)
+        # A signal landing mid-lookup must not reload on this thread: the lock is not reentrant
+        with manager.lock:
+            os.kill(os.getpid(), signal.SIGHUP)
+            assert manager.active_config == "local"
+        deadline = time.monotonic() + 5
+        while manager.active_config != "cc":
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        signal.signal(signal.SIGHUP, previous)
@@ -0,0 +1,122 @@
+import socket
+import sys
+import time
+import types
+
+import pytest
+from kafka.errors import KafkaTimeoutError
+
+import kafka_engines
+from kafka_config import ConfigManager
+from kafka_engines import KafkaPythonConsumerEngine, KafkaPythonProducerEngine, TopicPartition
+
+SETTINGS = {'reconnect_backoff_ms': 20}
+
+
+@pytest.fixture(params=["refused", "silent"])
+def unreachable_config(request, monkeypatch):
+    """A `local` config whose bootstrap either refuses connections or accepts and never answers"""
+    server = socket.create_server(('localhost', 0))
+    port = server.getsockname()[1]
+    if request.param == "refused":
+        server.close()
+    monkeypatch.setenv("KAFKA_ENV", "local")
+    monkeypatch.setenv("LOCAL_BOOTSTRAP_SERVERS", f"localhost:{port}")
+    yield ConfigManager()
+    server.close()
+
+
+def _assert_bounded(warmup, timeout=0.5):
+    started = time.monotonic()
+    with pytest.raises(KafkaTimeoutError):
+        warmup("orders", timeout=timeout)
+    assert time.monotonic() - started < timeout + 1.0
+
+
+def test_consumer_warmup_gives_up_on_an_unreachable_cluster(unreachable_config):
+    engine = KafkaPythonConsumerEngine(unreachable_config, "orders", "warmup-test", None, None, dict(SETTINGS))
+    try:
+        _assert_bounded(engine.warmup)
+    finally:
+        engine.close()
+
+
+def test_producer_warmup_gives_up_on_an_unreachable_cluster(unreachable_config):
+    engine = KafkaPythonProducerEngine(unreachable_config, None, None, dict(SETTINGS))
+    try:
+        _assert_bounded(engine.warmup)
+    finally:
+        engine.producer.close(timeout=0)
+
+
+def test_tune_fetch_updates_the_live_fetcher(unreachable_config):
+    engine = KafkaPythonConsumerEngine(unreachable_config, "orders", "warmup-test", None, None, dict(SETTINGS))
+    try:
+        assert engine.tune_fetch({'fetch_min_bytes': 4096})
+        assert engine.consumer._fetcher.config['fetch_min_bytes'] == 4096
+    finally:
+        engine.close()
+
+
+def test_settings_override_connection_defaults(unreachable_config):
+    assert 'request_timeout_ms' in unreachable_config.get_kafka_config_dict()
+    consumer = KafkaPythonConsumerEngine(unreachable_config, "orders", "warmup-test", None, None,
+                                         {**SETTINGS, 'request_timeout_ms': 15000})
+    producer = KafkaPythonProducerEngine(unreachable_config, None, None,
+                                         {**SETTINGS, 'request_timeout_ms': 15000})
+    try:
+        assert consumer.consumer.config['request_timeout_ms'] == 15000
+        assert producer.producer.config['request_timeout_ms'] == 15000
+    finally:
+        consumer.close()
+        producer.producer.close(timeout=0)
+
+
+class _ConfluentTopicPartition:
+    def __init__(self, topic, partition, offset=-1001):
+        self.topic, self.partition, self.offset = topic, partition, offset
+
+
+class _ConfluentConsumer:
+    """librdkafka stand-in: every commit, sync or async, reports through on_commit"""
+
+    def __init__(self, config):
+        self.on_commit = config['on_commit']
+        self.results = []
+
+    def subscribe(self, topics, **kwargs):
+        pass
+
+    def commit(self, offsets, asynchronous):
+        if asynchronous:
+            self.results.append(offsets)
+        else:
+            # Reported ahead of still-pending async commits
+            self.on_commit(None, offsets)
+
+    def serve(self):
+        results, self.results = self.results, []
+        for offsets in results:
+            self.on_commit(None, offsets)
+
+
+@pytest.fixture
+def confluent_engine(monkeypatch, unreachable_config):
+    fake = types.SimpleNamespace(Consumer=_ConfluentConsumer, TopicPartition=_ConfluentTopicPartition,
+                                 KafkaException=Exception)
+    monkeypatch.setattr(kafka_engines, "HAS_CONFLUENT_KAFKA", True)
+    monkeypatch.setitem(sys.modules, "confluent_kafka", fake)
+    return kafka_engines.ConfluentConsumerEngine(unreachable_config, "orders", "group", None, None, {})
+
+
+def test_confluent_commit_callbacks_match_their_own_commit(confluent_engine):
+    tp = TopicPartition("orders", 0)
+    results = []
+    confluent_engine.commit({tp: 10}, asynchronous=True, callback=lambda err: results.append(("a", err)))
+    # A sync commit served first must not consume the async commit's callback
+    confluent_engine.commit({tp: 12})
+    assert results == []
+    confluent_engine.commit({tp: 15}, asynchronous=True, callback=lambda err: results.append(("b", err)))
+    confluent_engine.consumer.serve()
+    assert results == [("a", None), ("b", None)]
+    assert confluent_engine.commit_callbacks == {}
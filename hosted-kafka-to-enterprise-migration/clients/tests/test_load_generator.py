@@ -0,0 +1,57 @@
+import queue
+import time
+
+from load_generator import TokenBucket, collect_results, rate_at, run_worker
+
+
+def test_token_bucket_paces_to_rate():
+    bucket = TokenBucket(rate=1000, burst=1)
+    started = time.monotonic()
+    for _ in range(101):
+        bucket.acquire()
+    # The first token is the initial burst; the other 100 take ~0.1s at 1000/s
+    assert 0.09 <= time.monotonic() - started < 0.5
+
+
+def test_token_bucket_burst_is_capped():
+    bucket = TokenBucket(rate=10, burst=5)
+    time.sleep(0.2)
+    bucket._refill()
+    assert bucket.tokens == 5
+
+
+def test_step_profile_ramps_in_steps():
+    args = dict(ramp_seconds=10, steps=5, burst_factor=3, burst_seconds=1, burst_period=10)
+    assert rate_at("step", 100, 0, **args) == 20
+    assert rate_at("step", 100, 4.5, **args) == 60
+    assert rate_at("step", 100, 60, **args) == 100
+
+
+def test_step_profile_without_steps_runs_at_target():
+    assert rate_at("step", 100, 3, ramp_seconds=10, steps=0, burst_factor=3,
+                   burst_seconds=1, burst_period=10) == 100
+    assert rate_at("step", 100, 3, ramp_seconds=0, steps=5, burst_factor=3,
+                   burst_seconds=1, burst_period=10) == 100
+
+
+def test_worker_reports_a_result_when_setup_fails(tmp_path):
+    options = {'serde': 'json', 'engine': 'kafka-python', 'producer_profile': str(tmp_path / "missing.json"),
+               'mb_per_sec': False}
+    results = queue.Queue()
+    run_worker(0, options, results)
+    result = results.get_nowait()
+    assert result["worker_id"] == 0
+    assert result["sent"] == 0
+
+
+class _ExitedProcess:
+    exitcode = -9
+
+    def is_alive(self):
+        return False
+
+
+def test_collect_results_stops_when_workers_died():
+    results = queue.Queue()
+    results.put({"worker_id": 0})
+    assert collect_results(results, [_ExitedProcess(), _ExitedProcess()]) == [{"worker_id": 0}]
@@ -0,0 +1,51 @@
+from collections import namedtuple
+
+from client_metrics import MetricsRegistry
+from order_dedupe import DedupeCache, new_producer_run, producer_run
+
+Record = namedtuple("Record", "headers value")
+
+
+def _records(run_header, order_ids):
+    headers = [("sent_at_ns", b"\0" * 8)] + ([run_header] if run_header else [])
+    return [Record(headers, {"order_id": order_id}) for order_id in order_ids]
+
+
+def _dropped(cache, records):
+    return [record.value["order_id"] for record in records
+            if cache.seen(record.value["order_id"], producer_run(record))]
+
+
+def test_replayed_orders_are_dropped():
+    cache = DedupeCache(MetricsRegistry("test"))
+    run = new_producer_run()
+    assert _dropped(cache, _records(run, range(1, 101))) == []
+    assert _dropped(cache, _records(run, range(50, 151))) == list(range(50, 101))
+
+
+def test_restarted_producer_orders_are_not_dropped():
+    cache = DedupeCache(MetricsRegistry("test"))
+    first, restarted = new_producer_run(), new_producer_run()
+    assert first != restarted
+    assert _dropped(cache, _records(first, range(1, 1001))) == []
+    # The restarted producer numbers from 1 again
+    assert _dropped(cache, _records(restarted, range(1, 1001))) == []
+    assert _dropped(cache, _records(restarted, range(1, 11))) == list(range(1, 11))
+
+
+def test_restarted_producer_orders_are_not_dropped_by_the_filters():
+    # A tiny budget pushes almost everything out of the exact window into the Bloom filters
+    cache = DedupeCache(MetricsRegistry("test"), window_size=10, memory_mb=0.5)
+    first, restarted = new_producer_run(), new_producer_run()
+    _dropped(cache, _records(first, range(1, 5001)))
+    dropped = _dropped(cache, _records(restarted, range(1, 5001)))
+    # Only Bloom false positives, at roughly fp_rate
+    assert len(dropped) < 5000 * cache.fp_rate * 5
+    assert len(_dropped(cache, _records(first, range(1, 5001)))) == 5000
+
+
+def test_records_without_a_run_header_are_keyed_by_order_id():
+    cache = DedupeCache(MetricsRegistry("test"))
+    assert producer_run(Record(None, {})) is None
+    assert _dropped(cache, _records(None, range(1, 11))) == []
+    assert _dropped(cache, _records(None, range(1, 11))) == list(range(1, 11))
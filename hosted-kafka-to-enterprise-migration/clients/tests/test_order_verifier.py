@@ -0,0 +1,70 @@
+from client_metrics import MetricsRegistry
+from order_verifier import ARRAY_MAX, CHUNK_SIZE, OrderVerifier, RoaringBitmap
+
+
+class _Log:
+    def __init__(self):
+        self.events = []
+
+    def info(self, message, event=None, **fields):
+        self.events.append(event)
+
+
+def test_bitmap_add_and_contains_across_container_kinds():
+    bitmap = RoaringBitmap()
+    values = list(range(0, 2 * (ARRAY_MAX + 1), 2)) + [CHUNK_SIZE + 7]
+    assert all(bitmap.add(v) for v in values)
+    assert not bitmap.add(0)
+    # The first chunk outgrew the sorted array and became a bitmap
+    assert isinstance(bitmap.containers[0], bytearray)
+    assert len(bitmap) == len(values)
+    assert all(v in bitmap for v in values)
+    assert 1 not in bitmap and CHUNK_SIZE + 8 not in bitmap
+
+
+def test_bitmap_missing_ranges():
+    bitmap = RoaringBitmap()
+    for value in list(range(1, 10)) + list(range(15, 20)) + [CHUNK_SIZE + 2]:
+        bitmap.add(value)
+    assert bitmap.missing_ranges(1, 19) == [(10, 14)]
+    assert bitmap.missing_ranges(1, CHUNK_SIZE + 2) == [(10, 14), (20, CHUNK_SIZE + 1)]
+    assert bitmap.missing_ranges(1, CHUNK_SIZE + 2, limit=1) == [(10, 14)]
+
+
+def test_lost_duplicate_and_reordered_orders_are_reported():
+    log = _Log()
+    verifier = OrderVerifier(MetricsRegistry("test"), log)
+    run = 0x1234
+    for offset, order_id in enumerate([1, 2, 4, 6, 5, 6]):
+        verifier.observe(0, offset, order_id, run)
+
+    assert verifier.unique_count() == 5
+    assert verifier.missing_count() == 1
+    assert log.events == ["verify_out_of_order", "verify_duplicate"]
+    report = "\n".join(verifier.report())
+    assert "order_id 1-6, 5 unique, 1 missing: 3" in report
+    assert "❌" in report
+
+
+def test_restarted_producer_run_is_tracked_separately():
+    log = _Log()
+    verifier = OrderVerifier(MetricsRegistry("test"), log)
+    for offset, order_id in enumerate(range(1, 101)):
+        verifier.observe(offset % 3, offset, order_id, run=1)
+    # The restarted producer numbers from 1 again on the same partitions
+    for offset, order_id in enumerate(range(1, 51), start=100):
+        verifier.observe(offset % 3, offset, order_id, run=2)
+
+    assert log.events == []
+    assert verifier.unique_count() == 150
+    assert verifier.missing_count() == 0
+    lines = verifier.report()
+    assert "2 producer runs" in lines[1]
+    assert lines[-1].strip() == "✅ No lost or duplicated orders"
+
+
+def test_records_without_a_run_share_one_run():
+    verifier = OrderVerifier(MetricsRegistry("test"), _Log())
+    verifier.observe(0, 0, 1)
+    assert verifier.observe(0, 1, 1) == "duplicate"
+    assert "Run unstamped" in "\n".join(verifier.report())
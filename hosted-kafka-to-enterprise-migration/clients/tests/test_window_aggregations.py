@@ -0,0 +1,144 @@
+import json
+
+import pytest
+
+from client_metrics import MetricsRegistry
+from kafka_engines import TopicPartition
+from window_aggregations import _HEADER, _SLOT, MmapCheckpoint, StateCheckpoint, WindowAggregator
+
+
+class _Log:
+    def __init__(self):
+        self.windows = []
+
+    def info(self, message, event=None, **fields):
+        self.windows.append((fields["window_start"], fields["window_end"]))
+
+
+def test_checkpoint_survives_reopen(tmp_path):
+    path = str(tmp_path / "state.ckpt")
+    checkpoint = MmapCheckpoint(path, slot_size=4096)
+    assert checkpoint.load() is None
+    checkpoint.save(b"first")
+    checkpoint.save(b"second", durable=True)
+    checkpoint.close()
+
+    reopened = MmapCheckpoint(path)
+    assert reopened.load() == b"second"
+    assert reopened.sequence == 2
+    reopened.close()
+
+
+def test_torn_active_slot_falls_back_to_the_previous_checkpoint(tmp_path):
+    path = str(tmp_path / "state.ckpt")
+    checkpoint = MmapCheckpoint(path, slot_size=4096)
+    checkpoint.save(b"first")
+    checkpoint.save(b"second")
+    # Corrupt the payload of the slot the header points at, as a crash mid-write would
+    offset = _HEADER.size + checkpoint.active * checkpoint.slot_size + _SLOT.size
+    checkpoint.map[offset] ^= 0xFF
+    assert checkpoint.load() == b"first"
+    assert checkpoint.sequence == 1
+    checkpoint.close()
+
+
+def test_oversized_payload_grows_the_file(tmp_path):
+    path = str(tmp_path / "state.ckpt")
+    checkpoint = MmapCheckpoint(path, slot_size=64)
+    checkpoint.save(b"small")
+    big = b"x" * 1000
+    checkpoint.save(big)
+    assert checkpoint.slot_size >= len(big) + _SLOT.size
+    checkpoint.close()
+
+    reopened = MmapCheckpoint(path)
+    assert reopened.load() == big
+    reopened.close()
+
+
+def test_other_files_are_refused(tmp_path):
+    path = tmp_path / "not-a-checkpoint"
+    path.write_bytes(b"\0" * 1024)
+    with pytest.raises(ValueError):
+        MmapCheckpoint(str(path))
+
+
+def test_state_checkpoint_restores_state_and_offsets(tmp_path):
+    path = str(tmp_path / "state.ckpt")
+    state = {"total_orders": 3}
+    checkpoint = StateCheckpoint(path, lambda: state, MetricsRegistry("test"))
+    tp0, tp1 = TopicPartition("orders", 0), TopicPartition("orders", 1)
+    checkpoint.save({tp0: 10})
+    checkpoint.save({tp1: 4})
+    checkpoint.close()
+
+    restored = StateCheckpoint(path, dict, MetricsRegistry("test"))
+    assert restored.load() == state
+    assert restored.start_offsets([tp0, tp1, TopicPartition("orders", 2)]) == {tp0: 10, tp1: 4}
+    restored.close()
+
+
+def test_tumbling_windows_close_and_drop_late_records():
+    log = _Log()
+    aggregator = WindowAggregator(MetricsRegistry("test"), log, window_seconds=60)
+    order = {"customer_id": "c1", "product_id": "p1", "region": "r1", "total_amount": 10.0}
+    aggregator.add(1_000, order)
+    aggregator.add(59_000, order)
+    assert log.windows == []
+    aggregator.add(60_000, order)
+    assert log.windows == [(0, 60_000)]
+
+    aggregator.add(121_000, order)
+    aggregator.add(5_000, order)
+    assert aggregator.late_records_total.value == 1
+    end, window = aggregator.current()
+    assert end == 180_000
+    assert window["customer_id"]["c1"] == [10.0, 1]
+
+
+def test_sliding_window_snapshot_round_trip():
+    aggregator = WindowAggregator(MetricsRegistry("test"), _Log(), window_seconds=60, slide_seconds=30)
+    order = {"customer_id": "c1", "total_amount": 5.0}
+    for timestamp in (0, 31_000, 45_000):
+        aggregator.add(timestamp, order)
+    end, window = aggregator.current()
+    assert end == 60_000
+    assert window["customer_id"]["c1"] == [15.0, 3]
+    assert window["product_id"]["unknown"] == [15.0, 3]
+
+    restored = WindowAggregator(MetricsRegistry("test"), _Log(), window_seconds=60, slide_seconds=30)
+    restored.restore(json.loads(json.dumps(aggregator.snapshot())))
+    assert restored.current() == (end, window)
+
+
+def test_failed_grow_keeps_the_previous_checkpoint(tmp_path, monkeypatch):
+    path = str(tmp_path / "state.ckpt")
+    checkpoint = MmapCheckpoint(path, slot_size=64)
+    checkpoint.save(b"small", durable=True)
+
+    def crash(fd):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("window_aggregations.os.fsync", crash)
+    with pytest.raises(OSError):
+        checkpoint.save(b"x" * 1000)
+    monkeypatch.undo()
+
+    assert checkpoint.load() == b"small"
+    checkpoint.close()
+    reopened = MmapCheckpoint(path)
+    assert reopened.load() == b"small"
+    reopened.close()
+
+
+def test_start_offsets_never_seek_behind_the_group(tmp_path):
+    checkpoint = StateCheckpoint(str(tmp_path / "state.ckpt"), dict, MetricsRegistry("test"))
+    tp0, tp1, tp2 = (TopicPartition("orders", p) for p in range(3))
+    checkpoint.save({tp0: 10, tp1: 10, tp2: 10})
+    # tp0 was consumed further by another member while this one did not own it
+    committed = {tp0: 25, tp1: 8}
+    assert checkpoint.start_offsets([tp0, tp1, tp2], committed.get) == {tp0: 25, tp1: 10, tp2: 10}
+
+    checkpoint.forget([tp0])
+    assert checkpoint.start_offsets([tp0, tp1]) == {tp1: 10}
+    checkpoint.close()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Incremental windowed aggregations with memory-mapped checkpoints.
+Revenue and order counts per customer, product and region are accumulated
+into fixed panes of `slide` seconds keyed by the record's Kafka timestamp;
+tumbling windows are one pane, sliding windows are the sum of their last
+window/slide panes. State is checkpointed to a memory-mapped file together
+with the offsets being committed, so a restarted consumer restores it and
+seeks past what it already counted instead of replaying from earliest.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from client_metrics import MetricsRegistry
+from kafka_engines import TopicPartition
+
+DIMENSIONS = ('customer_id', 'product_id', 'region')
+
+
+class WindowAggregator:
+    """Tumbling (slide == window) or sliding windows built from incremental panes"""
+
+    def __init__(self, metrics: MetricsRegistry, log, window_seconds: int = 60, slide_seconds: Optional[int] = None):
+        self.window_ms = window_seconds * 1000
+        self.slide_ms = (slide_seconds or window_seconds) * 1000
+        if self.window_ms % self.slide_ms:
+            raise ValueError("Window size must be a multiple of the slide")
+        self.log = log
+
+        # pane start (ms) -> dimension -> key -> [revenue, orders]
+        self.panes: Dict[int, Dict[str, Dict[str, List[float]]]] = {}
+        self.watermark = None
+        self.lock = threading.Lock()
+
+        self.late_records_total = metrics.counter("window_late_records_total",
+                                                  "Records older than every retained window")
+        metrics.gauge("window_panes", "Panes held in memory", lambda: len(self.panes))
+
+    def add(self, timestamp_ms: int, order) -> None:
+        """Fold one order into its pane, emitting any windows it closes"""
+        pane_start = timestamp_ms - timestamp_ms % self.slide_ms
+        with self.lock:
+            if self.watermark is not None and pane_start <= self.watermark - self.window_ms:
+                self.late_records_total.inc()
+                return
+
+            pane = self.panes.get(pane_start)
+            if pane is None:
+                pane = self.panes[pane_start] = {dimension: {} for dimension in DIMENSIONS}
+            amount = order['total_amount']
+            for dimension in DIMENSIONS:
+                key = str(order[dimension]) if dimension in order else 'unknown'
+                totals = pane[dimension].get(key)
+                if totals is None:
+                    pane[dimension][key] = [amount, 1]
+                else:
+                    totals[0] += amount
+                    totals[1] += 1
+
+            if self.watermark is None:
+                self.watermark = pane_start
+            elif pane_start > self.watermark:
+                closed = range(self.watermark + self.slide_ms, pane_start + self.slide_ms, self.slide_ms)
+                self.watermark = pane_start
+                self._emit(closed)
+
+    def _emit(self, window_ends):
+        for end in window_ends:
+            window = self._merge(end)
+            if window:
+                self.log.info(self.format_window(end, window), event="window_closed",
+                              window_start=end - self.window_ms, window_end=end)
+        # Panes older than the oldest window that can still change are no longer needed
+        for start in [s for s in self.panes if s <= self.watermark - self.window_ms]:
+            del self.panes[start]
+
+    def _merge(self, end_ms: int) -> Dict[str, Dict[str, List[float]]]:
+        merged: Dict[str, Dict[str, List[float]]] = {}
+        for start in range(end_ms - self.window_ms, end_ms, self.slide_ms):
+            pane = self.panes.get(start)
+            if not pane:
+                continue
+            for dimension, keys in pane.items():
+                target = merged.setdefault(dimension, {})
+                for key, (revenue, orders) in keys.items():
+                    totals = target.setdefault(key, [0.0, 0])
+                    totals[0] += revenue
+                    totals[1] += orders
+        return merged
+
+    def current(self) -> Tuple[int, Dict[str, Dict[str, List[float]]]]:
+        """The open window ending after the newest pane"""
+        with self.lock:
+            if self.watermark is None:
+                return 0, {}
+            end = self.watermark + self.slide_ms
+            return end, self._merge(end)
+
+    def format_window(self, end_ms: int, window: Dict[str, Dict[str, List[float]]], top: int = 3) -> str:
+        start = time.strftime('%H:%M:%S', time.gmtime((end_ms - self.window_ms) / 1000))
+        end = time.strftime('%H:%M:%S', time.gmtime(end_ms / 1000))
+        lines = [f"🪟 Window {start}-{end} UTC:"]
+        for dimension in DIMENSIONS:
+            ranked = sorted(window.get(dimension, {}).items(), key=lambda item: item[1][0], reverse=True)[:top]
+            text = ", ".join(f"{key} ${revenue:,.2f} ({int(orders)})" for key, (revenue, orders) in ranked)
+            lines.append(f"   {dimension.replace('_id', '')}: {text}")
+        return "\n".join(lines)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {"watermark": self.watermark,
+                    "panes": {str(start): pane for start, pane in self.panes.items()}}
+
+    def restore(self, state: Dict[str, Any]):
+        with self.lock:
+            self.watermark = state.get("watermark")
+            self.panes = {int(start): pane for start, pane in state.get("panes", {}).items()}
+
+
+_MAGIC = b'ORDCKPT1'
+_HEADER = struct.Struct('>8sB7x')      # magic, active slot
+_SLOT = struct.Struct('>QII')           # sequence, payload length, crc32
+
+
+class MmapCheckpoint:
+    """Two-slot checkpoint file written through mmap.
+
+    Each save goes to the inactive slot and then flips the header, so a crash
+    mid-write leaves the previous checkpoint intact.
+    """
+
+    def __init__(self, path: str, slot_size: int = 1024 * 1024):
+        self.path = path
+        self.sequence = 0
+        self.active = 0
+        if os.path.exists(path) and os.path.getsize(path) > _HEADER.size:
+            self.slot_size = (os.path.getsize(path) - _HEADER.size) // 2
+            self._map()
+            magic, self.active = _HEADER.unpack_from(self.map, 0)
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not an orders checkpoint file")
+        else:
+            self.slot_size = slot_size
+            self._create()
+
+    def _create(self, payload: Optional[bytes] = None):
+        """Write a fresh file holding payload in slot 0 and swap it in.
+
+        The file is built beside the old one and only replaces it once it is on
+        disk, so a crash while growing still leaves the previous checkpoint.
+        """
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.truncate(_HEADER.size + 2 * self.slot_size)
+            f.write(_HEADER.pack(_MAGIC, 0))
+            if payload is not None:
+                f.seek(self._slot_offset(0))
+                f.write(_SLOT.pack(self.sequence, len(payload), zlib.crc32(payload)) + payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        directory = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+        self.active = 0
+        self._map()
+
+    def _map(self):
+        self.file = open(self.path, 'r+b')
+        self.map = mmap.mmap(self.file.fileno(), 0)
+
+    def _slot_offset(self, slot: int) -> int:
+        return _HEADER.size + slot * self.slot_size
+
+    def _read_slot(self, slot: int) -> Optional[Tuple[int, bytes]]:
+        offset = self._slot_offset(slot)
+        sequence, length, crc = _SLOT.unpack_from(self.map, offset)
+        if not length or length > self.slot_size - _SLOT.size:
+            return None
+        payload = self.map[offset + _SLOT.size:offset + _SLOT.size + length]
+        return (sequence, payload) if zlib.crc32(payload) == crc else None
+
+    def load(self) -> Optional[bytes]:
+        """Latest intact payload, falling back to the other slot if the active one is torn"""
+        for slot in (self.active, 1 - self.active):
+            entry = self._read_slot(slot)
+            if entry:
+                self.sequence = entry[0]
+                return entry[1]
+        return None
+
+    def save(self, payload: bytes, durable: bool = False):
+        if len(payload) + _SLOT.size > self.slot_size:
+            self._grow(len(payload) + _SLOT.size)
+        slot = 1 - self.active
+        offset = self._slot_offset(slot)
+        self.sequence += 1
+        self.map[offset + _SLOT.size:offset + _SLOT.size + len(payload)] = payload
+        _SLOT.pack_into(self.map, offset, self.sequence, len(payload), zlib.crc32(payload))
+        _HEADER.pack_into(self.map, 0, _MAGIC, slot)
+        self.active = slot
+        if durable:
+            self.map.flush()
+
+    def _grow(self, needed: int):
+        current = self.load()
+        old_map, old_file, old_size = self.map, self.file, self.slot_size
+        while self.slot_size < needed:
+            self.slot_size *= 2
+        try:
+            self._create(current)
+        except Exception:
+            self.slot_size = old_size
+            raise
+        old_map.close()
+        old_file.close()
+
+    def close(self):
+        self.map.flush()
+        self.map.close()
+        self.file.close()
+
+
+class StateCheckpoint:
+    """Saves consumer state and the offsets it covers; the CommitManager calls save() before committing"""
+
+    def __init__(self, path: str, state_fn: Callable[[], Dict[str, Any]], metrics: MetricsRegistry):
+        self.file = MmapCheckpoint(path)
+        self.state_fn = state_fn
+        self.offsets: Dict[TopicPartition, int] = {}
+        self.save_latency = metrics.histogram("stage_latency_seconds", "Latency of each consumer stage in seconds",
+                                              stage="checkpoint")
+        metrics.gauge("checkpoint_bytes", "Size of the last state checkpoint", lambda: self.last_size)
+        self.last_size = 0
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        payload = self.file.load()
+        if payload is None:
+            return None
+        checkpoint = json.loads(payload)
+        self.offsets = {TopicPartition(topic, partition): offset
+                        for topic, partition, offset in checkpoint["offsets"]}
+        return checkpoint["state"]
+
+    def save(self, offsets: Dict, durable: bool = False):
+        started = time.perf_counter()
+        self.offsets.update(offsets)
+        payload = json.dumps({
+            "offsets": [[tp.topic, tp.partition, offset] for tp, offset in self.offsets.items()],
+            "state": self.state_fn(),
+        }, separators=(',', ':')).encode()
+        self.file.save(payload, durable=durable)
+        self.last_size = len(payload)
+        self.save_latency.record(time.perf_counter() - started)
+
+    def start_offsets(self, partitions, committed: Optional[Callable[[TopicPartition], Optional[int]]] = None
+                      ) -> Dict[TopicPartition, int]:
+        """Where to resume assigned partitions so checkpointed records are not counted twice.
+
+        Never behind the group's committed offset: records another member consumed
+        while it owned the partition are not in this state and must not be replayed.
+        """
+        start = {}
+        for tp in partitions:
+            if tp in self.offsets:
+                group_offset = committed(tp) if committed else None
+                start[tp] = max(self.offsets[tp], group_offset if group_offset is not None else -1)
+        return start
+
+    def forget(self, partitions):
+        """Drop offsets of revoked partitions; the next owner moves them past this checkpoint"""
+        for tp in partitions:
+            self.offsets.pop(tp, None)
+
+    def close(self):
+        self.file.close()